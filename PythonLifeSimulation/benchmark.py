@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite for life_simulation.py.
+
+Builds a few seeded scenarios with the real World API, fast-forwards each
+one and reports ticks per second, mean time per tick phase (TickProfiler)
+and peak traced memory. Results can be saved as a JSON baseline and later
+runs compared against it, flagging the scenarios that got slower or bigger.
+
+Example:
+    python benchmark.py --save baseline.json
+    ... change something ...
+    python benchmark.py --compare baseline.json
+"""
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+
+import life_simulation as sim
+
+# --- SCENARIOS ---
+
+def build_default(seed):
+    """The normal 70x30 start."""
+    world = sim.World(sim.WORLD_WIDTH, sim.WORLD_HEIGHT, seed=seed)
+    sim.populate_world(world)
+    return world
+
+def build_dense(seed):
+    """The normal start, topped up to 300 agents."""
+    world = build_default(seed)
+    while len(world.agents) < 300:
+        world.add_agent()
+    return world
+
+def build_food_crisis(seed):
+    """60 agents and food well below CRITICAL_FOOD_COUNT, so the crisis news spreads."""
+    world = build_default(seed)
+    while len(world.agents) < 60:
+        world.add_agent()
+    for pos in sorted(world.food)[world.config.CRITICAL_FOOD_COUNT // 4:]:
+        world.remove_food(pos)
+    return world
+
+def build_low_env_health(seed):
+    """The normal start with the environment below the sickness threshold."""
+    world = build_default(seed)
+    world.environmental_health = world.config.ENV_SICKNESS_THRESHOLD / 2
+    return world
+
+def build_large_map(seed):
+    """A 500x500 map with the starting population and resources scaled up."""
+    config = sim.SimConfig(STARTING_AGENTS=2000, STARTING_FOOD=8000, STARTING_WOOD=5000, STARTING_FRUIT_BUSHES=300)
+    world = sim.World(500, 500, seed=seed, config=config)
+    sim.populate_world(world)
+    return world
+
+# name -> (builder, turns measured); every scenario also runs WARMUP_TURNS first
+SCENARIOS = {
+    'default': (build_default, 300),
+    'dense': (build_dense, 60),
+    'food_crisis': (build_food_crisis, 200),
+    'low_env_health': (build_low_env_health, 300),
+    'large_map': (build_large_map, 20),
+}
+WARMUP_TURNS = 10
+SEED = 12345
+
+# --- MEASURING ---
+
+def prepare(name, seed):
+    """Builds a scenario and runs its warm-up turns."""
+    world = SCENARIOS[name][0](seed)
+    for _ in range(WARMUP_TURNS):
+        world.update()
+    return world
+
+def run_scenario(name, turns=None, repeat=3, seed=SEED):
+    """
+    Measures one scenario. Every pass rebuilds the same seeded world, so they
+    all do identical work: `repeat` plain passes (the best one gives ticks per
+    second), one pass with a TickProfiler attached (mean ms per phase) and one
+    under tracemalloc (peak memory, including building the world).
+    """
+    if turns is None:
+        turns = SCENARIOS[name][1]
+
+    best = None
+    for _ in range(repeat):
+        world = prepare(name, seed)
+        start = time.perf_counter()
+        for _ in range(turns):
+            world.update()
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+
+    world = prepare(name, seed)
+    world.profiler = sim.TickProfiler(window=turns)
+    for _ in range(turns):
+        world.update()
+    phases = {phase: timing['mean_ms'] for phase, timing in world.profiler.report()['phases'].items()}
+
+    tracemalloc.start()
+    try:
+        world = prepare(name, seed)
+        for _ in range(turns):
+            world.update()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'turns': turns,
+        'seconds': best,
+        'ticks_per_second': turns / best if best > 0 else 0.0,
+        'phases_ms': phases,
+        'peak_memory_kb': peak // 1024,
+        'final_population': len(world.agents),
+        'final_turn': world.turn,
+    }
+
+def run_suite(names, turns=None, repeat=3, log=print):
+    results = {}
+    for name in names:
+        results[name] = result = run_scenario(name, turns, repeat)
+        log("{:<16} {:>9.1f} ticks/s  {:>9.2f} ms/tick  peak {:>8} KB  population {}".format(
+            name, result['ticks_per_second'], 1000.0 / result['ticks_per_second'] if result['ticks_per_second'] else 0.0,
+            result['peak_memory_kb'], result['final_population']))
+    return {
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'results': results,
+    }
+
+# --- BASELINES ---
+
+def compare(baseline, current, threshold=0.10, log=print):
+    """
+    Compares two run_suite() results. A scenario regresses when its ticks per
+    second drop, or its peak memory grows, by more than `threshold`. A
+    different final population means the code changed the simulation itself,
+    so the two runs didn't do the same work; that is reported but not flagged.
+    Returns the names of the regressed scenarios.
+    """
+    regressions = []
+    log("{:<16} {:>12} {:>12} {:>8} {:>10} {:>10} {:>8}  {}".format(
+        'scenario', 'base tps', 'tps', 'change', 'base KB', 'KB', 'change', 'status'))
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            log("{:<16} (not in baseline)".format(name))
+            continue
+        speed_change = result['ticks_per_second'] / base['ticks_per_second'] - 1 if base['ticks_per_second'] else 0.0
+        memory_change = result['peak_memory_kb'] / base['peak_memory_kb'] - 1 if base['peak_memory_kb'] else 0.0
+        problems = []
+        if speed_change < -threshold:
+            problems.append('SLOWER')
+        if memory_change > threshold:
+            problems.append('BIGGER')
+        if problems:
+            regressions.append(name)
+        status = ' '.join(problems) or 'ok'
+        if result['final_population'] != base['final_population']:
+            status += ' (trajectory differs: population {} vs {})'.format(result['final_population'], base['final_population'])
+        log("{:<16} {:>12.1f} {:>12.1f} {:>+7.1f}% {:>10} {:>10} {:>+7.1f}%  {}".format(
+            name, base['ticks_per_second'], result['ticks_per_second'], speed_change * 100,
+            base['peak_memory_kb'], result['peak_memory_kb'], memory_change * 100, status))
+
+        base_phases = base.get('phases_ms', {})
+        for phase, ms in result['phases_ms'].items():
+            if base_phases.get(phase):
+                change = ms / base_phases[phase] - 1
+                if abs(change) > threshold and ms > 0.01:
+                    log("    {:<30} {:>9.3f} -> {:>9.3f} ms ({:+.1f}%)".format(phase, base_phases[phase], ms, change * 100))
+    return regressions
+
+# --- COMMAND LINE ---
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the simulation on fixed seeded scenarios.")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help="comma separated scenarios to run (default: all of {})".format(', '.join(SCENARIOS)))
+    parser.add_argument('--turns', type=int, default=None, help="turns measured per scenario (default: per scenario)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed passes per scenario, the best one counts")
+    parser.add_argument('--save', metavar='PATH', help="write the results to PATH as a JSON baseline")
+    parser.add_argument('--compare', metavar='PATH', help="compare against a baseline written by --save")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="relative slowdown / memory growth counted as a regression (default: 0.10)")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error("Unknown scenario(s): {}".format(', '.join(unknown)))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    current = run_suite(names, args.turns, args.repeat)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=2)
+    if baseline is not None:
+        print()
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print("\nRegressions: {}".format(', '.join(regressions)))
+            sys.exit(1)
+        print("\nNo regressions.")
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+Tick cost of life_simulation.py against the original life_simulationold.py.
+
+Both engines run headless from the same seeds, world size and starting
+agents, food and wood. The current engine runs as a ladder: first with the
+subsystems added since the original (fruits, vengeance, environment,
+library) all switched off through their SimConfig flags, then with them
+switched back on one at a time. Each step is reported as ms per tick and as
+microseconds per agent per tick; populations drift apart quickly, so the
+per-agent figure is the one to compare. All steps and seeds run side by
+side, one tick of each in turn, and every tick counts at its fastest of
+--repeat passes, so a host whose speed drifts still gives ratios that hold
+to a few percent between runs.
+
+Every step is also expressed relative to the legacy engine measured in the
+same run, which makes results from different machines comparable: the
+checked-in legacy_reference.json is the standing reference, and --compare
+flags the steps whose cost relative to legacy grew.
+
+Example:
+    python legacy_compare.py --compare legacy_reference.json
+    python legacy_compare.py --save legacy_reference.json   # after an intended change
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+
+import life_simulation as sim
+from trajectory import load_engine
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LEGACY_PATH = os.path.join(HERE, 'life_simulationold.py')
+REFERENCE_PATH = os.path.join(HERE, 'legacy_reference.json')
+
+# Subsystem -> its SimConfig flag, in the order the ladder switches them back on
+SUBSYSTEMS = {
+    'fruits': 'FRUITS_ENABLED',
+    'vengeance': 'VENGEANCE_ENABLED',
+    'environment': 'ENVIRONMENT_ENABLED',
+    'library': 'LIBRARY_ENABLED',
+}
+SEEDS = (1, 2, 3)
+REPEAT = 5 # Timed passes per seed; each tick counts at its fastest pass
+
+# --- WORLDS ---
+
+def build_legacy(engine, seed, agents, food, wood):
+    """
+    A legacy world, populated the way its own __main__ does it. The legacy
+    engine draws from the global `random`, so the world comes back with
+    that stream's state (see time_runs).
+    """
+    random.seed(seed)
+    world = engine.World(engine.WORLD_WIDTH, engine.WORLD_HEIGHT)
+    for _ in range(agents):
+        world.add_agent()
+    for _ in range(food):
+        tile = world.get_random_empty_tile()
+        if tile:
+            world.food.add(tile)
+            world.food_freshness[tile] = engine.FOOD_FRESHNESS
+    for _ in range(wood):
+        tile = world.get_random_empty_tile()
+        if tile:
+            world.wood.add(tile)
+    return world, random.getstate()
+
+def build_current(engine, seed, agents, food, wood, enabled):
+    """A current world of the legacy size, with only the `enabled` subsystems on."""
+    flags = {flag: name in enabled for name, flag in SUBSYSTEMS.items()}
+    config = sim.SimConfig(STARTING_AGENTS=agents, STARTING_FOOD=food, STARTING_WOOD=wood, **flags)
+    world = sim.World(engine.WORLD_WIDTH, engine.WORLD_HEIGHT, seed=seed, config=config)
+    sim.populate_world(world)
+    return world, None
+
+def ladder():
+    """(step name, subsystems enabled) for every step, legacy first (None)."""
+    steps = [('legacy', None), ('core', ())]
+    names = list(SUBSYSTEMS)
+    for count in range(1, len(names) + 1):
+        steps.append(('+' + names[count - 1], tuple(names[:count])))
+    return steps
+
+# --- MEASURING ---
+
+def time_runs(runs, turns):
+    """
+    Runs every (world, global random state or None) in `runs` for up to
+    `turns` turns (a world stops when everyone dies), one tick of each world
+    in turn. Machine speed on this kind of host drifts by more than 10% over
+    seconds; stepping the worlds side by side makes a slow spell hit them
+    all alike. Worlds on the global `random` get their own stream swapped
+    in around each tick, so each one runs exactly as it would alone.
+    Returns, per world, the seconds each tick took and the population at
+    the start of each tick.
+    """
+    clock = time.perf_counter
+    results = [([], []) for _ in runs]
+    states = [state for _, state in runs]
+    for _ in range(turns):
+        running = False
+        for index, (world, _) in enumerate(runs):
+            if not world.agents:
+                continue
+            running = True
+            tick_seconds, populations = results[index]
+            populations.append(len(world.agents))
+            if states[index] is not None:
+                random.setstate(states[index])
+            start = clock()
+            world.update()
+            tick_seconds.append(clock() - start)
+            if states[index] is not None:
+                states[index] = random.getstate()
+        if not running:
+            break
+    return results
+
+def fastest_ticks(passes):
+    """
+    Folds repeated passes of one seeded run into (seconds, ticks, agent ticks),
+    timing every tick by its fastest pass. The passes do identical work, so a
+    pause that hits one tick of one pass drops out instead of costing the
+    whole pass.
+    """
+    populations = passes[0][1]
+    if any(run[1] != populations for run in passes):
+        raise RuntimeError("Repeated passes of a seeded run diverged; can't compare them tick by tick.")
+    seconds = sum(min(times) for times in zip(*(run[0] for run in passes)))
+    return seconds, len(populations), sum(populations)
+
+def summarize(runs):
+    """One step's figures from its (seconds, ticks, agent ticks) runs."""
+    seconds = sum(run[0] for run in runs)
+    ticks = sum(run[1] for run in runs)
+    agent_ticks = sum(run[2] for run in runs)
+    return {
+        'seconds': seconds,
+        'ticks': ticks,
+        'agent_ticks': agent_ticks,
+        'ms_per_tick': seconds * 1000.0 / ticks if ticks else 0.0,
+        'us_per_agent_tick': seconds * 1e6 / agent_ticks if agent_ticks else 0.0,
+        'mean_population': agent_ticks / float(ticks) if ticks else 0.0,
+    }
+
+def run_ladder(seeds=SEEDS, turns=500, repeat=REPEAT, agents=None, food=None, wood=None, log=print):
+    """Runs every ladder step; starting counts default to the legacy module's."""
+    legacy = load_engine(LEGACY_PATH)[0]
+    agents = legacy.STARTING_AGENTS if agents is None else agents
+    food = legacy.STARTING_FOOD if food is None else food
+    wood = legacy.STARTING_WOOD if wood is None else wood
+
+    builders = []
+    for name, enabled in ladder():
+        if enabled is None:
+            builders.append((name, lambda seed: build_legacy(legacy, seed, agents, food, wood)))
+        else:
+            builders.append((name, lambda seed, enabled=enabled: build_current(legacy, seed, agents, food, wood, enabled)))
+
+    # Every step and seed runs side by side (see time_runs). Every pass does
+    # the same work, so each tick counts at its fastest of `repeat` passes
+    # (see fastest_ticks).
+    keys = [(name, seed) for name, _ in builders for seed in seeds]
+    passes = {key: [] for key in keys}
+    for _ in range(repeat):
+        runs = [build(seed) for _, build in builders for seed in seeds]
+        for key, result in zip(keys, time_runs(runs, turns)):
+            passes[key].append(result)
+    best = {key: fastest_ticks(runs) for key, runs in passes.items()}
+
+    steps = {}
+    previous = None
+    log("{:<14} {:>10} {:>14} {:>10} {:>10} {:>12}".format('step', 'ms/tick', 'us/agent-tick', 'change', 'x legacy', 'population'))
+    for name, _ in builders:
+        steps[name] = step = summarize([best[name, seed] for seed in seeds])
+        legacy_cost = steps['legacy']['us_per_agent_tick']
+        step['relative_to_legacy'] = step['us_per_agent_tick'] / legacy_cost if legacy_cost else 0.0
+        change = ''
+        if previous and previous['us_per_agent_tick']:
+            change = '{:+.1f}%'.format((step['us_per_agent_tick'] / previous['us_per_agent_tick'] - 1) * 100)
+        log("{:<14} {:>10.3f} {:>14.2f} {:>10} {:>10.2f} {:>12.1f}".format(
+            name, step['ms_per_tick'], step['us_per_agent_tick'], change, step['relative_to_legacy'], step['mean_population']))
+        previous = step
+    return {
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'seeds': list(seeds),
+        'turns': turns,
+        'repeat': repeat,
+        'start': {'agents': agents, 'food': food, 'wood': wood},
+        'steps': steps,
+    }
+
+# --- REFERENCE ---
+
+def compare(reference, current, threshold=0.10, log=print):
+    """
+    Compares two run_ladder() results step by step on cost per agent tick
+    relative to legacy, so the two may come from different machines. A step
+    regresses when that grew by more than `threshold`. Each subsystem's own
+    share (its step minus the one before, in legacy units) is shown too, so
+    a slowdown can be pinned on the subsystem that grew. Returns the names
+    of the regressed steps.
+    """
+    if reference.get('start') != current['start'] or reference.get('seeds') != current['seeds']:
+        log("Note: the reference was run with other seeds or starting counts.")
+    regressions = []
+    log("{:<14} {:>10} {:>10} {:>8} {:>10} {:>10}  {}".format(
+        'step', 'ref x', 'x', 'change', 'ref own', 'own', 'status'))
+    previous_name = None
+    for name, step in current['steps'].items():
+        base = reference['steps'].get(name)
+        if base is None or name == 'legacy':
+            previous_name = name
+            continue
+        change = step['relative_to_legacy'] / base['relative_to_legacy'] - 1 if base['relative_to_legacy'] else 0.0
+        own = base_own = ''
+        if previous_name not in (None, 'legacy') and previous_name in reference['steps']:
+            own = '{:+.2f}'.format(step['relative_to_legacy'] - current['steps'][previous_name]['relative_to_legacy'])
+            base_own = '{:+.2f}'.format(base['relative_to_legacy'] - reference['steps'][previous_name]['relative_to_legacy'])
+        status = 'ok'
+        if change > threshold:
+            status = 'SLOWER'
+            regressions.append(name)
+        log("{:<14} {:>10.2f} {:>10.2f} {:>+7.1f}% {:>10} {:>10}  {}".format(
+            name, base['relative_to_legacy'], step['relative_to_legacy'], change * 100, base_own, own, status))
+        previous_name = name
+    return regressions
+
+# --- COMMAND LINE ---
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare tick cost with the legacy engine, one added subsystem at a time.")
+    parser.add_argument('--seeds', default=','.join(str(seed) for seed in SEEDS), help="comma separated seeds (default: 1,2,3)")
+    parser.add_argument('--turns', type=int, default=500, help="turns per run (runs also stop on extinction)")
+    parser.add_argument('--repeat', type=int, default=REPEAT,
+                        help="timed passes per seed; each tick counts at its fastest pass (default: {})".format(REPEAT))
+    parser.add_argument('--agents', type=int, default=None, help="starting agents (default: the legacy STARTING_AGENTS)")
+    parser.add_argument('--food', type=int, default=None, help="starting food (default: the legacy STARTING_FOOD)")
+    parser.add_argument('--wood', type=int, default=None, help="starting wood (default: the legacy STARTING_WOOD)")
+    parser.add_argument('--save', metavar='PATH', help="write the results to PATH as a JSON reference")
+    parser.add_argument('--compare', metavar='PATH', nargs='?', const=REFERENCE_PATH,
+                        help="compare against a reference written by --save (default: legacy_reference.json)")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="growth in cost relative to legacy counted as a regression (default: 0.10)")
+    args = parser.parse_args()
+
+    reference = None
+    if args.compare:
+        with open(args.compare) as f:
+            reference = json.load(f)
+
+    seeds = [int(seed) for seed in args.seeds.split(',') if seed.strip()]
+    current = run_ladder(seeds, args.turns, args.repeat, args.agents, args.food, args.wood)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=2)
+    if reference is not None:
+        print()
+        regressions = compare(reference, current, args.threshold)
+        if regressions:
+            print("\nRegressions: {}".format(', '.join(regressions)))
+            sys.exit(1)
+        print("\nNo regressions.")
@@ -1,8 +1,19 @@
 # -*- coding: utf-8 -*-
 import time
 import os
+import sys
 import random
 import math
+import json
+import argparse
+import base64
+import struct
+import zlib
+import dataclasses
+import heapq
+from array import array
+from collections import deque
+from collections.abc import Mapping
 
 # --- SIMULATION LIFE STAGE CONSTANTS ---
 ADULT_AGE = 300
@@ -110,6 +121,12 @@ except ImportError:
     Style = DummyStyle()
     COLOR_ENABLED = False
 
+# --- Optional NumPy (only needed for the vectorized needs pass) ---
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 # --- SIMULATION PARAMETERS (User's "Hardcore" settings) ---
 WORLD_WIDTH = 70
@@ -159,7 +176,45 @@ HOME_DECAY_RATE = 400
 # --- END NEW ---
 
 # How fast the simulation runs
-SIM_SPEED = 0.15  
+SIM_SPEED = 0.15
+
+# --- SPATIAL INDEX PARAMETERS ---
+AGENT_GRID_CELL_SIZE = 8 # Tiles per side of a spatial hash cell (close to the max vision gene)
+RESOURCE_GRID_CELL_SIZE = 8 # Same, for the per-resource indexes (food, wood, fruits, campfires, homes)
+DISK_SCAN_MAX_RADIUS = 3 # Radius up to which nearby lookups walk a disk offset table over the tile grids instead
+
+# --- VECTORIZED NEEDS PASS ---
+# When True (and NumPy is installed) the age/metabolism/social/love bookkeeping
+# runs for the whole population in one array pass at the start of each turn,
+# instead of inside each agent's update. Every agent then sees the population as
+# it was at the start of the turn, so seeded runs differ from the per-agent path.
+VECTORIZED_NEEDS = False
+
+# --- PATHFINDING ---
+# When True, move_towards() follows an A* path around campfires and other
+# agents' homes instead of stepping straight at the target and sliding.
+PATHFINDING = True
+PATH_SEARCH_LIMIT = 4000 # Tiles A* may expand per search before giving up (then agents step greedily)
+FLOW_FIELD_RADIUS = 20 # Reach of the shared flow fields towards the library, homes and campfires (0 = none)
+FLOW_FIELD_MIN_AGENTS = 3 # Distinct agents that must head for a destination before it gets a flow field
+
+# --- SUBSYSTEMS ---
+# The systems added on top of the original simulation (life_simulationold.py).
+# Switching one off skips its work entirely; legacy_compare.py uses this to
+# measure what each one costs per tick.
+FRUITS_ENABLED = True # Fruit bushes: starting/spawned bushes and agents looking for them
+VENGEANCE_ENABLED = True # Witnesses of a child's death go AVENGING
+ENVIRONMENT_ENABLED = True # Environmental health: sickness, overpopulation decay, food yield
+LIBRARY_ENABLED = True # Global skill knowledge and agents seeking the library
+
+# --- PROFILING ---
+PROFILE_WINDOW = 1000 # Turns of per-phase timings kept for the rolling percentiles
+
+# --- RUNNING STATS ---
+STATS_RECOUNT_EVERY = 500 # Turns between exact recounts of the running gene/skill sums (0 = never)
+
+# --- CHECKPOINTS ---
+AUTOSAVE_EVERY = 1000 # Turns between autosaves when an autosave path is given
 
 # --- GENE PARAMETERS (Min, Max, Mutation Rate) ---
 GENE_RANGES = {
@@ -175,6 +230,161 @@ GENE_RANGES = {
     'navigation': (0.0, 3.0, 0.1)
 }
 
+# Fixed orders used by the compact gene/skill vectors (see VectorView)
+GENE_NAMES = tuple(GENE_RANGES)
+SKILL_NAMES = ('foraging', 'social', 'building', 'navigation', 'combat', 'farming')
+
+# --- SIMULATION CONFIG ---
+
+class GeneRanges(Mapping):
+    """
+    Read-only gene -> (min, max, mutation rate) table for SimConfig. Unlike a
+    dict it is hashable and can't be changed in place, so configs sharing it
+    stay independent; it pickles as its (gene, range) pairs.
+    """
+    __slots__ = ('_pairs', '_lookup')
+
+    def __init__(self, ranges):
+        pairs = tuple((gene, tuple(values)) for gene, values in dict(ranges).items())
+        object.__setattr__(self, '_pairs', pairs)
+        object.__setattr__(self, '_lookup', dict(pairs))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GeneRanges is read-only")
+
+    def __getitem__(self, gene):
+        return self._lookup[gene]
+
+    def __iter__(self):
+        return iter(self._lookup)
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def __hash__(self):
+        return hash(self._pairs)
+
+    def __reduce__(self):
+        return (GeneRanges, (self._pairs,))
+
+    def __repr__(self):
+        return 'GeneRanges({!r})'.format(self._lookup)
+
+@dataclasses.dataclass(frozen=True)
+class SimConfig:
+    """
+    Every tunable parameter a World reads, defaulting to the constants above.
+    Each World holds its own (world.config), so worlds with different settings
+    can run side by side in one process, e.g.
+    World(70, 30, config=SimConfig(FOOD_SPAWN_RATE=10)).
+    """
+    # Life stages, love and pausing
+    ADULT_AGE: int = ADULT_AGE
+    OLD_AGE: int = OLD_AGE
+    MAX_AGE: int = MAX_AGE
+    STARTING_LOVE: float = STARTING_LOVE
+    LOVE_GAIN_EAT: float = LOVE_GAIN_EAT
+    LOVE_GAIN_SOCIAL: float = LOVE_GAIN_SOCIAL
+    LOVE_GAIN_REST: float = LOVE_GAIN_REST
+    LOVE_LOSS_STRUGGLE: float = LOVE_LOSS_STRUGGLE
+    PASSIVE_LOVE_GAIN: float = PASSIVE_LOVE_GAIN
+    PAUSE_ENERGY_THRESHOLD: float = PAUSE_ENERGY_THRESHOLD
+    PAUSE_SOCIAL_THRESHOLD: float = PAUSE_SOCIAL_THRESHOLD
+
+    # Environment, apathy and vengeance
+    ENV_HEALTH_MAX: float = ENV_HEALTH_MAX
+    ENV_PASSIVE_RECOVERY_RATE: float = ENV_PASSIVE_RECOVERY_RATE
+    ENV_DECAY_FOOD_GATHER: float = ENV_DECAY_FOOD_GATHER
+    ENV_DECAY_WOOD_GATHER: float = ENV_DECAY_WOOD_GATHER
+    ENV_HEAL_PLANT_BASE: float = ENV_HEAL_PLANT_BASE
+    ENV_DECAY_CAMPFIRE_POLLUTION: float = ENV_DECAY_CAMPFIRE_POLLUTION
+    ENV_OVERPOPULATION_RADIUS: int = ENV_OVERPOPULATION_RADIUS
+    ENV_OVERPOPULATION_THRESHOLD: int = ENV_OVERPOPULATION_THRESHOLD
+    ENV_OVERPOPULATION_DECAY: float = ENV_OVERPOPULATION_DECAY
+    ENV_SICKNESS_THRESHOLD: float = ENV_SICKNESS_THRESHOLD
+    ENV_SICKNESS_CHANCE: float = ENV_SICKNESS_CHANCE
+    ENV_SICKNESS_DURATION: int = ENV_SICKNESS_DURATION
+    ENV_SICKNESS_METABOLISM_PENALTY: float = ENV_SICKNESS_METABOLISM_PENALTY
+    APATHY_DURATION: int = APATHY_DURATION
+    APATHY_METABOLISM_PENALTY: float = APATHY_METABOLISM_PENALTY
+    APATHY_SOCIAL_LOSS_MULTIPLIER: float = APATHY_SOCIAL_LOSS_MULTIPLIER
+    VENGEANCE_DURATION: int = VENGEANCE_DURATION
+
+    # Population targets, food energy and carrying limits
+    MIN_POPULATION_TARGET: int = MIN_POPULATION_TARGET
+    CRITICAL_FOOD_COUNT: int = CRITICAL_FOOD_COUNT
+    MAX_POPULATION_TARGET: int = MAX_POPULATION_TARGET
+    FOOD_BASE_ENERGY_VALUE: float = FOOD_BASE_ENERGY_VALUE
+    MAX_FOOD_SEEDS_CARRIED: int = MAX_FOOD_SEEDS_CARRIED
+    STARTING_FOOD_SEEDS_MAX: int = STARTING_FOOD_SEEDS_MAX
+    MAX_WOOD_SEEDS_CARRIED: int = MAX_WOOD_SEEDS_CARRIED
+    STARTING_WOOD_SEEDS_MAX: int = STARTING_WOOD_SEEDS_MAX
+    MAX_FRUIT_CARRIED: int = MAX_FRUIT_CARRIED
+    STARTING_FRUIT_SEEDS_MAX: int = STARTING_FRUIT_SEEDS_MAX
+
+    # Starting world and resource spawning
+    STARTING_AGENTS: int = STARTING_AGENTS
+    STARTING_FOOD: int = STARTING_FOOD
+    STARTING_WOOD: int = STARTING_WOOD
+    FOOD_SPAWN_RATE: int = FOOD_SPAWN_RATE
+    WOOD_SPAWN_RATE: int = WOOD_SPAWN_RATE
+    STARTING_FRUIT_BUSHES: int = STARTING_FRUIT_BUSHES
+    FRUIT_SPAWN_RATE: int = FRUIT_SPAWN_RATE
+
+    # Fruit, farming, trees, campfires and homes
+    FRUIT_GROW_TIME: int = FRUIT_GROW_TIME
+    FRUIT_SEED_BASE_CHANCE: float = FRUIT_SEED_BASE_CHANCE
+    FRUIT_BENEFIT_ENERGY_VAL: float = FRUIT_BENEFIT_ENERGY_VAL
+    FRUIT_BENEFIT_SOCIAL_ENERGY_VAL: float = FRUIT_BENEFIT_SOCIAL_ENERGY_VAL
+    FRUIT_BENEFIT_SOCIAL_SOCIAL_VAL: float = FRUIT_BENEFIT_SOCIAL_SOCIAL_VAL
+    FRUIT_BENEFIT_SPEED_ENERGY_VAL: float = FRUIT_BENEFIT_SPEED_ENERGY_VAL
+    FRUIT_BENEFIT_SPEED_DURATION: int = FRUIT_BENEFIT_SPEED_DURATION
+    FOOD_FRESHNESS: int = FOOD_FRESHNESS
+    GROW_TIME: int = GROW_TIME
+    TREE_GROW_TIME: int = TREE_GROW_TIME
+    WOOD_SEED_CHANCE: float = WOOD_SEED_CHANCE
+    FOOD_SEED_BASE_CHANCE: float = FOOD_SEED_BASE_CHANCE
+    CAMPFIRE_BURN_TIME: int = CAMPFIRE_BURN_TIME
+    CAMPFIRE_WOOD_COST: int = CAMPFIRE_WOOD_COST
+    CAMPFIRE_REFUEL_THRESHOLD: int = CAMPFIRE_REFUEL_THRESHOLD
+    HOME_DURABILITY_START: int = HOME_DURABILITY_START
+    HOME_DECAY_RATE: int = HOME_DECAY_RATE
+
+    # Engine
+    AGENT_GRID_CELL_SIZE: int = AGENT_GRID_CELL_SIZE
+    RESOURCE_GRID_CELL_SIZE: int = RESOURCE_GRID_CELL_SIZE
+    DISK_SCAN_MAX_RADIUS: float = DISK_SCAN_MAX_RADIUS
+    VECTORIZED_NEEDS: bool = VECTORIZED_NEEDS
+    STATS_RECOUNT_EVERY: int = STATS_RECOUNT_EVERY
+    PATHFINDING: bool = PATHFINDING
+    PATH_SEARCH_LIMIT: int = PATH_SEARCH_LIMIT
+    FLOW_FIELD_RADIUS: int = FLOW_FIELD_RADIUS
+    FLOW_FIELD_MIN_AGENTS: int = FLOW_FIELD_MIN_AGENTS
+
+    # Subsystems
+    FRUITS_ENABLED: bool = FRUITS_ENABLED
+    VENGEANCE_ENABLED: bool = VENGEANCE_ENABLED
+    ENVIRONMENT_ENABLED: bool = ENVIRONMENT_ENABLED
+    LIBRARY_ENABLED: bool = LIBRARY_ENABLED
+
+    # gene -> (min, max, mutation rate), keys must stay GENE_NAMES; any mapping is stored as GeneRanges
+    GENE_RANGES: GeneRanges = dataclasses.field(default_factory=lambda: GeneRanges(GENE_RANGES))
+
+    def __post_init__(self):
+        object.__setattr__(self, 'GENE_RANGES', GeneRanges(self.GENE_RANGES))
+        if tuple(self.GENE_RANGES) != GENE_NAMES:
+            raise ValueError("GENE_RANGES must list exactly these genes, in this order: {}".format(", ".join(GENE_NAMES)))
+
+    def replace(self, **changes):
+        """Returns a copy with some fields changed (the config itself is frozen)."""
+        return dataclasses.replace(self, **changes)
+
+    def as_dict(self):
+        """Plain dict of every field (used by checkpoints); GENE_RANGES becomes a plain dict too."""
+        fields = {field.name: getattr(self, field.name) for field in dataclasses.fields(self)}
+        fields['GENE_RANGES'] = dict(self.GENE_RANGES)
+        return fields
+
 # --- HELPER FUNCTIONS ---
 
 def clear_screen():
@@ -187,21 +397,778 @@ def clamp(value, min_val, max_val):
     """Clamps a value between a min and max."""
     return max(min_val, min(value, max_val))
 
+def join_frame(header, grid, lines):
+    """Joins a World.build_frame() frame into one full-screen redraw string."""
+    output_buffer = ["\033[H", header]
+    for row in grid:
+        output_buffer.append(" ".join(row)) 
+    output_buffer.extend(lines)
+    return "\n".join(output_buffer) + Style.RESET_ALL
+
 def get_distance(x1, y1, x2, y2):
     """
     Calculates Euclidean distance.
     """
     return math.sqrt((x1 - x2)**2 + (y1 - y2)**2)
 
+# --- RANDOM STREAMS ---
+
+MASK64 = (1 << 64) - 1
+
+def mix64(z):
+    """SplitMix64 finalizer: scrambles a 64-bit integer."""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+def derive_seed(seed, *tags):
+    """
+    Derives an independent 64-bit seed from a root seed and a path of tags,
+    e.g. derive_seed(world_seed, 'agent', 17). Strings are hashed with crc32.
+    """
+    state = mix64(seed & MASK64)
+    for tag in tags:
+        if isinstance(tag, str):
+            tag = zlib.crc32(tag.encode('utf-8'))
+        state = mix64((state + 0x9E3779B97F4A7C15 + (tag & MASK64)) & MASK64)
+    return state
+
+class RandomStream:
+    """
+    A small SplitMix64 generator with the parts of the `random` API the
+    simulation uses. Its whole state is one integer, so every agent can own
+    a stream without the ~2.5 KB of a random.Random instance.
+    """
+    __slots__ = ('state',)
+
+    def __init__(self, seed):
+        self.state = seed & MASK64
+
+    def next64(self):
+        self.state = (self.state + 0x9E3779B97F4A7C15) & MASK64
+        return mix64(self.state)
+
+    def random(self):
+        """Float in [0.0, 1.0)."""
+        return (self.next64() >> 11) * (1.0 / 9007199254740992.0)
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.random()
+
+    def below(self, n):
+        """Integer in [0, n)."""
+        return (self.next64() * n) >> 64
+
+    def randint(self, a, b):
+        """Integer in [a, b], both ends included."""
+        return a + self.below(b - a + 1)
+
+    def choice(self, seq):
+        if not seq:
+            raise IndexError('Cannot choose from an empty sequence')
+        return seq[self.below(len(seq))]
+
+    def spawn(self):
+        """A new independent stream seeded from this one (e.g. for a child)."""
+        return RandomStream(mix64(self.next64() ^ 0xD1B54A32D192ED03))
+
+# --- SPATIAL INDEX ---
+
+class SpatialHash:
+    """
+    Buckets items into square cells of `cell_size` tiles so that radius
+    queries only touch the cells overlapping the search area.
+    """
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {} # (cell_x, cell_y) -> set of items
+        self.bounds = None # (min_cx, min_cy, max_cx, max_cy) of every cell ever used
+
+    def insert(self, item, x, y):
+        cell = (x // self.cell_size, y // self.cell_size)
+        bucket = self.cells.get(cell)
+        if bucket is None:
+            bucket = self.cells[cell] = set()
+            cx, cy = cell
+            if self.bounds is None:
+                self.bounds = (cx, cy, cx, cy)
+            else:
+                min_cx, min_cy, max_cx, max_cy = self.bounds
+                if cx < min_cx or cy < min_cy or cx > max_cx or cy > max_cy:
+                    self.bounds = (min(cx, min_cx), min(cy, min_cy), max(cx, max_cx), max(cy, max_cy))
+        bucket.add(item)
+
+    def remove(self, item, x, y):
+        cell = (x // self.cell_size, y // self.cell_size)
+        bucket = self.cells.get(cell)
+        if bucket is not None:
+            bucket.discard(item)
+            if not bucket:
+                del self.cells[cell]
+
+    def move(self, item, old_x, old_y, new_x, new_y):
+        """Re-buckets an item, doing nothing if it stays inside the same cell."""
+        size = self.cell_size
+        if old_x // size == new_x // size and old_y // size == new_y // size:
+            return
+        self.remove(item, old_x, old_y)
+        self.insert(item, new_x, new_y)
+
+    def query(self, x, y, radius):
+        """Yields every item stored in a cell that overlaps the square around (x, y)."""
+        size = self.cell_size
+        min_cx = int(math.floor((x - radius) / size))
+        max_cx = int(math.floor((x + radius) / size))
+        min_cy = int(math.floor((y - radius) / size))
+        max_cy = int(math.floor((y + radius) / size))
+
+        # Huge radii (e.g. "anywhere in the world") are cheaper to answer from the occupied cells
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self.cells):
+            for (cx, cy), bucket in self.cells.items():
+                if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy:
+                    yield from bucket
+            return
+
+        cells = self.cells
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    yield from bucket
+
+    def nearest_point(self, x, y, radius):
+        """
+        Finds the nearest (x, y) tuple item within `radius`, searching rings of
+        cells outwards and stopping once no closer item can exist.
+        Ties are broken by the smaller position.
+        """
+        if not self.cells:
+            return None
+
+        size = self.cell_size
+        cx0 = x // size
+        cy0 = y // size
+        min_cx, min_cy, max_cx, max_cy = self.bounds
+        max_ring = max(cx0 - min_cx, max_cx - cx0, cy0 - min_cy, max_cy - cy0)
+
+        cells = self.cells
+        best = None
+        best_d2 = radius * radius
+
+        for ring in range(max_ring + 1):
+            if ring > 0:
+                # Anything in this ring is at least this far away on one axis
+                gap = (ring - 1) * size + 1
+                if gap > radius or (best is not None and gap * gap > best_d2):
+                    break
+                ring_cells = []
+                for cx in range(cx0 - ring, cx0 + ring + 1):
+                    ring_cells.append((cx, cy0 - ring))
+                    ring_cells.append((cx, cy0 + ring))
+                for cy in range(cy0 - ring + 1, cy0 + ring):
+                    ring_cells.append((cx0 - ring, cy))
+                    ring_cells.append((cx0 + ring, cy))
+            else:
+                ring_cells = [(cx0, cy0)]
+
+            for cell in ring_cells:
+                bucket = cells.get(cell)
+                if not bucket:
+                    continue
+                for item in bucket:
+                    ix, iy = item
+                    d2 = (ix - x) * (ix - x) + (iy - y) * (iy - y)
+                    if d2 < best_d2 or (d2 == best_d2 and (best is None or item < best)):
+                        best = item
+                        best_d2 = d2
+        return best
+
+    def clear(self):
+        self.cells.clear()
+        self.bounds = None
+
+# --- PATHFINDING ---
+
+# 8-connected moves, in the order neighbours are expanded
+PATH_MOVES = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+def find_path(start, goal, width, height, is_blocked, limit):
+    """
+    A* from `start` to `goal` over the 8-connected grid. Every move takes one
+    step, so the Chebyshev distance is the heuristic. `is_blocked(pos)` marks
+    impassable tiles; the goal itself is always allowed, so a path can end at
+    a campfire or a home. Returns the list of tiles after `start` up to
+    `goal`, or None if there is no path or more than `limit` tiles were expanded.
+    """
+    if start == goal:
+        return []
+    gx, gy = goal
+    came_from = {start: None}
+    cost = {start: 0}
+    h = max(abs(start[0] - gx), abs(start[1] - gy))
+    heap = [(h, h, 0, start)] # (f, h, push order, tile): ties go to the tile nearest the goal, then FIFO
+    closed = set()
+    pushed = 0
+    while heap:
+        _, _, _, current = heapq.heappop(heap)
+        if current in closed:
+            continue # A stale entry, the tile was reached more cheaply since
+        if current == goal:
+            path = []
+            while current != start:
+                path.append(current)
+                current = came_from[current]
+            path.reverse()
+            return path
+        closed.add(current)
+        if len(closed) > limit:
+            return None
+        x, y = current
+        step_cost = cost[current] + 1
+        for dx, dy in PATH_MOVES:
+            nx, ny = x + dx, y + dy
+            if nx < 0 or ny < 0 or nx >= width or ny >= height:
+                continue
+            neighbour = (nx, ny)
+            if step_cost >= cost.get(neighbour, step_cost + 1):
+                continue
+            if neighbour != goal and is_blocked(neighbour):
+                continue
+            cost[neighbour] = step_cost
+            came_from[neighbour] = current
+            h = max(abs(nx - gx), abs(ny - gy))
+            pushed += 1
+            heapq.heappush(heap, (step_cost + h, h, pushed, neighbour))
+    return None
+
+class FlowField:
+    """
+    The next step towards one destination from every tile within `radius` of
+    it: a BFS outwards from the destination around campfires and owned homes,
+    shared by every agent heading there. Other agents' homes are obstacles
+    to everyone but their owner, so the field treats all owned homes as walls.
+    Blocked tiles still get a step, so an agent standing on one can leave.
+    Tiles are flat indexes into the window plus a one-tile border, so the
+    BFS needs no bounds checks.
+    """
+    __slots__ = ('goal', 'x0', 'y0', 'x1', 'y1', 'stride', 'next_index')
+
+    def __init__(self, world, goal, radius):
+        gx, gy = goal
+        self.goal = goal
+        self.x0, self.y0 = x0, y0 = max(0, gx - radius), max(0, gy - radius)
+        self.x1, self.y1 = x1, y1 = min(world.width - 1, gx + radius), min(world.height - 1, gy + radius)
+        self.stride = stride = x1 - x0 + 3
+        rows = y1 - y0 + 3
+        index_of = lambda x, y: (y - y0 + 1) * stride + (x - x0 + 1)
+
+        # 0 = open, 1 = wall (gets a step but is not expanded), 2 = border
+        kind = bytearray(stride * rows)
+        kind[:stride] = kind[-stride:] = b'\x02' * stride
+        kind[::stride] = kind[stride - 1::stride] = b'\x02' * rows
+        for pos in world.resource_grids['campfires'].query(gx, gy, radius):
+            if x0 <= pos[0] <= x1 and y0 <= pos[1] <= y1:
+                kind[index_of(pos[0], pos[1])] = 1
+        for pos in world.resource_grids['homes'].query(gx, gy, radius):
+            if x0 <= pos[0] <= x1 and y0 <= pos[1] <= y1 and world.homes[pos]['owner_id'] is not None:
+                kind[index_of(pos[0], pos[1])] = 1
+
+        offsets = [dy * stride + dx for dx, dy in PATH_MOVES]
+        next_index = array('i', [-1]) * (stride * rows)
+        start = index_of(gx, gy)
+        next_index[start] = start
+        queue = deque([start])
+        while queue:
+            here = queue.popleft()
+            for offset in offsets:
+                index = here + offset
+                if next_index[index] != -1 or kind[index] == 2:
+                    continue
+                next_index[index] = here
+                if not kind[index]:
+                    queue.append(index)
+        self.next_index = next_index
+
+    def covers(self, x, y):
+        return self.x0 <= x <= self.x1 and self.y0 <= y <= self.y1
+
+    def step_from(self, x, y):
+        """The next tile from (x, y), or None if outside the field, cut off, or at the goal."""
+        if not (self.x0 <= x <= self.x1 and self.y0 <= y <= self.y1) or (x, y) == self.goal:
+            return None
+        stride = self.stride
+        index = self.next_index[(y - self.y0 + 1) * stride + (x - self.x0 + 1)]
+        if index == -1:
+            return None
+        return (self.x0 - 1 + index % stride, self.y0 - 1 + index // stride)
+
+# --- TILE KINDS ---
+
+# Bits of World.tile_kinds, one byte per tile. A tile can hold several (an
+# agent dying on its food drops wood there too); 0 means nothing is on it.
+TILE_FOOD = 1
+TILE_WOOD = 2
+TILE_FRUIT = 4
+TILE_GROWING = 8 # A growing plant, tree or fruit bush (its timer dict says which)
+TILE_CAMPFIRE = 16
+TILE_HOME = 32
+TILE_LIBRARY = 64
+
+# set_timer() kind -> the tile bit it marks (food timers only track freshness)
+TIMER_TILE_KINDS = {'plant': TILE_GROWING, 'tree': TILE_GROWING, 'bush': TILE_GROWING, 'food': 0, 'campfire': TILE_CAMPFIRE}
+# Indexed resource name (World.resource_grids) -> its tile bit
+RESOURCE_TILE_KINDS = {'food': TILE_FOOD, 'wood': TILE_WOOD, 'fruits': TILE_FRUIT, 'campfires': TILE_CAMPFIRE, 'homes': TILE_HOME}
+
+# --- DISK OFFSETS ---
+
+disk_tables = {} # (radius, strict) -> offsets, see disk_offsets()
+
+def disk_offsets(radius, strict=False):
+    """
+    The (dx, dy) offsets of every tile within `radius` of a tile (closer than
+    it with `strict`), nearest first and ties in (dx, dy) order, so the first
+    hit of a scan is the nearest tile with the smallest position. Built once
+    per radius, with integer distances only.
+    """
+    table = disk_tables.get((radius, strict))
+    if table is None:
+        reach = int(radius)
+        radius_sq = radius * radius
+        offsets = []
+        for dx in range(-reach, reach + 1):
+            for dy in range(-reach, reach + 1):
+                dist_sq = dx * dx + dy * dy
+                if dist_sq < radius_sq or (dist_sq == radius_sq and not strict):
+                    offsets.append((dist_sq, dx, dy))
+        offsets.sort()
+        table = disk_tables[radius, strict] = tuple((dx, dy) for _, dx, dy in offsets)
+    return table
+
+# The "next to", campfire and small-circle radii of decide_state/execute_action
+for radius in (1.5, 2, 3):
+    disk_offsets(radius)
+
+# --- FREE TILES ---
+
+class TileSet:
+    """
+    A set of tiles with O(1) add, discard and uniform random choice. Tiles
+    are stored as flat indexes (y * width + x) in a members array, next to
+    each tile's slot in it (-1 = not a member).
+    """
+    __slots__ = ('width', 'members', 'slot')
+
+    def __init__(self, width, height):
+        self.width = width
+        self.members = array('i')
+        self.slot = array('i', [-1]) * (width * height)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, pos):
+        return self.slot[pos[1] * self.width + pos[0]] != -1
+
+    def fill(self):
+        """Makes every tile a member."""
+        self.members = array('i', range(len(self.slot)))
+        self.slot = array('i', self.members)
+
+    def add(self, pos):
+        index = pos[1] * self.width + pos[0]
+        if self.slot[index] == -1:
+            self.slot[index] = len(self.members)
+            self.members.append(index)
+
+    def discard(self, pos):
+        """Removes a tile by moving the last member into its slot."""
+        index = pos[1] * self.width + pos[0]
+        where = self.slot[index]
+        if where != -1:
+            last = self.members.pop()
+            if last != index:
+                self.members[where] = last
+                self.slot[last] = where
+            self.slot[index] = -1
+
+    def choice(self, rng):
+        """A uniformly random member, or None if the set is empty."""
+        if not self.members:
+            return None
+        index = self.members[rng.below(len(self.members))]
+        return (index % self.width, index // self.width)
+
+    def sample(self, rng, k):
+        """
+        Up to `k` distinct members, uniformly at random: a partial
+        Fisher-Yates shuffle of the members array, in place.
+        """
+        members, slot, width = self.members, self.slot, self.width
+        picked = []
+        for i in range(min(k, len(members))):
+            j = i + rng.below(len(members) - i)
+            a, b = members[i], members[j]
+            members[i], members[j] = b, a
+            slot[b], slot[a] = i, j
+            picked.append((b % width, b // width))
+        return picked
+
+    def state(self):
+        return self.members.tobytes()
+
+    def set_state(self, state):
+        self.members = array('i')
+        self.members.frombytes(state)
+        slot = [-1] * len(self.slot)
+        for where, index in enumerate(self.members):
+            slot[index] = where
+        self.slot = array('i', slot)
+
+# --- TIMER WHEEL ---
+
+class TimerWheel:
+    """
+    Buckets scheduled keys by the turn they fall due, so a tick only touches
+    what actually expires. Rescheduling just adds a new entry: owners check an
+    entry is still current when it pops and skip it otherwise.
+    """
+    def __init__(self):
+        self.buckets = {} # due turn -> list of keys
+
+    def schedule(self, due_turn, key):
+        bucket = self.buckets.get(due_turn)
+        if bucket is None:
+            bucket = self.buckets[due_turn] = []
+        bucket.append(key)
+
+    def pop_due(self, turn):
+        """Removes and returns every key scheduled for this turn."""
+        return self.buckets.pop(turn, [])
+
+    def clear(self):
+        self.buckets.clear()
+
+# --- AGENT TIMERS ---
+
+class TurnTimer:
+    """
+    An agent buff/debuff/cooldown stored as the world turn it expires on.
+    Reading it gives the turns left (0 once expired) and assigning N starts
+    an N-turn countdown, so nothing has to be decremented each tick.
+    If `on_expire` names an Agent method, the world's agent timer wheel calls
+    it on the turn the countdown runs out.
+    """
+    def __init__(self, on_expire=None):
+        self.on_expire = on_expire
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.attr = '_{}_until'.format(name)
+
+    def __get__(self, agent, owner=None):
+        if agent is None:
+            return self
+        left = getattr(agent, self.attr) - agent.world.turn
+        return left if left > 0 else 0
+
+    def __set__(self, agent, value):
+        until = agent.world.turn + value
+        setattr(agent, self.attr, until)
+        if self.on_expire is not None and value > 0:
+            agent.world.agent_timers.schedule(until, (agent.id, self.name))
+
+# --- COMPACT AGENT STORAGE ---
+
+class VectorView:
+    """
+    Dict-like view over a fixed-order array('d') of named values, so
+    `agent.genes['vision']` keeps working while each agent stores one
+    flat array instead of a dict of float objects.
+    """
+    __slots__ = ('vector',)
+    NAMES = ()
+    INDEX = {}
+
+    def __init__(self, vector=None):
+        if vector is None:
+            vector = array('d', bytes(8 * len(self.NAMES)))
+        self.vector = vector
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        """Builds a view from a dict (or another view) holding every name."""
+        if isinstance(mapping, cls):
+            return cls(array('d', mapping.vector))
+        return cls(array('d', [mapping[name] for name in cls.NAMES]))
+
+    def __getitem__(self, name):
+        return self.vector[self.INDEX[name]]
+
+    def __setitem__(self, name, value):
+        self.vector[self.INDEX[name]] = value
+
+    def get(self, name, default=None):
+        index = self.INDEX.get(name)
+        if index is None:
+            return default
+        return self.vector[index]
+
+    def __contains__(self, name):
+        return name in self.INDEX
+
+    def __iter__(self):
+        return iter(self.NAMES)
+
+    def __len__(self):
+        return len(self.NAMES)
+
+    def keys(self):
+        return self.NAMES
+
+    def values(self):
+        return list(self.vector)
+
+    def items(self):
+        return list(zip(self.NAMES, self.vector))
+
+    def to_dict(self):
+        return dict(zip(self.NAMES, self.vector))
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, self.to_dict())
+
+class GeneView(VectorView):
+    """Genes in GENE_RANGES order."""
+    __slots__ = ()
+    NAMES = GENE_NAMES
+    INDEX = {name: i for i, name in enumerate(GENE_NAMES)}
+
+class SkillView(VectorView):
+    """
+    Skills in SKILL_NAMES order. Every change is also added to the running
+    sums in `totals` (set by PopulationStats while the agent is alive).
+    """
+    __slots__ = ('totals',)
+    NAMES = SKILL_NAMES
+    INDEX = {name: i for i, name in enumerate(SKILL_NAMES)}
+
+    def __init__(self, vector=None):
+        VectorView.__init__(self, vector)
+        self.totals = ()
+
+    def __setitem__(self, name, value):
+        self.set_at(self.INDEX[name], value)
+
+    def set_at(self, index, value):
+        vector = self.vector
+        delta = value - vector[index]
+        vector[index] = value
+        for sums in self.totals:
+            sums[index] += delta
+
+class AgentMemory:
+    """
+    An agent's memory, used like the old dict (`memory['food']`,
+    `memory.get('global_news', {})`) but each container is only created the
+    first time it is asked for, so agents that never remember anything stay small.
+    """
+    __slots__ = ('food', 'wood', 'fruit', 'library', 'global_news')
+    SET_KEYS = ('food', 'wood', 'fruit')
+
+    def __init__(self):
+        self.food = None
+        self.wood = None
+        self.fruit = None
+        self.library = None
+        self.global_news = None
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None:
+            if key in self.SET_KEYS:
+                value = set()
+            elif key == 'global_news':
+                value = {}
+            else:
+                return None
+            setattr(self, key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def get(self, key, default=None):
+        """Returns the stored value without creating it."""
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def forget(self, key, pos):
+        """Drops a remembered position, if that memory set exists."""
+        remembered = getattr(self, key)
+        if remembered:
+            remembered.discard(pos)
+
+    def setdefault(self, key, default=None):
+        value = self.get(key)
+        if value is None:
+            self[key] = value = default
+        return value
+
+NO_IDS = frozenset() # Shared empty parent set
+
+# --- AGENT REGISTRY ---
+
+class AgentRegistry:
+    """
+    The living agents, keyed by id. Iterates in insertion order (which is
+    ascending id order), with O(1) lookup, membership and removal.
+    """
+    def __init__(self):
+        self.by_id = {}
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __contains__(self, agent):
+        return self.by_id.get(agent.id) is agent
+
+    def add(self, agent):
+        self.by_id[agent.id] = agent
+
+    def remove(self, agent):
+        del self.by_id[agent.id]
+
+    def get(self, agent_id):
+        """Returns the agent with this id, or None."""
+        return self.by_id.get(agent_id)
+
+class PopulationStats:
+    """
+    Running gene and skill sums over every living agent and over the adults,
+    so World.calculate_stats() doesn't re-sum the whole population each turn.
+    World calls add()/remove() as agents are born and die and come_of_age()
+    when one reaches ADULT_AGE; skill changes arrive through SkillView.totals.
+    recount() redoes the sums exactly, to clear floating-point drift.
+    """
+    GENE_KEYS = tuple('avg_{}'.format(gene) for gene in GENE_NAMES)
+    SKILL_KEYS = tuple('avg_{}_skill'.format(skill) for skill in SKILL_NAMES)
+
+    def __init__(self, adult_age):
+        self.adult_age = adult_age
+        # [everyone, adults]
+        self.counts = [0, 0]
+        self.gene_sums = [[0.0] * len(GENE_NAMES), [0.0] * len(GENE_NAMES)]
+        self.skill_sums = [[0.0] * len(SKILL_NAMES), [0.0] * len(SKILL_NAMES)]
+        # What a child's / an adult's SkillView adds its changes to
+        self.child_totals = (self.skill_sums[0],)
+        self.adult_totals = (self.skill_sums[0], self.skill_sums[1])
+
+    def shift(self, cohort, agent, sign):
+        """Adds (sign=1) or subtracts (sign=-1) one agent to/from a cohort's sums."""
+        self.counts[cohort] += sign
+        gene_sums = self.gene_sums[cohort]
+        for index, value in enumerate(agent.genes.vector):
+            gene_sums[index] += sign * value
+        skill_sums = self.skill_sums[cohort]
+        for index, value in enumerate(agent.skills.vector):
+            skill_sums[index] += sign * value
+
+    def add(self, agent):
+        self.shift(0, agent, 1)
+        if agent.age >= self.adult_age:
+            self.shift(1, agent, 1)
+        self.attach(agent)
+
+    def attach(self, agent):
+        """Points an agent's skill changes at its cohort's sums without adding it to them."""
+        if agent.age >= self.adult_age:
+            agent.skills.totals = self.adult_totals
+        else:
+            agent.skills.totals = self.child_totals
+
+    def remove(self, agent):
+        totals = agent.skills.totals
+        if not totals:
+            return
+        self.shift(0, agent, -1)
+        if totals is self.adult_totals:
+            self.shift(1, agent, -1)
+        agent.skills.totals = ()
+
+    def come_of_age(self, agent):
+        if agent.skills.totals is self.child_totals:
+            self.shift(1, agent, 1)
+            agent.skills.totals = self.adult_totals
+
+    def recount(self, agents):
+        """Recomputes every sum from scratch (the lists are reused, SkillViews point at them)."""
+        self.counts[:] = [0, 0]
+        for sums in self.gene_sums + self.skill_sums:
+            sums[:] = [0.0] * len(sums)
+        for agent in agents:
+            self.add(agent)
+
+    def cohort(self):
+        """(count, gene sums, skill sums) of the adults, or of everyone if there are none."""
+        cohort = 1 if self.counts[1] else 0
+        return self.counts[cohort], self.gene_sums[cohort], self.skill_sums[cohort]
+
+    def state(self):
+        return [list(self.counts), [list(s) for s in self.gene_sums], [list(s) for s in self.skill_sums]]
+
+    def set_state(self, state):
+        """Restores state() (after the same agents were add()ed back)."""
+        counts, gene_sums, skill_sums = state
+        self.counts[:] = counts
+        for sums, saved in zip(self.gene_sums + self.skill_sums, gene_sums + skill_sums):
+            sums[:] = saved
+
 # --- AGENT CLASS ---
 
 class Agent:
-    def __init__(self, x, y, world, genes=None):
+    __slots__ = (
+        'world', 'x', 'y', 'char', 'id', 'rng',
+        'energy', 'social', 'love', 'age', 'state',
+        'wood_carried', 'food_carried', 'fruit_carried',
+        'seeds_carried', 'wood_seeds_carried', 'fruit_seeds_carried',
+        'home_location', 'campfire_location', 'exploration_vector', 'path',
+        'memory', 'struggle_timer', 'was_attacked_by', 'avenging_target_id',
+        'children_ids', 'parent_ids', 'skills', 'genes', 'vision_radius',
+        # Expiry turns behind the TurnTimer descriptors below
+        '_social_buff_timer_until', '_contentment_buff_timer_until', '_apathy_timer_until',
+        '_sickness_timer_until', '_speed_buff_timer_until', '_stuck_timer_until',
+        '_mate_cooldown_until', '_vengeance_timer_until',
+    )
+
+    # Buffs, debuffs and cooldowns (turns left, backed by an expiry turn)
+    social_buff_timer = TurnTimer()
+    contentment_buff_timer = TurnTimer()
+    apathy_timer = TurnTimer()
+    sickness_timer = TurnTimer()
+    speed_buff_timer = TurnTimer()
+    stuck_timer = TurnTimer()
+    mate_cooldown = TurnTimer()
+    vengeance_timer = TurnTimer(on_expire='end_vengeance')
+
+    def __init__(self, x, y, world, genes=None, rng=None):
+        config = world.config
         self.world = world
         self.x = x
         self.y = y
         self.char = 'A'
         self.id = self.world.get_next_agent_id() 
+        # Every random choice this agent makes comes from its own stream
+        self.rng = rng if rng is not None else world.make_rng('agent', self.id)
         
         # Physical Needs
         self.energy = 150 
@@ -213,12 +1180,12 @@ class Agent:
         self.mate_cooldown = 0
         
         # --- MODIFIED: Seed Inventory now uses new constants ---
-        self.seeds_carried = random.randint(0, STARTING_FOOD_SEEDS_MAX) 
-        self.wood_seeds_carried = random.randint(0, STARTING_WOOD_SEEDS_MAX) 
-        self.fruit_seeds_carried = random.randint(0, STARTING_FRUIT_SEEDS_MAX) 
+        self.seeds_carried = self.rng.randint(0, config.STARTING_FOOD_SEEDS_MAX) 
+        self.wood_seeds_carried = self.rng.randint(0, config.STARTING_WOOD_SEEDS_MAX) 
+        self.fruit_seeds_carried = self.rng.randint(0, config.STARTING_FRUIT_SEEDS_MAX) 
         # --- END MODIFIED ---
         
-        self.social = random.uniform(30.0, 80.0) 
+        self.social = self.rng.uniform(30.0, 80.0) 
         
         self.home_location = None 
         self.campfire_location = None 
@@ -239,16 +1206,11 @@ class Agent:
         self.exploration_vector = (0, 0) 
         # --- FREEZE FIX: Stuck Timer ---
         self.stuck_timer = 0 # New property to manage deadlock
+        self.path = None # Cached route of move_towards(): (target, obstacle version, tiles, next index)
         # --- END FREEZE FIX ---
         
-        # Agent Memory
-        self.memory = {
-            'food': set(),
-            'wood': set(),
-            'fruit': set(), # NEW: Memory for fruit
-            'library': None, # NEW: Agents must learn the library location
-            'global_news': {} # MODIFIED: Memory for propagating crisis news
-        }
+        # Agent Memory: food/wood/fruit sets, library location and crisis news (created on demand)
+        self.memory = AgentMemory()
         
         # Struggle & Retaliation
         self.struggle_timer = 0 
@@ -262,43 +1224,42 @@ class Agent:
         # Age Tracking and Parental Tracking
         self.age = 0 
         self.children_ids = set() 
-        self.parent_ids = set() # NEW: Track parents
+        self.parent_ids = NO_IDS # NEW: Track parents
         
         # Love System
-        self.love = STARTING_LOVE
+        self.love = config.STARTING_LOVE
         
-        self.skills = {
-            'foraging': 0.0,
-            'social': 0.0,
-            'building': 0.0,
-            'navigation': 0.0,
-            'combat': 0.0,
-            'farming': 0.0 
-        }
+        self.skills = SkillView()
         
         if genes:
-            self.genes = genes
+            self.set_genes(genes)
         else:
-            self.genes = self.create_random_genes(stabilize=True)
+            self.set_genes(self.create_random_genes(stabilize=True))
+
+    def set_genes(self, genes):
+        """Stores genes (a dict or GeneView) as a compact vector and caches derived values."""
+        self.genes = GeneView.from_mapping(genes)
+        self.vision_radius = int(self.genes['vision'])
             
     def create_random_genes(self, stabilize=False):
+        config = self.world.config
         genes = {}
-        for gene, (min_val, max_val, _) in GENE_RANGES.items():
+        for gene, (min_val, max_val, _) in config.GENE_RANGES.items():
             if stabilize:
                 if gene == 'metabolism':
-                    genes[gene] = random.uniform(0.5, 0.8) 
+                    genes[gene] = self.rng.uniform(0.5, 0.8) 
                 elif gene == 'speed':
-                    genes[gene] = random.uniform(1.0, 3.0) 
+                    genes[gene] = self.rng.uniform(1.0, 3.0) 
                 elif gene == 'personality':
                     # Ensure personality starts mostly as Cooperative (1) or Isolated (2)
-                    if random.random() < 0.8:
-                        genes[gene] = random.randint(PERSONALITY_COOPERATIVE, PERSONALITY_ISOLATED)
+                    if self.rng.random() < 0.8:
+                        genes[gene] = self.rng.randint(PERSONALITY_COOPERATIVE, PERSONALITY_ISOLATED)
                     else:
-                        genes[gene] = random.randint(PERSONALITY_JUDGMENTAL, PERSONALITY_AGGRESSIVE_COOPERATOR)
+                        genes[gene] = self.rng.randint(PERSONALITY_JUDGMENTAL, PERSONALITY_AGGRESSIVE_COOPERATOR)
                 else:
-                    genes[gene] = random.uniform(min_val, max_val)
+                    genes[gene] = self.rng.uniform(min_val, max_val)
             else:
-                genes[gene] = random.uniform(min_val, max_val)
+                genes[gene] = self.rng.uniform(min_val, max_val)
         return genes
 
     def get_personality(self):
@@ -306,20 +1267,41 @@ class Agent:
         # The gene value is clamped to an integer between 1 and 4
         return int(clamp(self.genes.get('personality', 1), 1, 4))
 
+    def end_vengeance(self):
+        """Called by the world when the vengeance timer runs out."""
+        self.avenging_target_id = None # Timer ran out, stop avenging
 
     def update(self):
         """The main "think" loop for the agent."""
+        if not self.update_needs():
+            return
+
+        # 4. Decide what to do
+        self.decide_state() 
+        
+        # 5. Execute the action
+        self.execute_action()
+
+    def update_needs(self):
+        """
+        Ages the agent and applies metabolism, social and love bookkeeping.
+        Returns False if the agent died. PopulationStore.update_needs() is
+        the vectorized version of this method.
+        """
+        config = self.world.config
         
         # 1. Update Age and Check for Death
         self.age += 1
+        if self.age == config.ADULT_AGE:
+            self.world.population_stats.come_of_age(self)
         
-        if self.age >= MAX_AGE:
+        if self.age >= config.MAX_AGE:
             self.die('MAX_AGE')
-            return
+            return False
             
-        if self.age >= OLD_AGE and self.energy < 100: 
+        if self.age >= config.OLD_AGE and self.energy < 100: 
             self.die('NATURAL_DEATH_OLD')
-            return
+            return False
             
         # 2. Update basic needs
         metabolism_cost = self.genes['metabolism']
@@ -329,7 +1311,7 @@ class Agent:
         
         for child_id in list(self.children_ids):
             child = self.world.get_agent_by_id(child_id)
-            if child and child.age < ADULT_AGE:
+            if child and child.age < config.ADULT_AGE:
                 living_children_under_age += 1
             elif child:
                 self.children_ids.discard(child_id) 
@@ -338,14 +1320,14 @@ class Agent:
 
         parental_cost = living_children_under_age * 0.2 
         
-        if self.age < ADULT_AGE:
+        if self.age < config.ADULT_AGE:
             # FIX 2: Cap the child's effective metabolism rate to a low, stable value (0.25)
             metabolism_cost = min(parental_cost, 0.25) 
             
             # FIX 1: Lower the critical death threshold from 50 to 10
             if self.energy < 10: 
                 self.die('STARVATION_CHILD')
-                return
+                return False
         else:
             metabolism_cost += parental_cost
         # --- END FIX ---
@@ -371,10 +1353,13 @@ class Agent:
                 self.social = clamp(self.social + 0.5, 0, 100) 
         # --- END Home buff ---
             
+        # Buffs and debuffs act on every turn up to and including their expiry turn,
+        # so a timer set to N after this point covers the agent's next N updates
+        turn = self.world.turn
+
         # Social buff (Campfire is communal)
-        if self.social_buff_timer > 0:
+        if self._social_buff_timer_until >= turn:
             metabolism_cost *= 0.8 
-            self.social_buff_timer -= 1
             
         # Check if the agent's OWNED campfire is still active
         if self.campfire_location and self.campfire_location not in self.world.campfires:
@@ -382,56 +1367,36 @@ class Agent:
             
         # Check for "Cozy" buff from a nearby campfire
         # MODIFIED: Check radius 2, but ensure agent is NOT standing ON the campfire tile
-        nearby_campfire = self.world.get_nearest(self.x, self.y, 2, self.world.campfires.keys())
+        nearby_campfire = self.world.get_nearest(self.x, self.y, 2, 'campfires')
         if nearby_campfire and (self.x, self.y) != nearby_campfire:
             metabolism_cost *= 0.9 
             self.social = clamp(self.social + 0.5, 0, 100) 
             # --- NEW: Campfire Warmth/Comfort passive Love gain ---
-            self.love = clamp(self.love + 0.1, 0, STARTING_LOVE)
+            self.love = clamp(self.love + 0.1, 0, config.STARTING_LOVE)
             # --- END NEW ---
             
         # --- NEW: APATHY SYSTEM UPDATE ---
-        if self.apathy_timer > 0:
-            metabolism_cost += APATHY_METABOLISM_PENALTY 
-            self.apathy_timer -= 1
+        if self._apathy_timer_until >= turn:
+            metabolism_cost += config.APATHY_METABOLISM_PENALTY 
         # --- END APATHY SYSTEM UPDATE ---
             
         # --- NEW: Sickness System Update ---
-        if self.sickness_timer > 0:
-            metabolism_cost += ENV_SICKNESS_METABOLISM_PENALTY
-            self.sickness_timer -= 1
-        # --- END NEW ---
-            
-        # --- NEW: VENGEANCE TIMER UPDATE ---
-        if self.vengeance_timer > 0:
-            self.vengeance_timer -= 1
-            if self.vengeance_timer == 0:
-                self.avenging_target_id = None # Timer ran out, stop avenging
-        # --- END NEW ---
-        
-        # --- NEW: SPEED BUFF TIMER UPDATE ---
-        if self.speed_buff_timer > 0:
-            self.speed_buff_timer -= 1
+        if self._sickness_timer_until >= turn:
+            metabolism_cost += config.ENV_SICKNESS_METABOLISM_PENALTY
         # --- END NEW ---
 
-        # --- FREEZE FIX: Update Stuck Timer ---
-        if self.stuck_timer > 0:
-            self.stuck_timer -= 1
-        # --- END FREEZE FIX ---
+        # Vengeance, speed buff, stuck and mate cooldown timers run out on their own
+        # (see TurnTimer); vengeance ending is handled by end_vengeance().
             
         self.energy -= metabolism_cost
-        if self.mate_cooldown > 0:
-            self.mate_cooldown -= 1
             
         # Update Social Need
         social_loss_multiplier = 1.0
         if self.apathy_timer > 0:
-            social_loss_multiplier = APATHY_SOCIAL_LOSS_MULTIPLIER 
+            social_loss_multiplier = config.APATHY_SOCIAL_LOSS_MULTIPLIER 
 
-        if self.contentment_buff_timer > 0:
-            self.contentment_buff_timer -= 1
-        else:
-            vision_radius = int(self.genes['vision'])
+        if self._contentment_buff_timer_until < turn:
+            vision_radius = self.vision_radius
             nearby_agents = self.world.get_nearest_agents(self.x, self.y, vision_radius, self)
             if not nearby_agents and (not nearby_campfire or (self.x, self.y) == nearby_campfire): # Added check to ignore campfire if standing on it
                 self.social -= self.genes['sociability'] * 0.5 * social_loss_multiplier
@@ -443,21 +1408,24 @@ class Agent:
         if self.energy < 30 or self.social < 20:
             self.struggle_timer += 1
             # Love Loss when struggling (Increased loss for combat chance)
-            self.love = clamp(self.love - LOVE_LOSS_STRUGGLE, 0, STARTING_LOVE)
+            self.love = clamp(self.love - config.LOVE_LOSS_STRUGGLE, 0, config.STARTING_LOVE)
         else:
             self.struggle_timer = 0
             
         # --- NEW: Check for Apathy Trigger ---
         if self.love <= 0 and self.apathy_timer == 0:
-            self.apathy_timer = APATHY_DURATION
+            self.apathy_timer = config.APATHY_DURATION
         # --- END APATHY TRIGGER ---
             
         # --- NEW: Global Knowledge Retrieval (The Library Effect) ---
-        for skill_key in self.skills:
-            global_value = self.world.global_skill_knowledge.get(skill_key, 0.0)
-            current_skill = self.skills[skill_key]
-            if current_skill < global_value:
-                self.skills[skill_key] = clamp(current_skill + 0.0001, 0, 10.0) 
+        if config.LIBRARY_ENABLED:
+            skills = self.skills
+            skill_vector = skills.vector
+            global_knowledge = self.world.global_skill_knowledge
+            for index, skill_key in enumerate(SKILL_NAMES):
+                current_skill = skill_vector[index]
+                if current_skill < global_knowledge.get(skill_key, 0.0):
+                    skills.set_at(index, clamp(current_skill + 0.0001, 0, 10.0)) 
         # --- END NEW ---
 
         # 3. Check for death
@@ -465,17 +1433,13 @@ class Agent:
             # --- MODIFIED: Safeguard against double-death logging ---
             # If agent is already removed (e.g. by combat), just return
             if self not in self.world.agents:
-                return
+                return False
             # --- END MODIFIED ---
             
             self.die('STARVATION_ADULT')
-            return
+            return False
 
-        # 4. Decide what to do
-        self.decide_state() 
-        
-        # 5. Execute the action
-        self.execute_action()
+        return True
 
     def get_personality(self):
         """Returns the current clamped integer personality type."""
@@ -484,28 +1448,30 @@ class Agent:
 
 
     def create_random_genes(self, stabilize=False):
+        config = self.world.config
         genes = {}
-        for gene, (min_val, max_val, _) in GENE_RANGES.items():
+        for gene, (min_val, max_val, _) in config.GENE_RANGES.items():
             if stabilize:
                 if gene == 'metabolism':
-                    genes[gene] = random.uniform(0.5, 0.8) 
+                    genes[gene] = self.rng.uniform(0.5, 0.8) 
                 elif gene == 'speed':
-                    genes[gene] = random.uniform(1.0, 3.0) 
+                    genes[gene] = self.rng.uniform(1.0, 3.0) 
                 elif gene == 'personality':
                     # Ensure personality starts mostly as Cooperative (1) or Isolated (2)
-                    if random.random() < 0.8:
-                        genes[gene] = random.randint(PERSONALITY_COOPERATIVE, PERSONALITY_ISOLATED)
+                    if self.rng.random() < 0.8:
+                        genes[gene] = self.rng.randint(PERSONALITY_COOPERATIVE, PERSONALITY_ISOLATED)
                     else:
-                        genes[gene] = random.randint(PERSONALITY_JUDGMENTAL, PERSONALITY_AGGRESSIVE_COOPERATOR)
+                        genes[gene] = self.rng.randint(PERSONALITY_JUDGMENTAL, PERSONALITY_AGGRESSIVE_COOPERATOR)
                 else:
-                    genes[gene] = random.uniform(min_val, max_val)
+                    genes[gene] = self.rng.uniform(min_val, max_val)
             else:
-                genes[gene] = random.uniform(min_val, max_val)
+                genes[gene] = self.rng.uniform(min_val, max_val)
         return genes
 
     def decide_state(self):
         """The main "think" loop for the agent."""
-        vision_radius = int(self.genes['vision'])
+        config = self.world.config
+        vision_radius = self.vision_radius
         
         # --- FREEZE FIX: Stuck Check Override (New Priority -3) ---
         if self.stuck_timer > 0:
@@ -521,7 +1487,7 @@ class Agent:
         if nearby_agents:
             # Avoid chatting if in crisis or combat
             if not (self.apathy_timer > 0 or self.was_attacked_by or self.avenging_target_id or self.sickness_timer > 0): # NEW: Don't chat if sick
-                target = random.choice(nearby_agents)
+                target = self.rng.choice(nearby_agents)
                 
                 # Don't chat with someone in combat or already chatting
                 if not (target.was_attacked_by or target.avenging_target_id or target.state == "COMMUNICATING"):
@@ -530,8 +1496,8 @@ class Agent:
                     
                     # Check if self is lingering/happy
                     is_lingering = (self.state == "WANDERING" or self.state == "SOCIAL_HAPPY") and \
-                                   self.energy > PAUSE_ENERGY_THRESHOLD and \
-                                   self.social > PAUSE_SOCIAL_THRESHOLD
+                                   self.energy > config.PAUSE_ENERGY_THRESHOLD and \
+                                   self.social > config.PAUSE_SOCIAL_THRESHOLD
                     
                     if is_lingering:
                         chance = 0.6 # High chance to chat if lingering
@@ -542,14 +1508,14 @@ class Agent:
                         
                         chance = 0.1 # Small chance to pause and chat
                     
-                    if random.random() < chance:
+                    if self.rng.random() < chance:
                         self.communicate(target) # This sets both states
                         return # This is our action for the turn
         # --- END: Opportunistic Socializing ---
 
-        food_in_sight = self.world.get_nearest_in_set(self.x, self.y, vision_radius, self.world.food)
+        food_in_sight = self.world.get_nearest_in_set(self.x, self.y, vision_radius, 'food')
         # --- NEW: Check for fruit ---
-        fruit_in_sight = self.world.get_nearest_in_set(self.x, self.y, vision_radius, self.world.fruits)
+        fruit_in_sight = self.world.get_nearest_in_set(self.x, self.y, vision_radius, 'fruits') if config.FRUITS_ENABLED else []
         # --- END NEW ---
         
         conserve_energy = self.genes['metabolism'] < 0.8 and self.energy < 100
@@ -578,7 +1544,7 @@ class Agent:
             return
         
         # Priority 0: Hopeless/Sad
-        if (self.energy < 20 or self.social < 10) and not food_in_sight and not self.memory['food']:
+        if (self.energy < 20 or self.social < 10) and not food_in_sight and not self.memory.get('food'):
             self.state = "SOCIAL_SAD" 
             return
             
@@ -596,22 +1562,22 @@ class Agent:
 
         # Mandate 2: Share if others are desperately needy
         if self.energy > 100 and self.social > 50 and (self.wood_carried > 3 or self.food_carried >= 1 or len(self.fruit_carried) > 0):
-            vision_radius = int(self.genes['vision'])
+            vision_radius = self.vision_radius
             needy_agents = [a for a in self.world.get_nearest_agents(self.x, self.y, vision_radius, self) if a.energy < 40 and a.food_carried < 1 and len(a.fruit_carried) == 0] 
             if needy_agents:
                 self.state = "SHARING" 
                 return
             
         # Mandate 3: Seek a mate if population news is active and population is below the max target 
-        if has_news_of_low_pop and len(self.world.agents) < MAX_POPULATION_TARGET and \
-           self.age >= ADULT_AGE and \
+        if has_news_of_low_pop and len(self.world.agents) < config.MAX_POPULATION_TARGET and \
+           self.age >= config.ADULT_AGE and \
            self.energy > self.genes['mating_drive'] and self.mate_cooldown == 0:
             
             self.state = "SEEKING_MATE"
             return 
 
         # Environmental Crisis Priority (Intelligent Learning)
-        env_low_threshold = ENV_SICKNESS_THRESHOLD
+        env_low_threshold = config.ENV_SICKNESS_THRESHOLD
         if self.world.environmental_health < env_low_threshold:
             # If the environment is sick, stop polluting activities and prioritize healing
             
@@ -632,7 +1598,7 @@ class Agent:
         
         # Priority 1: Survival (Energy)
         forage_threshold = 70 
-        if self.age < ADULT_AGE: 
+        if self.age < config.ADULT_AGE: 
             # FIX 3: Increase child foraging threshold to 120
             forage_threshold = 120 
             
@@ -646,23 +1612,23 @@ class Agent:
         # If I need social, seek social fruit. (But only if healthy > 120 and not sick)
         if self.social < 40 and self.energy > 120 and self.sickness_timer == 0: 
              # Check for known social fruits
-            social_fruits = [pos for pos, type in self.world.fruit_types.items() if type == 'social' and (pos in fruit_in_sight or pos in self.memory['fruit'])]
+            social_fruits = self.get_known_fruits('social', fruit_in_sight)
             if social_fruits:
                 self.state = "FORAGING_FRUIT"
                 return
         # If I'm wandering, chance to seek speed fruit. (But not if sick)
-        if self.state == "WANDERING" and self.speed_buff_timer == 0 and random.random() < 0.1 and self.sickness_timer == 0:
-            speed_fruits = [pos for pos, type in self.world.fruit_types.items() if type == 'speed' and (pos in fruit_in_sight or pos in self.memory['fruit'])]
+        if self.state == "WANDERING" and self.speed_buff_timer == 0 and self.rng.random() < 0.1 and self.sickness_timer == 0:
+            speed_fruits = self.get_known_fruits('speed', fruit_in_sight)
             if speed_fruits:
                 self.state = "FORAGING_FRUIT"
                 return
         # --- END NEW ---
             
         # Priority 1.5: Campfire Refuel
-        nearby_campfire_pos = self.world.get_nearest(self.x, self.y, vision_radius, self.world.campfires.keys())
+        nearby_campfire_pos = self.world.get_nearest(self.x, self.y, vision_radius, 'campfires')
         if nearby_campfire_pos:
-            campfire_timer = self.world.campfires.get(nearby_campfire_pos)
-            if campfire_timer and campfire_timer < CAMPFIRE_REFUEL_THRESHOLD:
+            campfire_timer = self.world.time_left('campfire', nearby_campfire_pos)
+            if campfire_timer and campfire_timer < config.CAMPFIRE_REFUEL_THRESHOLD:
                 if self.wood_carried < 1:
                     self.state = "GETTING_WOOD" 
                     return
@@ -674,7 +1640,7 @@ class Agent:
         if self.home_location:
             home_data = self.world.homes.get(self.home_location)
             is_owner = home_data.get('owner_id') == self.id
-            if home_data and home_data['durability'] < HOME_DURABILITY_START and is_owner: 
+            if home_data and home_data['durability'] < config.HOME_DURABILITY_START and is_owner: 
                 if self.wood_carried < 1:
                     self.state = "GETTING_WOOD" 
                     return
@@ -694,7 +1660,7 @@ class Agent:
                 self.state = "CLAIMING_HOME" 
                 return
             
-            elif (len(self.world.homes) < len(self.world.agents)) and (self.genes['builder'] > random.random()):
+            elif (len(self.world.homes) < len(self.world.agents)) and (self.genes['builder'] > self.rng.random()):
                 
                 if conserve_energy:
                     self.state = "FORAGING" 
@@ -708,7 +1674,7 @@ class Agent:
                     return
                 
                 community_radius = vision_radius + 5 
-                nearby_homes = self.world.get_nearest(self.x, self.y, community_radius, self.world.homes.keys())
+                nearby_homes = self.world.get_nearest(self.x, self.y, community_radius, 'homes')
                 is_social = self.genes['sociability'] > 0.5
 
                 if self.is_clear_tile(self.x, self.y):
@@ -736,7 +1702,7 @@ class Agent:
                 return
         
         # Priority 5: Farming (Food Seeds) - Normal Planting (if no crisis)
-        if (self.seeds_carried > 0 or self.fruit_seeds_carried > 0) and self.energy > 80 and self.genes['farming'] > random.random():
+        if (self.seeds_carried > 0 or self.fruit_seeds_carried > 0) and self.energy > 80 and self.genes['farming'] > self.rng.random():
             if self.home_location:
                 dist = get_distance(self.x, self.y, self.home_location[0], self.home_location[1])
                 if dist > 5: 
@@ -749,7 +1715,7 @@ class Agent:
 
         # Priority 5.5: Planting Trees (if wood is scarce)
         if self.wood_seeds_carried > 0 and self.energy > 80 and \
-           (len(self.world.wood) < STARTING_WOOD) and (self.genes['builder'] > random.random()): 
+           (len(self.world.wood) < config.STARTING_WOOD) and (self.genes['builder'] > self.rng.random()): 
             if self.home_location:
                 dist = get_distance(self.x, self.y, self.home_location[0], self.home_location[1])
                 if dist > 5:
@@ -761,7 +1727,7 @@ class Agent:
             return
             
         # Priority 6: Build Campfire 
-        nearby_active_fire = self.world.get_nearest(self.x, self.y, vision_radius + 5, self.world.campfires.keys())
+        nearby_active_fire = self.world.get_nearest(self.x, self.y, vision_radius + 5, 'campfires')
 
         if self.energy > 120 and self.social > 50 and \
            self.genes['builder'] > 0.5 and \
@@ -772,7 +1738,7 @@ class Agent:
                 self.state = "FORAGING" 
                 return
             
-            wood_cost_needed = CAMPFIRE_WOOD_COST - int(self.skills['building'] * 0.5)
+            wood_cost_needed = config.CAMPFIRE_WOOD_COST - int(self.skills['building'] * 0.5)
             if wood_cost_needed < 1: wood_cost_needed = 1
             
             if self.wood_carried >= wood_cost_needed:
@@ -784,7 +1750,7 @@ class Agent:
             
         # Priority 7: Share Resources (Standard Share, if energy > 70)
         if self.energy > 100 and self.social > 50 and (self.wood_carried > 3 or self.food_carried >= 1 or len(self.fruit_carried) > 0):
-            vision_radius = int(self.genes['vision'])
+            vision_radius = self.vision_radius
             needy_agents = [a for a in self.world.get_nearest_agents(self.x, self.y, vision_radius, self) if a.energy < 70 and a.food_carried < 1 and len(a.fruit_carried) == 0] 
             if needy_agents:
                 self.state = "SHARING" 
@@ -796,21 +1762,22 @@ class Agent:
 
     def execute_action(self):
         """Performs the action associated with the current state."""
-        vision_radius = int(self.genes['vision'])
+        config = self.world.config
+        vision_radius = self.vision_radius
         
         # FIX: Initialize potential targets to prevent UnboundLocalError
         target = None 
         
         # 1. Check ALL visible resources
-        food_in_sight = self.world.get_nearest_in_set(self.x, self.y, vision_radius, self.world.food)
-        wood_in_sight = self.world.get_nearest_in_set(self.x, self.y, vision_radius, self.world.wood)
-        fruit_in_sight = self.world.get_nearest_in_set(self.x, self.y, vision_radius, self.world.fruits)
+        food_in_sight = self.world.get_nearest_in_set(self.x, self.y, vision_radius, 'food')
+        wood_in_sight = self.world.get_nearest_in_set(self.x, self.y, vision_radius, 'wood')
+        fruit_in_sight = self.world.get_nearest_in_set(self.x, self.y, vision_radius, 'fruits') if config.FRUITS_ENABLED else []
         agents = self.world.get_nearest_agents(self.x, self.y, vision_radius, exclude_self=self)
         
         # --- NEW: Check for Library in sight ---
-        if self.memory['library'] is None:
+        if self.memory['library'] is None and config.LIBRARY_ENABLED:
             lx, ly = self.world.library_location
-            if get_distance(self.x, self.y, lx, ly) <= vision_radius:
+            if (lx - self.x) * (lx - self.x) + (ly - self.y) * (ly - self.y) <= vision_radius * vision_radius:
                 self.memory['library'] = (lx, ly)
         # --- END NEW ---
 
@@ -821,9 +1788,13 @@ class Agent:
         
         # --- Handle "Anger" (Aggression) ---
         # Note: Agents on the same tile is now extremely rare due to is_obstacle/movement changes
-        agents_on_tile = [a for a in self.world.agents if a.x == self.x and a.y == self.y and a != self]
+        agents_on_tile = [
+            self.world.get_agent_by_id(agent_id)
+            for agent_id in sorted(self.world.get_agent_ids_on_tile((self.x, self.y)))
+            if agent_id != self.id
+        ]
         if agents_on_tile:
-            target = random.choice(agents_on_tile)
+            target = self.rng.choice(agents_on_tile)
             
             # Dynamic Aggression based on struggle
             base_aggression = self.genes['aggression']
@@ -831,7 +1802,7 @@ class Agent:
             dynamic_aggression = base_aggression + struggle_bonus
             
             # --- COMBAT LOCK CHECK: Love is ZERO and Energy is high enough ---
-            if self.love <= 0 and self.energy > 80 and random.random() < dynamic_aggression:
+            if self.love <= 0 and self.energy > 80 and self.rng.random() < dynamic_aggression:
                 self.attack(target, attack_type='COMBAT_AGGRESSION') 
                 return 
         
@@ -860,29 +1831,29 @@ class Agent:
             elif (self.x, self.y) in self.world.food and self.food_carried < 2: 
                 self.pickup_food()
             # If hungry and on a fruit tile, pick up (only if food isn't on the tile)
-            elif (self.x, self.y) in self.world.fruits and len(self.fruit_carried) < MAX_FRUIT_CARRIED and (self.x, self.y) not in self.world.food:
+            elif (self.x, self.y) in self.world.fruits and len(self.fruit_carried) < config.MAX_FRUIT_CARRIED and (self.x, self.y) not in self.world.food:
                 self.pickup_fruit()
             
             elif best_food_target: 
                 self.move_towards(best_food_target[0], best_food_target[1])
                 if get_distance(self.x, self.y, best_food_target[0], best_food_target[1]) < 2.0:
                     if (self.x, self.y) not in self.world.food:
-                        self.memory['food'].discard(best_food_target)
+                        self.memory.forget('food', best_food_target)
                 # --- FIX: Stale memory guard ---
                 if get_distance(self.x, self.y, best_food_target[0], best_food_target[1]) < 5.0 and self.struggle_timer > 5:
                     if (self.x, self.y) not in self.world.food:
-                        self.memory['food'].discard(best_food_target)
+                        self.memory.forget('food', best_food_target)
                 # --- END FIX ---
             # --- Fallback to fruit if no food target ---
             elif best_fruit_target:
                 self.move_towards(best_fruit_target[0], best_fruit_target[1])
                 if get_distance(self.x, self.y, best_fruit_target[0], best_fruit_target[1]) < 2.0:
                     if (self.x, self.y) not in self.world.fruits:
-                        self.memory['fruit'].discard(best_fruit_target)
+                        self.memory.forget('fruit', best_fruit_target)
                 # --- FIX: Stale memory guard ---
                 if get_distance(self.x, self.y, best_fruit_target[0], best_fruit_target[1]) < 5.0 and self.struggle_timer > 5:
                     if (self.x, self.y) not in self.world.fruits:
-                        self.memory['fruit'].discard(best_fruit_target)
+                        self.memory.forget('fruit', best_fruit_target)
                 # --- END FIX ---
             # --- END Fallback ---
             else:
@@ -896,7 +1867,7 @@ class Agent:
                 return
             
             # 2. Pick up fruit if on tile (MODIFIED)
-            if (self.x, self.y) in self.world.fruits and len(self.fruit_carried) < MAX_FRUIT_CARRIED:
+            if (self.x, self.y) in self.world.fruits and len(self.fruit_carried) < config.MAX_FRUIT_CARRIED:
                 self.pickup_fruit()
                 return
                 
@@ -905,14 +1876,14 @@ class Agent:
             
             # Find social fruit if social is low
             if self.social < 40:
-                social_fruits = [pos for pos, type in self.world.fruit_types.items() if type == 'social' and (pos in fruit_in_sight or pos in self.memory['fruit'])]
+                social_fruits = self.get_known_fruits('social', fruit_in_sight)
                 if social_fruits:
                     social_fruits.sort(key=lambda p: get_distance(self.x, self.y, p[0], p[1]))
                     target_fruit_pos = social_fruits[0]
             
             # Find speed fruit if no social target and buff is 0
             if target_fruit_pos is None and self.speed_buff_timer == 0:
-                speed_fruits = [pos for pos, type in self.world.fruit_types.items() if type == 'speed' and (pos in fruit_in_sight or pos in self.memory['fruit'])]
+                speed_fruits = self.get_known_fruits('speed', fruit_in_sight)
                 if speed_fruits:
                     speed_fruits.sort(key=lambda p: get_distance(self.x, self.y, p[0], p[1]))
                     target_fruit_pos = speed_fruits[0]
@@ -926,11 +1897,11 @@ class Agent:
                 self.move_towards(target_fruit_pos[0], target_fruit_pos[1])
                 if get_distance(self.x, self.y, target_fruit_pos[0], target_fruit_pos[1]) < 2.0:
                     if (self.x, self.y) not in self.world.fruits:
-                        self.memory['fruit'].discard(target_fruit_pos)
+                        self.memory.forget('fruit', target_fruit_pos)
                 # --- FIX: Stale memory guard ---
                 if get_distance(self.x, self.y, target_fruit_pos[0], target_fruit_pos[1]) < 5.0 and self.struggle_timer > 5:
                     if (self.x, self.y) not in self.world.fruits:
-                        self.memory['fruit'].discard(target_fruit_pos)
+                        self.memory.forget('fruit', target_fruit_pos)
                 # --- END FIX ---
             else:
                 self.move_exploring()
@@ -948,11 +1919,11 @@ class Agent:
                 self.move_towards(best_wood_target[0], best_wood_target[1])
                 if get_distance(self.x, self.y, best_wood_target[0], best_wood_target[1]) < 2.0:
                     if (self.x, self.y) not in self.world.wood:
-                        self.memory['wood'].discard(best_wood_target)
+                        self.memory.forget('wood', best_wood_target)
                 # --- FIX: Stale memory guard ---
                 if get_distance(self.x, self.y, best_wood_target[0], best_wood_target[1]) < 5.0 and self.struggle_timer > 5:
                     if (self.x, self.y) not in self.world.wood:
-                        self.memory['wood'].discard(best_wood_target)
+                        self.memory.forget('wood', best_wood_target)
                 # --- END FIX ---
             else:
                 self.move_exploring()
@@ -970,7 +1941,7 @@ class Agent:
                 dist = get_distance(self.x, self.y, self.home_location[0], self.home_location[1])
                 if dist < 2.0: 
                     if self.wood_carried > 0:
-                        self.world.homes[self.home_location]['durability'] = HOME_DURABILITY_START
+                        self.world.homes[self.home_location]['durability'] = config.HOME_DURABILITY_START
                         self.wood_carried -= 1
                         self.skills['building'] = clamp(self.skills['building'] + 0.2, 0, 4.0)
                         self.state = "WANDERING"
@@ -983,13 +1954,13 @@ class Agent:
                 
         elif self.state == "REFUELING_CAMPFIRE":
             # MODIFIED: Refuel at any nearby campfire (radius 2)
-            nearby_campfire_pos = self.world.get_nearest(self.x, self.y, 2, self.world.campfires.keys())
+            nearby_campfire_pos = self.world.get_nearest(self.x, self.y, 2, 'campfires')
             if nearby_campfire_pos:
                 dist = get_distance(self.x, self.y, nearby_campfire_pos[0], nearby_campfire_pos[1])
                 # Refueling doesn't require standing ON the fire, but adjacent (dist < 2.0)
                 if dist < 2.0: 
                     if self.wood_carried > 0:
-                        self.world.campfires[nearby_campfire_pos] = CAMPFIRE_BURN_TIME
+                        self.world.set_timer('campfire', nearby_campfire_pos, config.CAMPFIRE_BURN_TIME)
                         self.wood_carried -= 1
                         self.state = "WANDERING"
                     else:
@@ -1004,7 +1975,7 @@ class Agent:
             if empty_home:
                 dist = get_distance(self.x, self.y, empty_home[0], empty_home[1])
                 if dist < 2.0: 
-                    self.world.homes[empty_home]['owner_id'] = self.id
+                    self.world.set_home_owner(empty_home, self.id)
                     self.home_location = empty_home
                     self.state = "WANDERING"
                 else:
@@ -1016,7 +1987,7 @@ class Agent:
             self.move_randomly(speed_factor=0.5, persistent_chance=0.0)
 
         elif self.state == "SEEKING_COMMUNITY":
-            all_homes = self.world.get_nearest(self.x, self.y, 999, self.world.homes.keys()) 
+            all_homes = self.world.get_nearest(self.x, self.y, 999, 'homes') 
             if all_homes:
                 self.move_towards(all_homes[0], all_homes[1])
             else:
@@ -1083,7 +2054,7 @@ class Agent:
                     # --- MODIFIED: Share fruit first, then food, then wood ---
                     if len(self.fruit_carried) > 0:
                         # Check if target can carry more fruit
-                        if len(target.fruit_carried) < MAX_FRUIT_CARRIED:
+                        if len(target.fruit_carried) < config.MAX_FRUIT_CARRIED:
                             fruit_type = self.fruit_carried.pop(0)
                             target.fruit_carried.append(fruit_type)
                             self.state = "WANDERING"
@@ -1137,14 +2108,14 @@ class Agent:
             if target_parent:
                 
                 # --- NEW: Recruit nearby agents (The 'Posse' logic) ---
-                vision_radius = int(self.genes['vision'])
+                vision_radius = self.vision_radius
                 potential_recruits = [
                     a for a in self.world.get_nearest_agents(self.x, self.y, vision_radius, self)
                     if a.id != target_parent.id and a.avenging_target_id is None
                 ]
                 
                 for recruit in potential_recruits:
-                    roll = random.random()
+                    roll = self.rng.random()
                     chance = recruit.genes['aggression'] * 0.5 
                     
                     p = recruit.get_personality()
@@ -1158,7 +2129,7 @@ class Agent:
                     if roll < chance:
                         recruit.state = "AVENGING"
                         recruit.avenging_target_id = self.avenging_target_id 
-                        recruit.vengeance_timer = VENGEANCE_DURATION
+                        recruit.vengeance_timer = config.VENGEANCE_DURATION
                 # --- END: Recruit logic ---
                 
                 dist = get_distance(self.x, self.y, target_parent.x, target_parent.y)
@@ -1175,12 +2146,12 @@ class Agent:
         # --- NEW: Seeking Mate State ---
         elif self.state == "SEEKING_MATE":
             eligible_partners = []
-            vision_radius = int(self.genes['vision']) 
+            vision_radius = self.vision_radius 
             
             nearby_agents = self.world.get_nearest_agents(self.x, self.y, vision_radius, self)
 
             for agent in nearby_agents:
-                if agent.age >= ADULT_AGE and \
+                if agent.age >= config.ADULT_AGE and \
                    agent.energy > agent.genes['mating_drive'] and \
                    agent.mate_cooldown == 0:
                     eligible_partners.append(agent)
@@ -1199,7 +2170,7 @@ class Agent:
         
         elif self.state == "SEEKING_SOCIAL": 
             # MODIFIED: Prioritize Campfire over Agents/Library for social
-            nearby_campfire_pos = self.world.get_nearest(self.x, self.y, vision_radius, self.world.campfires.keys())
+            nearby_campfire_pos = self.world.get_nearest(self.x, self.y, vision_radius, 'campfires')
             
             if nearby_campfire_pos:
                  # Move to a spot NEAR the campfire (radius 2)
@@ -1223,7 +2194,7 @@ class Agent:
             happy_agents = self.world.get_nearest_agents(self.x, self.y, 3, exclude_self=self)
             happy_and_pausing = [
                 a for a in happy_agents 
-                if a.energy > PAUSE_ENERGY_THRESHOLD and a.social > PAUSE_SOCIAL_THRESHOLD
+                if a.energy > config.PAUSE_ENERGY_THRESHOLD and a.social > config.PAUSE_SOCIAL_THRESHOLD
             ]
             
             if happy_and_pausing:
@@ -1250,14 +2221,14 @@ class Agent:
                     self.move_exploring()
             
         elif self.state == "SOCIAL_HAPPY": 
-            if self.energy > PAUSE_ENERGY_THRESHOLD and self.social > PAUSE_SOCIAL_THRESHOLD:
+            if self.energy > config.PAUSE_ENERGY_THRESHOLD and self.social > config.PAUSE_SOCIAL_THRESHOLD:
                 
                 # Still linger, but chance to broadcast skill nearby
-                nearby_campfire_pos = self.world.get_nearest(self.x, self.y, 2, self.world.campfires.keys())
-                if nearby_campfire_pos and random.random() < 0.1 and (self.x, self.y) != nearby_campfire_pos:
+                nearby_campfire_pos = self.world.get_nearest(self.x, self.y, 2, 'campfires')
+                if nearby_campfire_pos and self.rng.random() < 0.1 and (self.x, self.y) != nearby_campfire_pos:
                     self.broadcast_skill_to_library()
                 
-                elif random.random() < 0.2 and self.memory['library']: 
+                elif self.rng.random() < 0.2 and self.memory['library']: 
                     lx, ly = self.memory['library']
                     if get_distance(self.x, self.y, lx, ly) > 5.0:
                         self.move_towards(lx, ly)
@@ -1269,14 +2240,14 @@ class Agent:
                 self.move_randomly(speed_factor=0.5, persistent_chance=0.0) 
 
         elif self.state == "SOCIAL_SAD": 
-            self.love = clamp(self.love + LOVE_GAIN_REST, 0, STARTING_LOVE)
+            self.love = clamp(self.love + config.LOVE_GAIN_REST, 0, config.STARTING_LOVE)
             
             if self.energy < 20 and best_food_target:
                 self.move_towards(best_food_target[0], best_food_target[1])
             
             elif self.social < 10:
                 # Prioritize a campfire or agent to relieve sadness
-                nearby_campfire_pos = self.world.get_nearest(self.x, self.y, vision_radius, self.world.campfires.keys())
+                nearby_campfire_pos = self.world.get_nearest(self.x, self.y, vision_radius, 'campfires')
                 if agents:
                     self.move_towards(agents[0].x, agents[0].y)
                 elif nearby_campfire_pos:
@@ -1292,14 +2263,14 @@ class Agent:
                  self.move_exploring() 
             
         elif self.state == "WANDERING":
-            if self.energy > PAUSE_ENERGY_THRESHOLD and self.social > PAUSE_SOCIAL_THRESHOLD:
+            if self.energy > config.PAUSE_ENERGY_THRESHOLD and self.social > config.PAUSE_SOCIAL_THRESHOLD:
                 
                 # Chance to linger by a fire and contribute knowledge
-                nearby_campfire_pos = self.world.get_nearest(self.x, self.y, 2, self.world.campfires.keys())
-                if nearby_campfire_pos and random.random() < 0.1 and (self.x, self.y) != nearby_campfire_pos:
+                nearby_campfire_pos = self.world.get_nearest(self.x, self.y, 2, 'campfires')
+                if nearby_campfire_pos and self.rng.random() < 0.1 and (self.x, self.y) != nearby_campfire_pos:
                     self.broadcast_skill_to_library()
                 
-                elif random.random() < 0.2 and self.memory['library']: 
+                elif self.rng.random() < 0.2 and self.memory['library']: 
                     lx, ly = self.memory['library']
                     if get_distance(self.x, self.y, lx, ly) > 5.0:
                         self.move_towards(lx, ly)
@@ -1339,19 +2310,11 @@ class Agent:
     def is_clear_tile(self, x, y):
         """Helper to check if a tile is empty for building/planting. (Now checks agents)."""
         pos = (x, y)
-        if pos == self.world.library_location: return False
-        if pos in self.world.homes: return False
-        if pos in self.world.food: return False
-        if pos in self.world.wood: return False
-        if pos in self.world.growing_plants: return False
-        if pos in self.world.growing_trees: return False 
-        if pos in self.world.campfires: return False
-        if pos in self.world.fruits: return False
-        if pos in self.world.growing_fruit_bushes: return False
+        if self.world.tile_kinds[y * self.world.width + x]: return False
         
         # NEW: Check for other agents on the tile
-        for agent in self.world.agents:
-            if agent != self and agent.x == x and agent.y == y:
+        for agent_id in self.world.get_agent_ids_on_tile(pos):
+            if agent_id != self.id:
                 # EXCEPTION 1: Library (communal space)
                 if pos == self.world.library_location:
                     continue 
@@ -1362,10 +2325,10 @@ class Agent:
                     if home_data:
                         owner_id = home_data.get('owner_id')
                         owner_agent = self.world.get_agent_by_id(owner_id)
-                        is_family = (owner_id is not None) and (agent.id in owner_agent.children_ids if owner_agent else False)
+                        is_family = (owner_id is not None) and (agent_id in owner_agent.children_ids if owner_agent else False)
                         
                         # If the other agent is family, it is NOT an obstacle for planting/building *at home*.
-                        if owner_id == agent.id or is_family:
+                        if owner_id == agent_id or is_family:
                             continue
                 
                 # If there's another agent and it's not a special case, the tile is NOT clear.
@@ -1389,8 +2352,8 @@ class Agent:
                 return True
                 
         # 3. Other Agents (Prevent cohabitation except for specific shared spaces)
-        for agent in self.world.agents:
-            if agent != self and agent.x == x and agent.y == y:
+        for agent_id in self.world.get_agent_ids_on_tile(pos):
+            if agent_id != self.id:
                 
                 # EXCEPTION 1: Library
                 if pos == self.world.library_location:
@@ -1415,8 +2378,14 @@ class Agent:
         return False
 
     def move_towards(self, target_x, target_y):
-        """Moves one step towards a target coordinate."""
+        """
+        Moves one step towards a target coordinate: along a cached A* path
+        around campfires and other agents' homes (see next_path_step), or
+        straight at it, sliding past whatever is in the way.
+        """
         self.exploration_vector = (0, 0)
+        pathfinding = self.world.config.PATHFINDING
+        target = (target_x, target_y)
         
         steps = int(self.genes['speed'])
         if self.speed_buff_timer > 0:
@@ -1425,53 +2394,29 @@ class Agent:
             steps = 1
         
         for _ in range(steps):
-            dx, dy = 0, 0
-            if self.x < target_x: dx = 1
-            elif self.x > target_x: dx = -1
-            if self.y < target_y: dy = 1
-            elif self.y > target_y: dy = -1
-            
-            new_x = clamp(self.x + dx, 0, self.world.width - 1)
-            new_y = clamp(self.y + dy, 0, self.world.height - 1)
-            
-            # MODIFIED: Check for obstacle and prevent move if so.
-            if not self.is_obstacle(new_x, new_y):
-                self.x = new_x
-                self.y = new_y
-            else:
-                # NEW: Sliding logic to bypass obstacles
-                slide_x = clamp(self.x + dx, 0, self.world.width - 1)
-                slide_y = clamp(self.y + dy, 0, self.world.height - 1)
+            next_step = self.next_path_step(target) if pathfinding else None
+            if next_step == target and self.is_static_obstacle(target):
+                break # Next to the campfire/home it was heading for
+            
+            if next_step is not None and not self.is_obstacle(next_step[0], next_step[1]):
+                self.world.move_agent(self, next_step[0], next_step[1])
+            elif not self.step_greedily(target_x, target_y):
+                # --- FIX: Deadlock Guard / FREEZE PREVENTION ---
+                # Stuck or blocked by multiple things, stop movement for this step and force a re-evaluation
+                self.exploration_vector = (self.rng.randint(-1, 1), self.rng.randint(-1, 1))
                 
-                moved = False
+                # NEW: Set a short timer (5 turns) to force genuine random exploration next turn
+                self.stuck_timer = 5
                 
-                # Try to slide in X only
-                if dx != 0 and not self.is_obstacle(slide_x, self.y):
-                    self.x = slide_x
-                    moved = True
-                # Try to slide in Y only
-                elif dy != 0 and not self.is_obstacle(self.x, slide_y):
-                    self.y = slide_y
-                    moved = True
+                # *** NEW CRITICAL FIX: Forget the target that caused the problem ***
+                if self.state in ["FORAGING", "FORAGING_FRUIT"]:
+                    self.memory.forget('food', target)
+                    self.memory.forget('fruit', target)
+                elif self.state == "GETTING_WOOD":
+                    self.memory.forget('wood', target)
+                # ************************************************
                 
-                if not moved:
-                    # --- FIX: Deadlock Guard / FREEZE PREVENTION ---
-                    # Stuck or blocked by multiple things, stop movement for this step and force a re-evaluation
-                    self.exploration_vector = (random.randint(-1, 1), random.randint(-1, 1))
-                    
-                    # NEW: Set a short timer (5 turns) to force genuine random exploration next turn
-                    self.stuck_timer = 5
-                    
-                    # *** NEW CRITICAL FIX: Forget the target that caused the problem ***
-                    target_tuple = (target_x, target_y)
-                    if self.state in ["FORAGING", "FORAGING_FRUIT"]:
-                        self.memory['food'].discard(target_tuple)
-                        self.memory['fruit'].discard(target_tuple)
-                    elif self.state == "GETTING_WOOD":
-                        self.memory['wood'].discard(target_tuple)
-                    # ************************************************
-                    
-                    break 
+                break 
             
             self.skills['navigation'] = clamp(self.skills['navigation'] + 0.001, 0, 3.0) # <--- MODIFIED: Capped at 3.0
             cost_multiplier = 1.0 - (self.skills['navigation'] * 0.15) 
@@ -1479,6 +2424,95 @@ class Agent:
             
             self.energy -= (0.05) * cost_multiplier 
 
+    def step_greedily(self, target_x, target_y):
+        """
+        One step straight at a target, sliding along one axis if that tile
+        is blocked. Returns False if no step was possible.
+        """
+        dx, dy = 0, 0
+        if self.x < target_x: dx = 1
+        elif self.x > target_x: dx = -1
+        if self.y < target_y: dy = 1
+        elif self.y > target_y: dy = -1
+        
+        new_x = clamp(self.x + dx, 0, self.world.width - 1)
+        new_y = clamp(self.y + dy, 0, self.world.height - 1)
+        
+        # MODIFIED: Check for obstacle and prevent move if so.
+        if not self.is_obstacle(new_x, new_y):
+            self.world.move_agent(self, new_x, new_y)
+            return True
+        
+        # NEW: Sliding logic to bypass obstacles
+        # Try to slide in X only
+        if dx != 0 and not self.is_obstacle(new_x, self.y):
+            self.world.move_agent(self, new_x, self.y)
+            return True
+        # Try to slide in Y only
+        elif dy != 0 and not self.is_obstacle(self.x, new_y):
+            self.world.move_agent(self, self.x, new_y)
+            return True
+        return False
+
+    def is_static_obstacle(self, pos):
+        """Campfires and other agents' homes: the part of is_obstacle() that paths are planned around."""
+        if pos in self.world.campfires:
+            return True
+        home_data = self.world.homes.get(pos)
+        return home_data is not None and home_data.get('owner_id') not in (None, self.id)
+
+    def next_path_step(self, target):
+        """
+        The next tile towards `target`, or None if there is no way round (or
+        the agent is already there). Near the library, a home or a campfire
+        it comes from that destination's shared flow field (World.flow_step).
+        Otherwise, while nothing static is in the way, it is simply the
+        straight step. Once a campfire or home blocks it, an A*
+        path is planned and cached, and only planned again when the target
+        changes, the agent leaves the path, or a campfire/home changed on one
+        of its remaining tiles. A failed search is cached until any
+        campfire or home changes.
+        """
+        world = self.world
+        pos = (self.x, self.y)
+        radius = world.config.FLOW_FIELD_RADIUS
+        if 0 < max(abs(target[0] - pos[0]), abs(target[1] - pos[1])) <= radius and \
+           (target == world.library_location or target in world.homes or target in world.campfires):
+            step = world.flow_step(self, target)
+            if step is not None:
+                self.path = None
+                return step
+        path = self.path
+        if path is not None and path[0] == target:
+            _, version, tiles, index = path
+            if tiles is None:
+                if version == world.obstacle_version:
+                    return None
+            else:
+                if index < len(tiles) and tiles[index] == pos:
+                    index += 1 # Moved onto the next tile since the last call
+                valid = index < len(tiles) and max(abs(tiles[index][0] - pos[0]), abs(tiles[index][1] - pos[1])) == 1
+                if valid and version != world.obstacle_version:
+                    changes = world.obstacle_changes
+                    for tile in tiles[index:]:
+                        if changes.get(tile, 0) > version and self.is_static_obstacle(tile):
+                            valid = False
+                            break
+                if valid:
+                    self.path = (target, world.obstacle_version, tiles, index)
+                    return tiles[index]
+        
+        if pos == target:
+            return None
+        step = (pos[0] + (target[0] > pos[0]) - (target[0] < pos[0]), pos[1] + (target[1] > pos[1]) - (target[1] < pos[1]))
+        if step == target or not self.is_static_obstacle(step):
+            self.path = None
+            return step
+
+        tiles = find_path(pos, target, world.width, world.height, self.is_static_obstacle, world.config.PATH_SEARCH_LIMIT)
+        self.path = (target, world.obstacle_version, tuple(tiles) if tiles is not None else None, 0)
+        return tiles[0] if tiles else None
+
     def move_randomly(self, speed_factor=1.0, persistent_chance=0.0):
         """Moves randomly (0.0 = wiggle) or persistently (0.8 = explore)."""
         steps = int(self.genes['speed'] * speed_factor)
@@ -1495,10 +2529,10 @@ class Agent:
                 if new_x == self.x and new_y == self.y:
                     stuck = True 
 
-            if self.exploration_vector == (0, 0) or stuck or random.random() > persistent_chance:
+            if self.exploration_vector == (0, 0) or stuck or self.rng.random() > persistent_chance:
                 # Loop to find a valid non-zero vector
                 for _ in range(4): # Limit attempts
-                    self.exploration_vector = (random.randint(-1, 1), random.randint(-1, 1))
+                    self.exploration_vector = (self.rng.randint(-1, 1), self.rng.randint(-1, 1))
                     if self.exploration_vector != (0, 0):
                         break
                 if self.exploration_vector == (0, 0): # If it still failed to find a non-zero vector
@@ -1511,8 +2545,7 @@ class Agent:
             
             # MODIFIED: Check for obstacle and prevent move if so.
             if not self.is_obstacle(new_x, new_y):
-                self.x = new_x
-                self.y = new_y
+                self.world.move_agent(self, new_x, new_y)
             else:
                 self.exploration_vector = (0, 0)
                 break 
@@ -1527,6 +2560,13 @@ class Agent:
         """Helper function to call move_randomly with smart settings."""
         self.move_randomly(speed_factor=1.0, persistent_chance=0.8)
 
+    def get_known_fruits(self, fruit_type, fruit_in_sight):
+        """Returns the visible or remembered fruit positions of one type, sorted by position."""
+        fruit_types = self.world.fruit_types
+        candidates = set(fruit_in_sight)
+        candidates.update(self.memory.get('fruit', ()))
+        return sorted(pos for pos in candidates if fruit_types.get(pos) == fruit_type)
+
     def get_closest_combined_target(self, resource_type, visible_resources):
         """
         Combines visible resources and memories to find the single closest target.
@@ -1535,43 +2575,47 @@ class Agent:
         
         possible_targets.update(visible_resources)
         
-        if resource_type in self.memory:
-            possible_targets.update(self.memory[resource_type])
+        remembered = self.memory.get(resource_type)
+        if remembered:
+            possible_targets.update(remembered)
         
         if not possible_targets:
             return None
             
         nearest_item = None
-        min_dist = float('inf')
+        min_dist_sq = float('inf')
+        x, y = self.x, self.y
         
+        # Ties go to the smaller position, so the result never depends on set order
         for (ix, iy) in possible_targets:
-            dist = get_distance(self.x, self.y, ix, iy)
-            if dist < min_dist:
-                min_dist = dist
+            dist_sq = (ix - x) * (ix - x) + (iy - y) * (iy - y)
+            if dist_sq < min_dist_sq or (dist_sq == min_dist_sq and (ix, iy) < nearest_item):
+                min_dist_sq = dist_sq
                 nearest_item = (ix, iy)
                 
         return nearest_item
 
     def consume_food(self):
         """Consumes 1 unit of food carried."""
+        config = self.world.config
         if self.food_carried > 0:
             self.food_carried -= 1
             self.skills['foraging'] = clamp(self.skills['foraging'] + 0.1, 0, 10.0) 
             # Use the new FOOD_BASE_ENERGY_VALUE constant
-            energy_gain = FOOD_BASE_ENERGY_VALUE + (self.skills['foraging'] * 20) 
+            energy_gain = config.FOOD_BASE_ENERGY_VALUE + (self.skills['foraging'] * 20) 
             self.energy += energy_gain
-            self.love = clamp(self.love + LOVE_GAIN_EAT, 0, STARTING_LOVE)
+            self.love = clamp(self.love + config.LOVE_GAIN_EAT, 0, config.STARTING_LOVE)
 
             # --- NEW: Environmental Degradation from Foraging ---
-            decay_amount = ENV_DECAY_FOOD_GATHER * (1.0 - (self.skills['foraging'] / 10.0))
-            self.world.environmental_health = clamp(self.world.environmental_health - decay_amount, 0, ENV_HEALTH_MAX)
+            decay_amount = config.ENV_DECAY_FOOD_GATHER * (1.0 - (self.skills['foraging'] / 10.0))
+            self.world.environmental_health = clamp(self.world.environmental_health - decay_amount, 0, config.ENV_HEALTH_MAX)
             # --- END NEW ---
 
             # --- NEW: Chance to drop a food seed based on foraging skill ---
-            foraging_chance = FOOD_SEED_BASE_CHANCE + (self.skills['foraging'] * 0.05)
+            foraging_chance = config.FOOD_SEED_BASE_CHANCE + (self.skills['foraging'] * 0.05)
             
             # FIX: Check max capacity before adding seeds
-            if random.random() < foraging_chance and self.seeds_carried < MAX_FOOD_SEEDS_CARRIED:
+            if self.rng.random() < foraging_chance and self.seeds_carried < config.MAX_FOOD_SEEDS_CARRIED:
                 self.seeds_carried += 1
             # --- END NEW ---
 
@@ -1579,31 +2623,32 @@ class Agent:
 
     def consume_fruit(self):
         """Consumes 1 unit of fruit carried."""
+        config = self.world.config
         if len(self.fruit_carried) > 0:
             fruit_type = self.fruit_carried.pop(0)
             self.skills['foraging'] = clamp(self.skills['foraging'] + 0.1, 0, 10.0)
             
             if fruit_type == 'energy':
-                self.energy += FRUIT_BENEFIT_ENERGY_VAL 
+                self.energy += config.FRUIT_BENEFIT_ENERGY_VAL 
             elif fruit_type == 'social':
-                self.energy += FRUIT_BENEFIT_SOCIAL_ENERGY_VAL
-                self.social = clamp(self.social + FRUIT_BENEFIT_SOCIAL_SOCIAL_VAL, 0, 100)
+                self.energy += config.FRUIT_BENEFIT_SOCIAL_ENERGY_VAL
+                self.social = clamp(self.social + config.FRUIT_BENEFIT_SOCIAL_SOCIAL_VAL, 0, 100)
             elif fruit_type == 'speed':
-                self.energy += FRUIT_BENEFIT_SPEED_ENERGY_VAL 
-                self.speed_buff_timer = FRUIT_BENEFIT_SPEED_DURATION
+                self.energy += config.FRUIT_BENEFIT_SPEED_ENERGY_VAL 
+                self.speed_buff_timer = config.FRUIT_BENEFIT_SPEED_DURATION
                 
-            self.love = clamp(self.love + LOVE_GAIN_EAT, 0, STARTING_LOVE)
+            self.love = clamp(self.love + config.LOVE_GAIN_EAT, 0, config.STARTING_LOVE)
 
             # --- NEW: Environmental Degradation from Foraging ---
-            decay_amount = ENV_DECAY_FOOD_GATHER * (1.0 - (self.skills['foraging'] / 10.0))
-            self.world.environmental_health = clamp(self.world.environmental_health - decay_amount, 0, ENV_HEALTH_MAX)
+            decay_amount = config.ENV_DECAY_FOOD_GATHER * (1.0 - (self.skills['foraging'] / 10.0))
+            self.world.environmental_health = clamp(self.world.environmental_health - decay_amount, 0, config.ENV_HEALTH_MAX)
             # --- END NEW ---
 
             # --- NEW: Chance to drop a fruit seed based on foraging skill ---
-            foraging_chance = FRUIT_SEED_BASE_CHANCE + (self.skills['foraging'] * 0.05)
+            foraging_chance = config.FRUIT_SEED_BASE_CHANCE + (self.skills['foraging'] * 0.05)
             
             # FIX: Check max capacity before adding fruit seeds
-            if random.random() < foraging_chance and self.fruit_seeds_carried < STARTING_FRUIT_SEEDS_MAX: # MAX_FRUIT_SEEDS_CARRIED constant used here
+            if self.rng.random() < foraging_chance and self.fruit_seeds_carried < config.STARTING_FRUIT_SEEDS_MAX: # MAX_FRUIT_SEEDS_CARRIED constant used here
                 self.fruit_seeds_carried += 1
             # --- END NEW ---
 
@@ -1612,43 +2657,41 @@ class Agent:
     def pickup_food(self):
         """Picks up food from the current tile into inventory (max 2)."""
         if (self.x, self.y) in self.world.food and self.food_carried < 2: 
-            self.world.food.remove((self.x, self.y))
-            if (self.x, self.y) in self.world.food_freshness:
-                del self.world.food_freshness[(self.x, self.y)]
+            self.world.remove_food((self.x, self.y))
             self.food_carried += 1
-            self.memory['food'].discard((self.x, self.y))
+            self.memory.forget('food', (self.x, self.y))
             self.state = "WANDERING"
 
     def pickup_fruit(self):
         """Picks up fruit from the current tile into inventory."""
         pos = (self.x, self.y)
-        if pos in self.world.fruits and len(self.fruit_carried) < MAX_FRUIT_CARRIED: 
+        if pos in self.world.fruits and len(self.fruit_carried) < self.world.config.MAX_FRUIT_CARRIED: 
             fruit_type = self.world.fruit_types.get(pos)
             if fruit_type:
-                self.world.fruits.remove(pos)
-                del self.world.fruit_types[pos]
+                self.world.remove_fruit(pos)
                 
                 self.fruit_carried.append(fruit_type)
                 
-                self.memory['fruit'].discard(pos)
+                self.memory.forget('fruit', pos)
                 self.state = "WANDERING"
 
     def take_wood(self):
         """Takes 1 wood from the world tile into inventory (max 3)."""
+        config = self.world.config
         if (self.x, self.y) in self.world.wood and self.wood_carried < 3: 
-            self.world.wood.remove((self.x, self.y))
+            self.world.remove_wood((self.x, self.y))
             self.wood_carried += 1
             
             # --- NEW: Environmental Degradation from Wood Gathering ---
-            decay_amount = ENV_DECAY_WOOD_GATHER * (1.0 - (self.skills['foraging'] / 10.0))
-            self.world.environmental_health = clamp(self.world.environmental_health - decay_amount, 0, ENV_HEALTH_MAX)
+            decay_amount = config.ENV_DECAY_WOOD_GATHER * (1.0 - (self.skills['foraging'] / 10.0))
+            self.world.environmental_health = clamp(self.world.environmental_health - decay_amount, 0, config.ENV_HEALTH_MAX)
             # --- END NEW ---
             
             # FIX: Check max capacity before adding wood seeds
-            if random.random() < WOOD_SEED_CHANCE and self.wood_seeds_carried < MAX_WOOD_SEEDS_CARRIED:
+            if self.rng.random() < config.WOOD_SEED_CHANCE and self.wood_seeds_carried < config.MAX_WOOD_SEEDS_CARRIED:
                 self.wood_seeds_carried += 1
 
-            self.memory['wood'].discard((self.x, self.y))
+            self.memory.forget('wood', (self.x, self.y))
             self.state = "WANDERING"
 
     def build_home(self):
@@ -1658,19 +2701,19 @@ class Agent:
         if self.wood_carried >= wood_cost:
             self.wood_carried -= wood_cost
             
-            self.world.homes[(self.x, self.y)] = {'owner_id': self.id, 'durability': HOME_DURABILITY_START}
+            self.world.add_home((self.x, self.y), self.id)
             self.home_location = (self.x, self.y) 
             
             self.state = "WANDERING"
             self.skills['building'] = clamp(self.skills['building'] + 0.5, 0, 4.0) 
     
     def build_campfire(self):
-        wood_cost = CAMPFIRE_WOOD_COST - int(self.skills['building'] * 0.5)
+        wood_cost = self.world.config.CAMPFIRE_WOOD_COST - int(self.skills['building'] * 0.5)
         if wood_cost < 1: wood_cost = 1 
         
         if self.wood_carried >= wood_cost:
             self.wood_carried -= wood_cost
-            self.world.campfires[(self.x, self.y)] = CAMPFIRE_BURN_TIME
+            self.world.add_campfire((self.x, self.y))
             self.campfire_location = (self.x, self.y) 
             self.skills['building'] = clamp(self.skills['building'] + 0.2, 0, 4.0)
             self.state = "WANDERING"
@@ -1688,7 +2731,7 @@ class Agent:
         target.energy -= damage
         self.skills['combat'] = clamp(self.skills['combat'] + 0.2, 0, 10.0) 
         
-        self.love = clamp(self.love - 5.0, 0, STARTING_LOVE) 
+        self.love = clamp(self.love - 5.0, 0, self.world.config.STARTING_LOVE) 
         
         target.was_attacked_by = self.id
         
@@ -1706,23 +2749,23 @@ class Agent:
         self.mate_cooldown = 600
         partner.mate_cooldown = 600
         
-        num_children = random.randint(1, 3) 
+        num_children = self.rng.randint(1, 3) 
         
         for _ in range(num_children):
             # Gene Mixing
             new_genes = {}
             for gene in self.genes:
                 avg_gene = (self.genes[gene] + partner.genes[gene]) / 2
-                min_val, max_val, mut_rate = GENE_RANGES[gene]
-                mutation = random.uniform(-mut_rate, mut_rate) * (max_val - min_val)
+                min_val, max_val, mut_rate = self.world.config.GENE_RANGES[gene]
+                mutation = self.rng.uniform(-mut_rate, mut_rate) * (max_val - min_val)
                 new_genes[gene] = clamp(avg_gene + mutation, min_val, max_val)
             
-            new_agent = self.world.add_agent(self.x, self.y, genes=new_genes)
+            # The child's stream is split off the parent's, so it doesn't depend on id order
+            new_agent = self.world.add_agent(self.x, self.y, genes=new_genes, rng=self.rng.spawn())
             if new_agent:
-                new_agent.skills = {k: 0.0 for k in self.skills}
                 new_agent.home_location = None
                 
-                new_agent.parent_ids = {self.id, partner.id}
+                new_agent.parent_ids = frozenset((self.id, partner.id))
                 
                 self.children_ids.add(new_agent.id)
                 partner.children_ids.add(new_agent.id)
@@ -1771,7 +2814,7 @@ class Agent:
         When lingering by a fire, contribute a small amount of the agent's
         best skill to the global knowledge pool.
         """
-        if not self.skills:
+        if not self.skills or not self.world.config.LIBRARY_ENABLED:
             return
             
         highest_skill_name = max(self.skills, key=self.skills.get)
@@ -1783,6 +2826,7 @@ class Agent:
                  self.world.global_skill_knowledge[highest_skill_name] = clamp(current_global + 0.005, 0, 10.0)
 
     def communicate(self, partner):
+        config = self.world.config
         self.state = "COMMUNICATING" 
         partner.state = "COMMUNICATING" 
         
@@ -1801,7 +2845,7 @@ class Agent:
             if self_personality == PERSONALITY_AGGRESSIVE_COOPERATOR:
                  conflict_chance = self.genes['aggression'] * 1.5
             
-            if random.random() < conflict_chance:
+            if self.rng.random() < conflict_chance:
                 self.attack(partner, attack_type='COMBAT_CONFLICT')
                 return
         # --- END NEW: Personality Conflict Check ---
@@ -1821,29 +2865,29 @@ class Agent:
         self.social_buff_timer = 20 
         partner.social_buff_timer = 20 
         
-        love_gain = LOVE_GAIN_SOCIAL
+        love_gain = config.LOVE_GAIN_SOCIAL
         if self.apathy_timer > 0:
             love_gain /= 2
             
-        self.love = clamp(self.love + love_gain, 0, STARTING_LOVE)
+        self.love = clamp(self.love + love_gain, 0, config.STARTING_LOVE)
         
-        love_gain_partner = LOVE_GAIN_SOCIAL
+        love_gain_partner = config.LOVE_GAIN_SOCIAL
         if partner.apathy_timer > 0:
             love_gain_partner /= 2
             
-        partner.love = clamp(partner.love + love_gain_partner, 0, STARTING_LOVE)
+        partner.love = clamp(partner.love + love_gain_partner, 0, config.STARTING_LOVE)
         
         # --- MODIFIED: NEWS SHARING (Only share if the world is in crisis) ---
         
         # 1. Food Crisis News
-        if len(self.world.food) < CRITICAL_FOOD_COUNT:
+        if len(self.world.food) < config.CRITICAL_FOOD_COUNT:
             # Propagate the news to the partner's memory
             partner.memory.setdefault('global_news', {})['food_crisis'] = True
             # The agent who started the chat is also reminded/refreshed of the news
             self.memory.setdefault('global_news', {})['food_crisis'] = True
 
         # 2. Population Crisis News
-        if len(self.world.agents) < MIN_POPULATION_TARGET:
+        if len(self.world.agents) < config.MIN_POPULATION_TARGET:
             partner.memory.setdefault('global_news', {})['low_population'] = True
             self.memory.setdefault('global_news', {})['low_population'] = True
             
@@ -1851,7 +2895,7 @@ class Agent:
 
         self.share_skills(partner) # Share skills and library location
         
-        if len(self.world.food) < STARTING_FOOD and \
+        if len(self.world.food) < config.STARTING_FOOD and \
            self.seeds_carried >= 1 and partner.seeds_carried >= 1:
             
             total_seeds = self.seeds_carried + partner.seeds_carried
@@ -1864,87 +2908,93 @@ class Agent:
                 if not self.is_clear_tile(lx, ly):
                     plant_loc = (self.x, self.y)
                 
-                self.world.food.add(plant_loc)
-                self.world.food_freshness[plant_loc] = FOOD_FRESHNESS
+                self.world.add_food(plant_loc)
                 
                 self.state = "FORAGING"
                 partner.state = "FORAGING"
                 return 
         
-        if self.age >= ADULT_AGE and self.energy > self.genes['mating_drive'] and self.mate_cooldown == 0 and \
-           partner.age >= ADULT_AGE and partner.energy > partner.genes['mating_drive'] and partner.mate_cooldown == 0:
+        if self.age >= config.ADULT_AGE and self.energy > self.genes['mating_drive'] and self.mate_cooldown == 0 and \
+           partner.age >= config.ADULT_AGE and partner.energy > partner.genes['mating_drive'] and partner.mate_cooldown == 0:
             
             self.mate(partner)
 
     def plant_seed(self):
         """Plants a food seed at the current location."""
+        config = self.world.config
         if self.seeds_carried > 0:
             self.seeds_carried -= 1
             self.energy -= 10 
             
-            self.world.growing_plants[(self.x, self.y)] = GROW_TIME
+            self.world.set_timer('plant', (self.x, self.y), config.GROW_TIME)
             
             self.skills['farming'] = clamp(self.skills['farming'] + 0.2, 0, 10.0)
             
             # --- NEW: Environmental Healing from Planting ---
-            heal_amount = ENV_HEAL_PLANT_BASE * (self.skills['farming'] / 10.0)
-            self.world.environmental_health = clamp(self.world.environmental_health + heal_amount, 0, ENV_HEALTH_MAX)
+            heal_amount = config.ENV_HEAL_PLANT_BASE * (self.skills['farming'] / 10.0)
+            self.world.environmental_health = clamp(self.world.environmental_health + heal_amount, 0, config.ENV_HEALTH_MAX)
             # --- END NEW ---
             
             self.state = "WANDERING"
 
     def plant_fruit_seed(self):
         """Plants a fruit seed at the current location."""
+        config = self.world.config
         if self.fruit_seeds_carried > 0:
             self.fruit_seeds_carried -= 1
             self.energy -= 10 
             
-            self.world.growing_fruit_bushes[(self.x, self.y)] = FRUIT_GROW_TIME
-            self.world.fruit_types[(self.x, self.y)] = random.choice(['energy', 'social', 'speed'])
+            self.world.set_timer('bush', (self.x, self.y), config.FRUIT_GROW_TIME)
+            self.world.fruit_types[(self.x, self.y)] = self.rng.choice(['energy', 'social', 'speed'])
             
             self.skills['farming'] = clamp(self.skills['farming'] + 0.2, 0, 10.0)
             
             # --- NEW: Environmental Healing from Planting ---
-            heal_amount = ENV_HEAL_PLANT_BASE * (self.skills['farming'] / 10.0)
-            self.world.environmental_health = clamp(self.world.environmental_health + heal_amount, 0, ENV_HEALTH_MAX)
+            heal_amount = config.ENV_HEAL_PLANT_BASE * (self.skills['farming'] / 10.0)
+            self.world.environmental_health = clamp(self.world.environmental_health + heal_amount, 0, config.ENV_HEALTH_MAX)
             # --- END NEW ---
             
             self.state = "WANDERING"
 
     def plant_tree(self):
         """Plants a wood seed at the current location."""
+        config = self.world.config
         if self.wood_seeds_carried > 0:
             self.wood_seeds_carried -= 1
             self.energy -= 10 
             
-            self.world.growing_trees[(self.x, self.y)] = TREE_GROW_TIME
+            self.world.set_timer('tree', (self.x, self.y), config.TREE_GROW_TIME)
             
             self.skills['farming'] = clamp(self.skills['farming'] + 0.2, 0, 10.0)
             
             # --- NEW: Environmental Healing from Planting ---
-            heal_amount = ENV_HEAL_PLANT_BASE * (self.skills['farming'] / 10.0)
-            self.world.environmental_health = clamp(self.world.environmental_health + heal_amount, 0, ENV_HEALTH_MAX)
+            heal_amount = config.ENV_HEAL_PLANT_BASE * (self.skills['farming'] / 10.0)
+            self.world.environmental_health = clamp(self.world.environmental_health + heal_amount, 0, config.ENV_HEALTH_MAX)
             # --- END NEW ---
             
             self.state = "WANDERING"
 
     def die(self, reason='UNKNOWN'):
         """Removes the agent from the world and makes their home 'unclaimed'."""
+        config = self.world.config
         
         # --- NEW: Vengeance System ---
-        if self.age < ADULT_AGE and self.parent_ids:
+        if config.VENGEANCE_ENABLED and self.age < config.ADULT_AGE and self.parent_ids:
             witnesses = []
-            for agent in self.world.agents:
+            # Nobody can see further than the max vision gene, so only scan nearby cells
+            max_vision = config.GENE_RANGES['vision'][1]
+            for agent in self.world.agent_grid.query(self.x, self.y, max_vision):
                 if agent.id == self.id or agent.id in self.parent_ids:
                     continue 
                 
-                vision_radius = int(agent.genes['vision'])
+                vision_radius = agent.vision_radius
                 dist = get_distance(agent.x, agent.y, self.x, self.y)
                 
                 if dist <= vision_radius:
                     witnesses.append(agent)
             
             if witnesses:
+                witnesses.sort(key=lambda a: a.id) # Grid buckets are unordered sets
                 closest_parent_agent = None
                 min_dist_to_parent = float('inf')
                 
@@ -1960,7 +3010,7 @@ class Agent:
                     for witness in witnesses:
                         witness.state = "AVENGING"
                         witness.avenging_target_id = closest_parent_agent.id
-                        witness.vengeance_timer = VENGEANCE_DURATION 
+                        witness.vengeance_timer = config.VENGEANCE_DURATION 
         # --- END: Vengeance System ---
         
         # --- NEW: Check for Sickness-Induced Death (Override reason) ---
@@ -1970,18 +3020,18 @@ class Agent:
         # --- END NEW ---
         
         self.world.death_causes[reason] = self.world.death_causes.get(reason, 0) + 1
+        self.world.death_causes['TOTAL_DEATHS'] += 1
         
         death_location = (self.x, self.y)
         
         # --- MODIFIED: Drop ALL carried items ---
         # Drop wood
         for _ in range(self.wood_carried):
-            self.world.wood.add(death_location)
+            self.world.add_wood(death_location)
             
         # Drop food
         for _ in range(self.food_carried):
-            self.world.food.add(death_location)
-            self.world.food_freshness[death_location] = FOOD_FRESHNESS
+            self.world.add_food(death_location)
             
         # Drop fruit
         for fruit_type in self.fruit_carried:
@@ -2005,32 +3055,609 @@ class Agent:
         
         if self in self.world.agents:
             self.world.agents.remove(self)
+            self.world.population_stats.remove(self)
+            self.world.agent_grid.remove(self, self.x, self.y)
+            self.world.vacate_tile(self)
             
         if self.home_location and self.home_location in self.world.homes:
-            self.world.homes[self.home_location]['owner_id'] = None
+            self.world.set_home_owner(self.home_location, None)
+
+# --- VECTORIZED NEEDS PASS ---
+
+class PopulationStore:
+    """
+    Struct-of-arrays view of the population for the vectorized needs pass.
+    Each turn the per-agent scalars (age, energy, social, love, timers, genes,
+    position, parents) are gathered into NumPy columns in id order, the whole
+    of Agent.update_needs() is computed column by column, and the results are
+    written back. Only the agents that survive go on to decide and act.
+    """
+    METABOLISM = GENE_NAMES.index('metabolism')
+    SOCIABILITY = GENE_NAMES.index('sociability')
+    DEATH_REASONS = (None, 'MAX_AGE', 'NATURAL_DEATH_OLD', 'STARVATION_CHILD', 'STARVATION_ADULT')
+    # Tiles within the campfire "cozy" radius of 2 (same test as get_nearest)
+    CAMPFIRE_OFFSETS = [(dx, dy) for dx in range(-2, 3) for dy in range(-2, 3) if dx * dx + dy * dy <= 4]
+
+    def __init__(self, world):
+        self.world = world
+        self.agents = []
+        self.columns = {}
+
+    def gather(self):
+        """Copies the living population into NumPy columns, in id order."""
+        agents = self.agents = list(self.world.agents)
+        n = len(agents)
+
+        def column(values, dtype=np.float64):
+            return np.fromiter(values, dtype, n)
+
+        def vectors(views, width):
+            return np.frombuffer(b''.join([view.vector.tobytes() for view in views])).reshape(n, width)
+
+        self.columns = {
+            'id': column((a.id for a in agents), np.int64),
+            'x': column((a.x for a in agents), np.int64),
+            'y': column((a.y for a in agents), np.int64),
+            'age': column((a.age for a in agents), np.int64),
+            'energy': column(a.energy for a in agents),
+            'social': column(a.social for a in agents),
+            'love': column(a.love for a in agents),
+            'struggle': column((a.struggle_timer for a in agents), np.int64),
+            'vision': column((a.vision_radius for a in agents), np.int64),
+            'social_buff_until': column((a._social_buff_timer_until for a in agents), np.int64),
+            'contentment_until': column((a._contentment_buff_timer_until for a in agents), np.int64),
+            'apathy_until': column((a._apathy_timer_until for a in agents), np.int64),
+            'sickness_until': column((a._sickness_timer_until for a in agents), np.int64),
+            'parents': np.array([(tuple(a.parent_ids) + (-1, -1))[:2] for a in agents], np.int64).reshape(n, 2),
+            'genes': vectors((a.genes for a in agents), len(GENE_NAMES)),
+        }
+
+    def rows_of(self, ids):
+        """Maps agent ids to rows of the current columns (-1 if not alive)."""
+        known = self.columns['id']
+        rows = np.minimum(np.searchsorted(known, ids), len(known) - 1)
+        return np.where(known[rows] == ids, rows, -1)
+
+    def home_owners(self):
+        """Owner id of the home on each agent's tile: -1 for no home, -2 for an unowned one."""
+        world = self.world
+        owners = np.full((world.height, world.width), -1, np.int64)
+        for (hx, hy), home_data in world.homes.items():
+            owner_id = home_data.get('owner_id')
+            owners[hy, hx] = -2 if owner_id is None else owner_id
+        return owners[self.columns['y'], self.columns['x']]
+
+    def campfire_flags(self):
+        """Returns (standing on a campfire, any campfire within radius 2) per agent."""
+        world = self.world
+        x, y = self.columns['x'] + 2, self.columns['y'] + 2
+        fires = np.zeros((world.height + 4, world.width + 4), bool)
+        fires[2:-2, 2:-2] = world.tile_mask(TILE_CAMPFIRE)
+        near = np.zeros(len(x), bool)
+        for dx, dy in self.CAMPFIRE_OFFSETS:
+            near |= fires[y + dy, x + dx]
+        return fires[y, x], near
+
+    def neighbour_counts(self):
+        """
+        Number of agents (including itself) within each agent's vision radius,
+        using the same disk as get_nearest_agents. Sums one prefix-summed row
+        span per dy instead of visiting neighbours.
+        """
+        world = self.world
+        width, height = world.width, world.height
+        x, y, radius = self.columns['x'], self.columns['y'], self.columns['vision']
+        per_tile = np.bincount(y * width + x, minlength=width * height).reshape(height, width)
+        prefix = np.zeros((height, width + 1), np.int64)
+        np.cumsum(per_tile, axis=1, out=prefix[:, 1:])
+
+        counts = np.zeros(len(x), np.int64)
+        radius_sq = radius * radius
+        for dy in range(-int(radius.max()), int(radius.max()) + 1):
+            row = y + dy
+            inside = (abs(dy) <= radius) & (row >= 0) & (row < height)
+            half = np.sqrt(np.maximum(radius_sq - dy * dy, 0)).astype(np.int64)
+            row = np.clip(row, 0, height - 1)
+            lo = np.clip(x - half, 0, width)
+            hi = np.clip(x + half + 1, 0, width)
+            counts += np.where(inside, prefix[row, hi] - prefix[row, lo], 0)
+        return counts
+
+    def update_needs(self):
+        """
+        Runs Agent.update_needs() for every living agent at once.
+        Returns the agents that are still alive afterwards, in id order.
+        """
+        config = self.world.config
+        world = self.world
+        self.gather()
+        agents = self.agents
+        if not agents:
+            return []
+        c = self.columns
+        ids, parents, turn = c['id'], c['parents'], world.turn
+        old_age = c['age']
+        energy, social, love = c['energy'], c['social'], c['love']
+
+        # 1. Update Age and Check for Death
+        age = old_age + 1
+        died_max_age = age >= config.MAX_AGE
+        died_old = ~died_max_age & (age >= config.OLD_AGE) & (energy < 100)
+
+        # 2. Parental care cost (children haven't aged yet this turn)
+        young = old_age < config.ADULT_AGE
+        parent_rows = self.rows_of(parents)
+        young_children = np.zeros(len(agents), np.int64)
+        for k in (0, 1):
+            rows = parent_rows[:, k][young & (parent_rows[:, k] >= 0)]
+            young_children += np.bincount(rows, minlength=len(agents))
+        parental_cost = young_children * 0.2
+
+        is_child = age < config.ADULT_AGE
+        metabolism_cost = np.where(is_child, np.minimum(parental_cost, 0.25), c['genes'][:, self.METABOLISM] + parental_cost)
+        child_starved = ~died_max_age & ~died_old & is_child & (energy < 10)
+        stopped = died_max_age | died_old | child_starved
+
+        # Home buff (Family/Owner only)
+        owner = self.home_owners()
+        is_family = young & (self.rows_of(owner) >= 0) & ((parents[:, 0] == owner) | (parents[:, 1] == owner))
+        at_home = (owner == ids) | is_family
+        metabolism_cost = np.where(at_home, metabolism_cost * 0.5, metabolism_cost)
+        energy = np.where(at_home & (energy < 150), np.clip(energy + 2.0, 0, 150), energy)
+        social = np.where(at_home, np.clip(social + 0.5, 0, 100), social)
+
+        # Social buff (Campfire is communal); buffs act up to and including their expiry turn
+        metabolism_cost = np.where(c['social_buff_until'] >= turn, metabolism_cost * 0.8, metabolism_cost)
+
+        # "Cozy" buff from a nearby campfire the agent isn't standing on
+        on_campfire, near_campfire = self.campfire_flags()
+        cozy = near_campfire & ~on_campfire
+        metabolism_cost = np.where(cozy, metabolism_cost * 0.9, metabolism_cost)
+        social = np.where(cozy, np.clip(social + 0.5, 0, 100), social)
+        love = np.where(cozy, np.clip(love + 0.1, 0, config.STARTING_LOVE), love)
+
+        metabolism_cost = np.where(c['apathy_until'] >= turn, metabolism_cost + config.APATHY_METABOLISM_PENALTY, metabolism_cost)
+        metabolism_cost = np.where(c['sickness_until'] >= turn, metabolism_cost + config.ENV_SICKNESS_METABOLISM_PENALTY, metabolism_cost)
+        apathy = c['apathy_until'] > turn # Still apathetic once this turn's tick is spent
+
+        energy = energy - metabolism_cost
+
+        # Update Social Need
+        social_loss_multiplier = np.where(apathy, config.APATHY_SOCIAL_LOSS_MULTIPLIER, 1.0)
+        lonely = (self.neighbour_counts() <= 1) & ~cozy
+        lonely_social = social - c['genes'][:, self.SOCIABILITY] * 0.5 * social_loss_multiplier
+        social = np.where(c['contentment_until'] >= turn, social, np.clip(np.where(lonely, lonely_social, social + 0.1), 0, 100))
+
+        # Struggle timer and love loss
+        struggling = (energy < 30) | (social < 20)
+        struggle = np.where(struggling, c['struggle'] + 1, 0)
+        love = np.where(struggling, np.clip(love - config.LOVE_LOSS_STRUGGLE, 0, config.STARTING_LOVE), love)
+        apathy_starts = (love <= 0) & ~apathy & ~stopped
+
+        # Agents that died before their metabolism ran keep their old needs
+        energy = np.where(stopped, c['energy'], energy)
+        social = np.where(stopped, c['social'], social)
+        love = np.where(stopped, c['love'], love)
+        struggle = np.where(stopped, c['struggle'], struggle)
+        starved = ~stopped & (energy <= 0)
+
+        # Forget children that grew up or died, using their pre-turn ages
+        for agent, count in zip(agents, young_children.tolist()):
+            if len(agent.children_ids) != count:
+                for child_id in list(agent.children_ids):
+                    child = world.get_agent_by_id(child_id)
+                    if not child or child.age >= config.ADULT_AGE:
+                        agent.children_ids.discard(child_id)
+
+        population_stats = world.population_stats
+        for agent, a, e, s, l, st in zip(agents, age.tolist(), energy.tolist(), social.tolist(), love.tolist(), struggle.tolist()):
+            agent.age = a
+            if a == config.ADULT_AGE:
+                population_stats.come_of_age(agent)
+            agent.energy = e
+            agent.social = s
+            agent.love = l
+            agent.struggle_timer = st
+
+        # Check if the agent's OWNED campfire is still active
+        for agent in agents:
+            if agent.campfire_location and agent.campfire_location not in world.campfires:
+                agent.campfire_location = None
+
+        for row in np.flatnonzero(apathy_starts).tolist():
+            agents[row].apathy_timer = config.APATHY_DURATION
+
+        self.update_library_skills(~stopped)
+
+        # 3. Check for death, in id order like the per-agent path
+        reasons = np.select([died_max_age, died_old, child_starved, starved], [1, 2, 3, 4], 0)
+        for row in np.flatnonzero(reasons).tolist():
+            agent = agents[row]
+            if agent in world.agents:
+                agent.die(self.DEATH_REASONS[reasons[row]])
+
+        return [agents[row] for row in np.flatnonzero(reasons == 0).tolist()]
+
+    def update_library_skills(self, learning):
+        """Global Knowledge Retrieval (The Library Effect) for the rows in `learning`."""
+        knowledge = self.world.global_skill_knowledge
+        if not knowledge or not self.world.config.LIBRARY_ENABLED:
+            return
+        agents = self.agents
+        target = np.array([knowledge.get(name, 0.0) for name in SKILL_NAMES])
+        skills = np.frombuffer(b''.join([a.skills.vector.tobytes() for a in agents])).reshape(len(agents), len(SKILL_NAMES))
+        behind = (skills < target) & learning[:, None]
+        learned = np.where(behind, np.clip(skills + 0.0001, 0, 10.0), skills)
+        for row, index in np.argwhere(behind).tolist():
+            agents[row].skills.set_at(index, learned[row, index].item())
+
+# --- RENDER GLYPH TABLES ---
+
+# Every state an agent can be in (the glyph table below is precomputed for these)
+AGENT_STATES = (
+    "WANDERING", "FORAGING", "FORAGING_FRUIT", "BUILDING", "WANDERING_TO_BUILD",
+    "SEEKING_COMMUNITY", "SEEKING_REMOTE_SPOT", "GETTING_WOOD", "PLANTING", "PLANTING_WOOD",
+    "GOING_HOME_TO_FARM", "GOING_HOME_TO_PLANT_WOOD", "SHARING", "BUILDING_CAMPFIRE",
+    "REPAIRING_HOME", "CLAIMING_HOME", "REFUELING_CAMPFIRE", "MATING", "SEEKING_MATE",
+    "ATTACKING", "RETALIATING", "AVENGING", "SEEKING_SOCIAL", "COMMUNICATING",
+    "SEEKING_LIBRARY", "SOCIAL_HAPPY", "SOCIAL_SAD",
+)
+
+def style_agent_glyph(state, sick, apathetic, speedy, social_buffed):
+    """Returns the styled map glyph for an agent in `state` with the given buff/debuff flags."""
+    color = Style.NORMAL + Fore.CYAN 
+    char = '?' 
+
+    if sick:
+        color = Style.NORMAL + Fore.GREEN
+
+    if apathetic:
+        color = Style.DIM + Fore.WHITE
+        char = 's' 
+
+    if speedy:
+        color = Style.BRIGHT + Fore.BLUE
+
+    if state == "WANDERING":
+        char = 'A'
+        if not social_buffed: 
+            color = Style.BRIGHT + Fore.CYAN
+    elif state == "FORAGING" or state == "FORAGING_FRUIT": 
+        char = 'f'
+        if not social_buffed:
+            color = Style.NORMAL + Fore.CYAN
+    elif state == "BUILDING":
+        char = 'b'
+        color = Style.BRIGHT + Fore.YELLOW
+    
+    elif state == "WANDERING_TO_BUILD":
+        char = 'B'
+        color = Style.NORMAL + Fore.BLUE
+    elif state == "SEEKING_COMMUNITY":
+        char = 'C'
+        color = Style.BRIGHT + Fore.BLUE
+    elif state == "SEEKING_REMOTE_SPOT":
+        char = 'S'
+        color = Style.DIM + Fore.BLUE
+        
+    elif state == "GETTING_WOOD":
+        char = 'w' 
+        color = Style.NORMAL + Fore.YELLOW
+    
+    elif state == "PLANTING" or state == "PLANTING_WOOD":
+        char = 'p'
+        if not social_buffed:
+            color = Style.NORMAL + Fore.GREEN
+    elif state == "GOING_HOME_TO_FARM" or state == "GOING_HOME_TO_PLANT_WOOD":
+        char = 'G'
+        color = Style.BRIGHT + Fore.GREEN
+    elif state == "SHARING":
+        char = 'g'
+        color = Style.BRIGHT + Fore.WHITE
+            
+    elif state == "BUILDING_CAMPFIRE":
+        char = 'c'
+        color = Style.NORMAL + Fore.RED
+    
+    elif state == "REPAIRING_HOME":
+        char = 'E' 
+        color = Style.BRIGHT + Fore.YELLOW
+    elif state == "CLAIMING_HOME":
+        char = 'k' 
+        color = Style.BRIGHT + Fore.BLUE
+    
+    elif state == "REFUELING_CAMPFIRE":
+        char = 'R' 
+        color = Style.BRIGHT + Fore.RED
+    
+    elif state == "MATING":
+        char = 'm'
+        color = Style.BRIGHT + Fore.MAGENTA 
+    elif state == "SEEKING_MATE":
+        char = 'M'
+        color = Style.BRIGHT + Fore.MAGENTA
+    elif state == "ATTACKING":
+        char = 'X'
+        color = Style.BRIGHT + Fore.RED 
+    
+    elif state == "RETALIATING":
+        char = 'r'
+        color = Style.BRIGHT + Fore.RED
+    
+    elif state == "AVENGING":
+        char = 'V'
+        color = Style.BRIGHT + Fore.RED
+    
+    elif state == "SEEKING_SOCIAL":
+        char = 't'
+        if not social_buffed:
+            color = Style.NORMAL + Fore.WHITE
+    elif state == "COMMUNICATING":
+        char = 'T'
+        color = Style.BRIGHT + Fore.WHITE 
+    
+    elif state == "SEEKING_LIBRARY": 
+        char = 'L' 
+        color = Style.BRIGHT + Fore.MAGENTA 
+    
+    elif state == "SOCIAL_HAPPY": 
+        char = 'o' 
+        color = Style.BRIGHT + Fore.MAGENTA
+    
+    elif state == "SOCIAL_SAD":
+        char = 's'
+        color = Style.DIM + Fore.MAGENTA 
+        
+    # Buff/debuff colours override the state colour, except for a few states
+    if apathetic and char != 's':
+        color = Style.DIM + Fore.WHITE 
+         
+    if speedy and char not in ['X', 'r', 'V', 'm', 'M', 's', 'T']:
+        color = Style.BRIGHT + Fore.BLUE
+    
+    if sick and char not in ['s', 'X', 'r', 'V', 'm', 'M']:
+        color = Style.NORMAL + Fore.GREEN
+
+    return color + char + Style.RESET_ALL
+
+# (state, sick, apathetic, speed buff, social buff) -> styled glyph
+AGENT_GLYPHS = {
+    (state, sick, apathetic, speedy, social_buffed): style_agent_glyph(state, sick, apathetic, speedy, social_buffed)
+    for state in AGENT_STATES
+    for sick in (False, True)
+    for apathetic in (False, True)
+    for speedy in (False, True)
+    for social_buffed in (False, True)
+}
+
+def build_legend_lines():
+    """The static legend block shown under the map."""
+    output_buffer = []
+    
+    output_buffer.append(Style.BRIGHT + "--- LEGEND ---" + Style.RESET_ALL)
+    output_buffer.append(
+        (Style.BRIGHT + Fore.WHITE + " Any" + Style.RESET_ALL + ": 'Wellbeing' Buff") + " | " + 
+        (Style.BRIGHT + Fore.BLUE + "Any" + Style.RESET_ALL + ": 'Speed' Buff") + " | " +
+        (Style.NORMAL + Fore.GREEN + "Any" + Style.RESET_ALL + ": 'Sick' Debuff")
+    )
+    
+    output_buffer.append(
+        (Style.BRIGHT + Fore.CYAN + " A" + Style.RESET_ALL + ": Wander") + " | " +
+        (Style.NORMAL + Fore.CYAN + " f" + Style.RESET_ALL + ": Forage (Food/Fruit)") + " | " + 
+        (Style.BRIGHT + Fore.MAGENTA + " L" + Style.RESET_ALL + ": Seek Library") + " | " +
+        (Style.BRIGHT + Fore.MAGENTA + " o" + Style.RESET_ALL + ": Happy/Linger") 
+    )
+    output_buffer.append(
+        (Style.DIM + Fore.MAGENTA + " s" + Style.RESET_ALL + ": Sad/Crisis/Apathy") + " | " +
+        (Style.NORMAL + Fore.WHITE + " t" + Style.RESET_ALL + ": Seek Social") + " | " +
+        (Style.BRIGHT + Fore.WHITE + " T" + Style.RESET_ALL + ": Communicate")
+    )
+    output_buffer.append(
+        (Style.BRIGHT + Fore.WHITE + " g" + Style.RESET_ALL + ": Share") + " | " + 
+        (Style.BRIGHT + Fore.RED + " X" + Style.RESET_ALL + ": Attack") + " | " +
+        (Style.BRIGHT + Fore.RED + " r" + Style.RESET_ALL + ": Retaliate") + " | " + 
+        (Style.BRIGHT + Fore.RED + " V" + Style.RESET_ALL + ": Avenge") + " | " + 
+        (Style.BRIGHT + Fore.MAGENTA + " m" + Style.RESET_ALL + ": Mate") + " | " + 
+        (Style.BRIGHT + Fore.MAGENTA + " M" + Style.RESET_ALL + ": Seek Mate")
+    )
+    output_buffer.append(
+        (Style.NORMAL + Fore.YELLOW + " w" + Style.RESET_ALL + ": Get Wood") + " | " +
+        (Style.BRIGHT + Fore.YELLOW + " b" + Style.RESET_ALL + ": Build Home") + " | " +
+        (Style.BRIGHT + Fore.YELLOW + " E" + Style.RESET_ALL + ": Repair Home")
+    )
+    output_buffer.append(
+        (Style.NORMAL + Fore.BLUE + " B" + Style.RESET_ALL + ": Seek Spot") + " | " +
+        (Style.BRIGHT + Fore.BLUE + " C" + Style.RESET_ALL + ": Seek Comm.") + " | " +
+        (Style.BRIGHT + Fore.BLUE + " k" + Style.RESET_ALL + ": Claim Home")
+    )
+    output_buffer.append(
+        (Style.NORMAL + Fore.RED + " c" + Style.RESET_ALL + ": Build Fire") + " | " +
+        (Style.BRIGHT + Fore.RED + " R" + Style.RESET_ALL + ": Refuel Fire") 
+    )
+
+    output_buffer.append(
+        (Style.NORMAL + Fore.GREEN + " p" + Style.RESET_ALL + ": Plant (Food/Tree/Fruit)") + " | " + 
+        (Style.BRIGHT + Fore.GREEN + " G" + Style.RESET_ALL + ": Go Home to Plant")
+    )
+    
+    output_buffer.append(
+        (Style.BRIGHT + Fore.GREEN + " F" + Style.RESET_ALL + ": Food") + " | " +
+        (Style.NORMAL + Fore.GREEN + " P" + Style.RESET_ALL + ": Plant") + " | " +
+        (Style.DIM + Fore.YELLOW + " T" + Style.RESET_ALL + ": Tree") + " | " +
+        (Style.BRIGHT + Fore.YELLOW + " W" + Style.RESET_ALL + ": Wood")
+    )
+    output_buffer.append(
+        (Style.BRIGHT + Fore.RED + " R" + Style.RESET_ALL + ": Energy Fruit") + " | " +
+        (Style.BRIGHT + Fore.MAGENTA + " P" + Style.RESET_ALL + ": Social Fruit") + " | " +
+        (Style.BRIGHT + Fore.BLUE + " B" + Style.RESET_ALL + ": Speed Fruit") + " | " +
+        (Style.DIM + Fore.MAGENTA + " b" + Style.RESET_ALL + ": Growing Bush")
+    )
+    output_buffer.append(
+        (Style.BRIGHT + Fore.BLUE + " H" + Style.RESET_ALL + ": Home") + " | " +
+        (Style.NORMAL + Fore.BLUE + " h" + Style.RESET_ALL + ": Damaged Home") + " | " +
+        (Style.BRIGHT + Fore.RED + " C" + Style.RESET_ALL + ": Campfire") + " | " +
+        (Style.BRIGHT + Fore.MAGENTA + " L" + Style.RESET_ALL + ": Library Location")
+    )
+    return output_buffer
+
+LEGEND_LINES = build_legend_lines()
+
+# Map glyphs for everything that isn't an agent
+TILE_GLYPHS = {
+    'empty': Style.DIM + Fore.WHITE + '.',
+    'food': Style.BRIGHT + Fore.GREEN + 'F',
+    'wood': Style.BRIGHT + Fore.YELLOW + 'W',
+    'plant': Style.NORMAL + Fore.GREEN + 'P',
+    'tree': Style.DIM + Fore.YELLOW + 'T',
+    'bush': Style.DIM + Fore.MAGENTA + 'b',
+    'campfire': Style.BRIGHT + Fore.RED + 'C',
+    'home': Style.BRIGHT + Fore.BLUE + 'H',
+    'damaged_home': Style.NORMAL + Fore.BLUE + 'h',
+    'library': Style.BRIGHT + Fore.MAGENTA + 'L',
+}
+FRUIT_GLYPHS = {
+    'energy': Style.BRIGHT + Fore.RED + 'R',
+    'social': Style.BRIGHT + Fore.MAGENTA + 'P',
+    'speed': Style.BRIGHT + Fore.BLUE + 'B',
+}
+UNKNOWN_FRUIT_GLYPH = Style.BRIGHT + Fore.WHITE + '?'
+
+# --- TICK PROFILER ---
+
+class TickProfiler:
+    """
+    Times every phase of World.update() with perf_counter_ns, plus the
+    per-agent sub-phases (needs, decision, action) summed over each turn and
+    DiffRenderer.render(). The last `window` samples of each phase are kept
+    for rolling percentiles. Enable with `world.profiler = TickProfiler()`;
+    World.update() and World.update_agents() then report to it through
+    start_tick(), lap(), record() and end_tick() as they run.
+    """
+    # Report order; the three agent sub-phases are part of 'update_agents'
+    PHASES = ('begin_turn', 'update_agents', 'update_needs', 'decide_state', 'execute_action',
+              'spawn_resources', 'update_world_objects', 'update_environment_feedback',
+              'calculate_stats', 'tick', 'render')
+    AGENT_PHASES = ('update_needs', 'decide_state', 'execute_action')
+
+    def __init__(self, window=PROFILE_WINDOW):
+        self.window = window
+        self.samples = {phase: deque(maxlen=window) for phase in self.PHASES}
+        self.turns = 0 # Turns profiled in total (not just the ones still in the window)
+        self.tick_start = self.phase_start = 0
+
+    def record(self, phase, ns):
+        self.samples[phase].append(ns)
+
+    def start_tick(self):
+        self.tick_start = self.phase_start = time.perf_counter_ns()
+
+    def lap(self, phase):
+        """Records the time since the previous lap (or the tick start) as `phase`."""
+        now = time.perf_counter_ns()
+        self.samples[phase].append(now - self.phase_start)
+        self.phase_start = now
+
+    def end_tick(self):
+        self.samples['tick'].append(self.phase_start - self.tick_start)
+        self.turns += 1
+
+    def report(self):
+        """
+        Rolling timings in milliseconds: for each phase with samples, its
+        p50/p95/p99/max/mean over the window and its share of the mean tick.
+        """
+        phases = {}
+        tick = self.samples['tick']
+        tick_mean = sum(tick) / len(tick) if tick else 0
+        for phase in self.PHASES:
+            values = sorted(self.samples[phase])
+            if not values:
+                continue
+            mean = sum(values) / len(values)
+            phases[phase] = {
+                'p50_ms': percentile(values, 0.50) / 1e6,
+                'p95_ms': percentile(values, 0.95) / 1e6,
+                'p99_ms': percentile(values, 0.99) / 1e6,
+                'max_ms': values[-1] / 1e6,
+                'mean_ms': mean / 1e6,
+                'share': mean / tick_mean if tick_mean and phase not in ('tick', 'render') else None,
+            }
+        return {'window': self.window, 'turns': self.turns, 'phases': phases}
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+def no_clock():
+    """Stands in for perf_counter_ns() while no profiler is attached."""
+    return 0
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile (0 < q <= 1) of an already sorted list."""
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def format_profile(report):
+    """Formats a TickProfiler.report() as plain text lines (a title line first)."""
+    sample_count = min(report['turns'], report['window'])
+    lines = ["--- TICK PROFILE (ms, last {} turns) ---".format(sample_count),
+             "  {:<28} {:>8} {:>8} {:>8} {:>8} {:>6}".format('phase', 'p50', 'p95', 'p99', 'max', 'share')]
+    for phase, timing in report['phases'].items():
+        name = ('  ' + phase) if phase in TickProfiler.AGENT_PHASES else phase
+        share = "{:>5.1f}%".format(timing['share'] * 100) if timing['share'] is not None else "{:>6}".format('-')
+        lines.append("  {:<28} {:>8.3f} {:>8.3f} {:>8.3f} {:>8.3f} {}".format(
+            name, timing['p50_ms'], timing['p95_ms'], timing['p99_ms'], timing['max_ms'], share))
+    return lines
 
 # --- WORLD CLASS ---
 
 class World:
-    def __init__(self, width, height):
+    def __init__(self, width, height, seed=None, config=None):
         self.width = width
         self.height = height
+        # Every tunable parameter of this world (SimConfig() = the module defaults)
+        if config is None:
+            config = SimConfig()
+        self.config = config
         self.turn = 0
         self.next_agent_id = 0 
         
-        self.agents = []
+        # Root seed: every random number in the world comes from a stream derived from it
+        # (drawn from the `random` module when not given)
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self.placement_rng = self.make_rng('placement') # starting population, add_agent positions
+        self.spawn_rng = self.make_rng('spawn') # resource spawning and auto-planting
+        self.environment_rng = self.make_rng('environment') # sickness and overpopulation checks
+        
+        self.agents = AgentRegistry()
+        # Per-phase timings (a TickProfiler), None when profiling is off
+        self.profiler = None
+        # Running gene/skill sums behind calculate_stats()
+        self.population_stats = PopulationStats(config.ADULT_AGE)
+        # Column store for the vectorized needs pass (None = per-agent updates)
+        self.population_store = None
+        if config.VECTORIZED_NEEDS:
+            if np is not None:
+                self.population_store = PopulationStore(self)
+            else:
+                print("NumPy not found. Running the per-agent needs update.")
+        # Spatial hash of agents, kept in sync by add_agent, move_agent and Agent.die
+        self.agent_grid = SpatialHash(config.AGENT_GRID_CELL_SIZE)
+        # Tile occupancy: (x,y) -> set of ids of the agents standing there
+        self.tile_agents = {}
         self.food = set()
         self.wood = set()
         # --- NEW: Fruit tracking ---
         self.fruits = set()
         self.fruit_types = {} # (x,y) -> 'energy'/'social'/'speed'
-        self.growing_fruit_bushes = {} # (x,y) -> timer
+        self.growing_fruit_bushes = {} # (x,y) -> turn it ripens
         # --- END NEW ---
         
         self.generation_count = 0
         
         # --- NEW: Environmental Health Tracker ---
-        self.environmental_health = ENV_HEALTH_MAX
+        self.environmental_health = config.ENV_HEALTH_MAX
         # --- END NEW ---
         
         self.death_causes = {
@@ -2044,16 +3671,44 @@ class World:
             'COMBAT_VENDETTA': 0,
             'COMBAT_CONFLICT': 0,
             'COMBAT_RETALIATION': 0,
-            'COMBAT_AGGRESSION': 0
+            'COMBAT_AGGRESSION': 0,
             # --- END MODIFIED ---
+            'TOTAL_DEATHS': 0 # Kept up to date by Agent.die()
         }
         
         self.homes = {} 
         
+        # Per-resource spatial indexes used by get_nearest / get_nearest_in_set
+        self.resource_grids = {
+            'food': SpatialHash(config.RESOURCE_GRID_CELL_SIZE),
+            'wood': SpatialHash(config.RESOURCE_GRID_CELL_SIZE),
+            'fruits': SpatialHash(config.RESOURCE_GRID_CELL_SIZE),
+            'campfires': SpatialHash(config.RESOURCE_GRID_CELL_SIZE),
+            'homes': SpatialHash(config.RESOURCE_GRID_CELL_SIZE),
+        }
+        
+        # These hold the turn each object matures/spoils/burns out, see set_timer()
         self.growing_plants = {} 
         self.growing_trees = {} 
         self.food_freshness = {} 
         self.campfires = {} 
+        self.timed_objects = {
+            'plant': self.growing_plants,
+            'tree': self.growing_trees,
+            'bush': self.growing_fruit_bushes,
+            'food': self.food_freshness,
+            'campfire': self.campfires,
+        }
+        self.object_timers = TimerWheel()
+        self.objects_turn = 0 # Last turn update_world_objects ran
+        # Campfire/home changes for the cached agent paths, see obstacle_changed()
+        self.obstacle_version = 0
+        self.obstacle_changes = {} # tile -> version of its last change
+        # Shared flow fields, see flow_step(): destination -> FlowField (None = stale, rebuilt on use)
+        self.flow_fields = {}
+        self.flow_users = {} # destination without a field yet -> ids of the agents that headed there
+        # Agent timers with expiry side effects (see TurnTimer): due turn -> (agent_id, timer name)
+        self.agent_timers = TimerWheel()
 
         # Global Knowledge Pool (for the 'Library' effect)
         self.global_skill_knowledge = {
@@ -2067,9 +3722,19 @@ class World:
         # Library Location
         self.library_location = (self.width // 2, self.height // 2)
 
+        # What is on each tile as TILE_* bits, index y * width + x. Kept in sync
+        # with the containers above by their add_*/remove_* methods.
+        self.tile_kinds = bytearray(width * height)
+        self.mark_tile(self.library_location, TILE_LIBRARY)
+
+        # Every tile with nothing on it (no object, no agent), for get_random_empty_tile()
+        self.free_tiles = TileSet(width, height)
+        self.free_tiles.fill()
+        self.free_tiles.discard(self.library_location)
+
         # Pre-initialize stats dictionary
         self.stats = {}
-        for gene in GENE_RANGES:
+        for gene in GENE_NAMES:
             self.stats['avg_{}'.format(gene)] = 0.0
         self.stats.update({
             'avg_foraging_skill': 0.0,
@@ -2082,9 +3747,13 @@ class World:
         self.stats.update({'population': 0, 'homes_built': 0, 'active_campfires': 0})
         
         # Make constants accessible
-        self.MIN_POPULATION_TARGET = MIN_POPULATION_TARGET
-        self.MAX_POPULATION_TARGET = MAX_POPULATION_TARGET
+        self.MIN_POPULATION_TARGET = config.MIN_POPULATION_TARGET
+        self.MAX_POPULATION_TARGET = config.MAX_POPULATION_TARGET
+
 
+    def make_rng(self, *tags):
+        """Returns a RandomStream derived from the world seed and `tags`."""
+        return RandomStream(derive_seed(self.seed, *tags))
 
     def get_next_agent_id(self):
         """Returns a unique ID for a new agent."""
@@ -2093,10 +3762,7 @@ class World:
 
     def get_agent_by_id(self, agent_id):
         """Finds an agent instance by its unique ID."""
-        for agent in self.agents:
-            if agent.id == agent_id:
-                return agent
-        return None
+        return self.agents.get(agent_id)
 
     def get_empty_home(self):
         """Finds the first available unclaimed home."""
@@ -2105,23 +3771,60 @@ class World:
                 return pos
         return None
 
-    def add_agent(self, x=None, y=None, genes=None):
+    def add_agent(self, x=None, y=None, genes=None, rng=None):
         if x is None:
-            x = random.randint(0, self.width - 1)
+            x = self.placement_rng.randint(0, self.width - 1)
         if y is None:
-            y = random.randint(0, self.height - 1)
+            y = self.placement_rng.randint(0, self.height - 1)
         
-        agent = Agent(x, y, self, genes)
+        agent = Agent(x, y, self, genes, rng)
         
-        if genes is None and len(self.agents) < STARTING_AGENTS:
-            agent.genes = agent.create_random_genes(stabilize=True)
+        if genes is None and len(self.agents) < self.config.STARTING_AGENTS:
+            agent.set_genes(agent.create_random_genes(stabilize=True))
             
-        self.agents.append(agent)
+        self.agents.add(agent)
+        self.population_stats.add(agent)
+        self.agent_grid.insert(agent, agent.x, agent.y)
+        self.occupy_tile(agent)
         return agent 
 
-    def add_fruit(self, pos, fruit_type):
-        """Adds a fruit of a specific type to a tile, replacing if necessary."""
-        if not self.is_tile_clear_for_planting(pos, check_agents=True):
+    def move_agent(self, agent, x, y):
+        """Moves an agent to (x, y), keeping the spatial index and tile occupancy up to date."""
+        self.agent_grid.move(agent, agent.x, agent.y, x, y)
+        self.vacate_tile(agent)
+        agent.x = x
+        agent.y = y
+        self.occupy_tile(agent)
+
+    def occupy_tile(self, agent):
+        """Records the agent as standing on its current tile."""
+        pos = (agent.x, agent.y)
+        occupants = self.tile_agents.get(pos)
+        if occupants is None:
+            occupants = self.tile_agents[pos] = set()
+            self.free_tiles.discard(pos)
+        occupants.add(agent.id)
+
+    def vacate_tile(self, agent):
+        """Removes the agent from its current tile's occupancy."""
+        pos = (agent.x, agent.y)
+        occupants = self.tile_agents.get(pos)
+        if occupants is not None:
+            occupants.discard(agent.id)
+            if not occupants:
+                del self.tile_agents[pos]
+                self.refresh_free_tile(pos)
+
+    def get_agent_ids_on_tile(self, pos):
+        """Returns the ids of the agents standing on a tile (empty if none)."""
+        return self.tile_agents.get(pos, ())
+
+    def add_fruit(self, pos, fruit_type, relocate=True):
+        """
+        Adds a fruit of a specific type to a tile. With `relocate`, an occupied
+        tile moves it to the nearest empty one (or drops it if there is none).
+        """
+        if relocate and not self.is_tile_clear_for_planting(pos, check_agents=True):
             nearby_empty = self.get_empty_tiles_near(pos, 1)
             if nearby_empty:
                 pos = nearby_empty[0]
@@ -2129,121 +3832,287 @@ class World:
                 return
                 
         self.fruits.add(pos)
+        self.resource_grids['fruits'].insert(pos, pos[0], pos[1])
+        self.mark_tile(pos, TILE_FRUIT)
+        self.free_tiles.discard(pos)
         self.fruit_types[pos] = fruit_type
 
+    def remove_fruit(self, pos):
+        """Removes a ripe fruit (and its type) from a tile."""
+        self.fruits.discard(pos)
+        self.resource_grids['fruits'].remove(pos, pos[0], pos[1])
+        self.fruit_types.pop(pos, None)
+        self.unmark_tile(pos, TILE_FRUIT)
+        self.refresh_free_tile(pos)
+
+    def add_food(self, pos):
+        """Places a fresh food item on a tile."""
+        self.food.add(pos)
+        self.resource_grids['food'].insert(pos, pos[0], pos[1])
+        self.mark_tile(pos, TILE_FOOD)
+        self.free_tiles.discard(pos)
+        self.set_timer('food', pos, self.config.FOOD_FRESHNESS)
+
+    def remove_food(self, pos):
+        """Removes a food item (and its freshness timer) from a tile."""
+        self.food.discard(pos)
+        self.resource_grids['food'].remove(pos, pos[0], pos[1])
+        self.food_freshness.pop(pos, None)
+        self.unmark_tile(pos, TILE_FOOD)
+        self.refresh_free_tile(pos)
+
+    def add_wood(self, pos):
+        """Places wood on a tile."""
+        self.wood.add(pos)
+        self.resource_grids['wood'].insert(pos, pos[0], pos[1])
+        self.mark_tile(pos, TILE_WOOD)
+        self.free_tiles.discard(pos)
+
+    def remove_wood(self, pos):
+        """Removes wood from a tile."""
+        self.wood.discard(pos)
+        self.resource_grids['wood'].remove(pos, pos[0], pos[1])
+        self.unmark_tile(pos, TILE_WOOD)
+        self.refresh_free_tile(pos)
+
+    def add_campfire(self, pos):
+        """Lights a new campfire on a tile."""
+        self.set_timer('campfire', pos, self.config.CAMPFIRE_BURN_TIME)
+        self.resource_grids['campfires'].insert(pos, pos[0], pos[1])
+        self.obstacle_changed(pos)
+
+    def remove_campfire(self, pos):
+        """Removes a burnt out campfire."""
+        self.campfires.pop(pos, None)
+        self.resource_grids['campfires'].remove(pos, pos[0], pos[1])
+        self.unmark_tile(pos, TILE_CAMPFIRE)
+        self.refresh_free_tile(pos)
+        self.obstacle_changed(pos)
+
+    def set_timer(self, kind, pos, duration):
+        """
+        (Re)starts the countdown of a timed object ('plant', 'tree', 'bush',
+        'food' or 'campfire'). It expires after `duration` world object updates
+        (at least one, so a duration <= 0 expires on the next update).
+        """
+        due_turn = self.objects_turn + max(duration, 1)
+        self.timed_objects[kind][pos] = due_turn
+        if TIMER_TILE_KINDS[kind]:
+            self.mark_tile(pos, TIMER_TILE_KINDS[kind])
+            self.free_tiles.discard(pos)
+        self.object_timers.schedule(due_turn, (kind, pos))
+
+    def time_left(self, kind, pos):
+        """Returns how many world object updates a timed object has left, or None."""
+        due_turn = self.timed_objects[kind].get(pos)
+        if due_turn is None:
+            return None
+        return due_turn - self.objects_turn
+
+    def add_home(self, pos, owner_id):
+        """Builds a new home on a tile."""
+        self.homes[pos] = {'owner_id': owner_id, 'durability': self.config.HOME_DURABILITY_START}
+        self.resource_grids['homes'].insert(pos, pos[0], pos[1])
+        self.mark_tile(pos, TILE_HOME)
+        self.free_tiles.discard(pos)
+        self.obstacle_changed(pos)
+
+    def remove_home(self, pos):
+        """Removes a collapsed home."""
+        self.homes.pop(pos, None)
+        self.resource_grids['homes'].remove(pos, pos[0], pos[1])
+        self.unmark_tile(pos, TILE_HOME)
+        self.refresh_free_tile(pos)
+        self.obstacle_changed(pos)
+
+    def mark_tile(self, pos, kind):
+        """Sets a TILE_* bit in tile_kinds."""
+        self.tile_kinds[pos[1] * self.width + pos[0]] |= kind
+
+    def unmark_tile(self, pos, kind):
+        """Clears a TILE_* bit in tile_kinds."""
+        self.tile_kinds[pos[1] * self.width + pos[0]] &= ~kind & 0xFF
+
+    def rebuild_tile_kinds(self):
+        """Recomputes tile_kinds from the containers (after restoring them directly)."""
+        self.tile_kinds = bytearray(self.width * self.height)
+        self.mark_tile(self.library_location, TILE_LIBRARY)
+        for tiles, kind in ((self.food, TILE_FOOD), (self.wood, TILE_WOOD), (self.fruits, TILE_FRUIT),
+                            (self.growing_plants, TILE_GROWING), (self.growing_trees, TILE_GROWING),
+                            (self.growing_fruit_bushes, TILE_GROWING), (self.campfires, TILE_CAMPFIRE),
+                            (self.homes, TILE_HOME)):
+            for pos in tiles:
+                self.mark_tile(pos, kind)
+
+    def tile_mask(self, kinds):
+        """A (height, width) NumPy bool array of the tiles holding any of the `kinds` bits."""
+        grid = np.frombuffer(self.tile_kinds, np.uint8).reshape(self.height, self.width)
+        return (grid & kinds) != 0
+
+    def count_tiles(self, kinds):
+        """Number of tiles holding any of the `kinds` bits."""
+        if np is not None:
+            return int(np.count_nonzero(self.tile_mask(kinds)))
+        return sum(1 for kind in self.tile_kinds if kind & kinds)
+
+    def refresh_free_tile(self, pos):
+        """Adds a tile to free_tiles if nothing is left on it, after something left it."""
+        if self.is_tile_clear_for_planting(pos, check_agents=True):
+            self.free_tiles.add(pos)
+        else:
+            self.free_tiles.discard(pos)
+
+    def set_home_owner(self, pos, owner_id):
+        """Hands a home to a new owner (None = unclaimed), which changes who it blocks."""
+        self.homes[pos]['owner_id'] = owner_id
+        self.obstacle_changed(pos)
+
+    def obstacle_changed(self, pos):
+        """
+        Records that a campfire or home appeared, went or changed owner on a
+        tile. Cached agent paths check their remaining tiles against this.
+        """
+        self.obstacle_version += 1
+        self.obstacle_changes[pos] = self.obstacle_version
+        self.flow_users.pop(pos, None)
+        self.flow_fields.pop(pos, None) # The destination itself changed
+        for goal, field in self.flow_fields.items():
+            if field is not None and field.covers(pos[0], pos[1]):
+                self.flow_fields[goal] = None # Rebuilt on its next use
+
+    def flow_step(self, agent, goal):
+        """
+        The agent's next tile towards a destination (the library, a home or a
+        campfire) from that destination's shared flow field. A field is built
+        once FLOW_FIELD_MIN_AGENTS different agents have headed there, and
+        rebuilt after a campfire or home changes inside it. None if there is
+        no field yet, or the agent is outside it or cut off from the goal.
+        """
+        if goal not in self.flow_fields:
+            users = self.flow_users.setdefault(goal, set())
+            users.add(agent.id)
+            if len(users) < self.config.FLOW_FIELD_MIN_AGENTS:
+                return None
+            del self.flow_users[goal]
+            self.flow_fields[goal] = None
+        field = self.flow_fields[goal]
+        if field is None:
+            field = self.flow_fields[goal] = FlowField(self, goal, self.config.FLOW_FIELD_RADIUS)
+        return field.step_from(agent.x, agent.y)
+
     def spawn_resources(self):
         """Spawns new food and wood on the map."""
         
         # --- NEW: Apply Environmental Health as Food Yield Multiplier ---
-        food_yield_multiplier = self.environmental_health / ENV_HEALTH_MAX
+        food_yield_multiplier = self.environmental_health / self.config.ENV_HEALTH_MAX if self.config.ENVIRONMENT_ENABLED else 1.0
         
         # Cap the number of new resources based on health
         food_spawn_count = int(5 * food_yield_multiplier)
         wood_spawn_count = int(3 * food_yield_multiplier)
         # --- END NEW ---
         
-        if self.turn % FOOD_SPAWN_RATE == 0:
+        if self.turn % self.config.FOOD_SPAWN_RATE == 0:
             for _ in range(food_spawn_count): 
                 if len(self.food) < (self.width * self.height * 0.1):
-                    tile = self.get_random_empty_tile()
+                    tile = self.get_random_empty_tile(self.spawn_rng)
                     if tile is not None:
-                        x, y = tile 
-                        self.food.add((x, y))
-                        self.food_freshness[(x,y)] = FOOD_FRESHNESS 
+                        self.add_food(tile)
 
-        if self.turn % WOOD_SPAWN_RATE == 0:
+        if self.turn % self.config.WOOD_SPAWN_RATE == 0:
             for _ in range(wood_spawn_count): 
                 if len(self.wood) < (self.width * self.height * 0.05):
-                    tile = self.get_random_empty_tile()
+                    tile = self.get_random_empty_tile(self.spawn_rng)
                     if tile is not None:
-                        x, y = tile
-                        self.wood.add((x, y))
+                        self.add_wood(tile)
         
         # --- NEW: Spawn Fruit ---
         fruit_spawn_count = int(2 * food_yield_multiplier) 
-        if self.turn % FRUIT_SPAWN_RATE == 0:
+        if self.config.FRUITS_ENABLED and self.turn % self.config.FRUIT_SPAWN_RATE == 0:
             for _ in range(fruit_spawn_count): 
                 if len(self.fruits) < (self.width * self.height * 0.05):
-                    tile = self.get_random_empty_tile()
+                    tile = self.get_random_empty_tile(self.spawn_rng)
                     if tile is not None:
-                        self.add_fruit(tile, random.choice(['energy', 'social', 'speed']))
+                        self.add_fruit(tile, self.spawn_rng.choice(['energy', 'social', 'speed']))
 
     def update_world_objects(self):
         """Update all plants, food freshness, and home durability."""
         
         # --- NEW: Passive Environmental Health Recovery ---
-        self.environmental_health = clamp(self.environmental_health + ENV_PASSIVE_RECOVERY_RATE, 0, ENV_HEALTH_MAX)
+        self.environmental_health = clamp(self.environmental_health + self.config.ENV_PASSIVE_RECOVERY_RATE, 0, self.config.ENV_HEALTH_MAX)
         # --- END NEW ---
         
-        # 1. Update Growing Plants (Food)
-        for pos, timer in list(self.growing_plants.items()):
-            timer -= 1
-            if timer <= 0:
+        # 1-3. Mature plants/trees/bushes, spoil food and burn out campfires.
+        # Only the objects due this turn are touched; stale (rescheduled or
+        # removed) entries no longer match their dict and are skipped.
+        turn = self.turn
+        due = self.object_timers.pop_due(turn)
+        while due:
+            expired = {'plant': [], 'tree': [], 'bush': [], 'food': [], 'campfire': []}
+            for kind, pos in due:
+                if self.timed_objects[kind].get(pos) == turn:
+                    expired[kind].append(pos)
+
+            # 1. Growing Plants (Food)
+            for pos in expired['plant']:
                 del self.growing_plants[pos]
+                self.growing_ended(pos)
                 if self.is_tile_clear_for_planting(pos):
-                    self.food.add(pos)
-                    self.food_freshness[pos] = FOOD_FRESHNESS 
-            else:
-                self.growing_plants[pos] = timer 
-                
-        # 1.5. Update Growing Trees (Wood)
-        for pos, timer in list(self.growing_trees.items()):
-            timer -= 1
-            if timer <= 0:
+                    self.add_food(pos)
+
+            # 1.5. Growing Trees (Wood)
+            for pos in expired['tree']:
                 del self.growing_trees[pos]
+                self.growing_ended(pos)
                 if self.is_tile_clear_for_planting(pos):
-                    self.wood.add(pos) 
-            else:
-                self.growing_trees[pos] = timer 
-        
-        # --- NEW: 1.8. Update Growing Fruit Bushes ---
-        for pos, timer in list(self.growing_fruit_bushes.items()):
-            timer -= 1
-            if timer <= 0:
+                    self.add_wood(pos)
+
+            # 1.8. Growing Fruit Bushes
+            for pos in expired['bush']:
                 del self.growing_fruit_bushes[pos]
+                self.growing_ended(pos)
                 fruit_type = self.fruit_types.get(pos)
                 if fruit_type and self.is_tile_clear_for_planting(pos):
-                    self.fruits.add(pos)
-            else:
-                self.growing_fruit_bushes[pos] = timer
+                    self.add_fruit(pos, fruit_type, relocate=False) # Ripens in place, even under an agent
+                else:
+                    self.refresh_free_tile(pos)
+
+            # 2. Food Spoilage
+            for pos in expired['food']:
+                self.remove_food(pos)
+
+            # 3. Campfires
+            for pos in expired['campfire']:
+                self.remove_campfire(pos)
+
+            # Anything scheduled for this very turn while expiring is handled too
+            due = self.object_timers.pop_due(turn)
+        self.objects_turn = turn
+
+        # --- NEW: Campfire Pollution (every fire still burning) ---
+        # One clamped step per fire, as the per-fire countdown did (keeps seeded runs identical)
+        for _ in range(len(self.campfires)):
+            self.environmental_health = clamp(self.environmental_health - self.config.ENV_DECAY_CAMPFIRE_POLLUTION, 0, self.config.ENV_HEALTH_MAX)
         # --- END NEW ---
                 
-        # 2. Update Food Spoilage
-        for pos, timer in list(self.food_freshness.items()):
-            timer -= 1
-            if timer <= 0:
-                del self.food_freshness[pos]
-                if pos in self.food:
-                    self.food.remove(pos)
-            else:
-                self.food_freshness[pos] = timer
-                
-        # 3. Update Campfires
-        for pos, timer in list(self.campfires.items()):
-            timer -= 1
-            if timer <= 0:
-                del self.campfires[pos]
-            else:
-                self.campfires[pos] = timer
-                # --- NEW: Campfire Pollution ---
-                self.environmental_health = clamp(self.environmental_health - ENV_DECAY_CAMPFIRE_POLLUTION, 0, ENV_HEALTH_MAX)
-                # --- END NEW ---
-                
         # 4. Update Home Decay 
-        if self.turn % HOME_DECAY_RATE == 0:
+        if self.turn % self.config.HOME_DECAY_RATE == 0:
             for pos, data in list(self.homes.items()):
                 data['durability'] -= 1
                 if data['durability'] <= 0:
-                    del self.homes[pos]
+                    self.remove_home(pos)
                     
                     for _ in range(3):
-                        self.wood.add(pos)
+                        self.add_wood(pos)
                         
                     if data['owner_id'] is not None:
-                        for agent in self.agents:
-                            if agent.id == data['owner_id']:
-                                agent.home_location = None
-                                break
+                        owner = self.get_agent_by_id(data['owner_id'])
+                        if owner:
+                            owner.home_location = None
+
+    def growing_ended(self, pos):
+        """Clears TILE_GROWING once no plant, tree or bush is left growing on a tile."""
+        if pos not in self.growing_plants and pos not in self.growing_trees and pos not in self.growing_fruit_bushes:
+            self.unmark_tile(pos, TILE_GROWING)
 
     def is_tile_clear_for_planting(self, pos, check_agents=False):
         """
@@ -2254,18 +4123,10 @@ class World:
         if not (0 <= x < self.width and 0 <= y < self.height):
             return False
             
-        if pos == self.library_location: return False
-        if pos in self.homes: return False
-        if pos in self.food: return False
-        if pos in self.wood: return False
-        if pos in self.growing_plants: return False
-        if pos in self.growing_trees: return False 
-        if pos in self.campfires: return False
-        if pos in self.fruits: return False
-        if pos in self.growing_fruit_bushes: return False
+        if self.tile_kinds[y * self.width + x]: return False
         
         if check_agents:
-            if any(agent.x == x and agent.y == y for agent in self.agents):
+            if pos in self.tile_agents:
                 return False
                 
         return True
@@ -2312,364 +4173,368 @@ class World:
         for _ in range(food_seeds):
             if tile_index < len(empty_tiles):
                 pos = empty_tiles[tile_index]
-                self.growing_plants[pos] = GROW_TIME
+                self.set_timer('plant', pos, self.config.GROW_TIME)
                 tile_index += 1
             else: break
             
         for _ in range(wood_seeds):
             if tile_index < len(empty_tiles):
                 pos = empty_tiles[tile_index]
-                self.growing_trees[pos] = TREE_GROW_TIME
+                self.set_timer('tree', pos, self.config.TREE_GROW_TIME)
                 tile_index += 1
             else: break
             
         for _ in range(fruit_seeds):
             if tile_index < len(empty_tiles):
                 pos = empty_tiles[tile_index]
-                self.growing_fruit_bushes[pos] = FRUIT_GROW_TIME
-                self.fruit_types[pos] = random.choice(['energy', 'social', 'speed'])
+                self.set_timer('bush', pos, self.config.FRUIT_GROW_TIME)
+                self.fruit_types[pos] = self.spawn_rng.choice(['energy', 'social', 'speed'])
                 tile_index += 1
             else: break
 
-    def get_random_empty_tile(self):
-        """Finds a random tile that isn't occupied by anything."""
-        attempts = 10
-        for _ in range(attempts):
-            x = random.randint(0, self.width - 1)
-            y = random.randint(0, self.height - 1)
-            pos = (x, y)
-            
-            if self.is_tile_clear_for_planting(pos, check_agents=True):
-                return x, y
-        return None 
+    def get_random_empty_tile(self, rng=None):
+        """
+        A uniformly random tile that isn't occupied by anything (using `rng`,
+        default the placement stream), or None if the world is full.
+        """
+        return self.free_tiles.choice(self.placement_rng if rng is None else rng)
+
+    def get_random_empty_tiles(self, count, rng=None):
+        """Up to `count` different random empty tiles, for seeding many objects at once."""
+        return self.free_tiles.sample(self.placement_rng if rng is None else rng, count)
 
     def update_environment_feedback(self):
         """Apply effects from the environment back onto the world and agents."""
+        config = self.config
+        if not config.ENVIRONMENT_ENABLED:
+            self.environmental_health = config.ENV_HEALTH_MAX # Undo this turn's gathering decay
+            return
         
         # 1. Check for Sickness
-        if self.environmental_health < ENV_SICKNESS_THRESHOLD:
+        if self.environmental_health < config.ENV_SICKNESS_THRESHOLD:
             for agent in self.agents:
-                if agent.sickness_timer == 0 and random.random() < ENV_SICKNESS_CHANCE:
-                    agent.sickness_timer = ENV_SICKNESS_DURATION
+                if agent.sickness_timer == 0 and self.environment_rng.random() < config.ENV_SICKNESS_CHANCE:
+                    agent.sickness_timer = config.ENV_SICKNESS_DURATION
                     
         # 2. Check for Overpopulation Density Decay
+        agent_list = list(self.agents)
         for _ in range(5): 
             if not self.agents: break
-            agent = random.choice(self.agents)
+            agent = self.environment_rng.choice(agent_list)
             
             nearby_count = 0
-            for other_agent in self.agents:
+            radius_sq = config.ENV_OVERPOPULATION_RADIUS * config.ENV_OVERPOPULATION_RADIUS
+            for other_agent in self.agent_grid.query(agent.x, agent.y, config.ENV_OVERPOPULATION_RADIUS):
                 if agent.id == other_agent.id: continue
-                if get_distance(agent.x, agent.y, other_agent.x, other_agent.y) < ENV_OVERPOPULATION_RADIUS:
+                if (other_agent.x - agent.x) * (other_agent.x - agent.x) + (other_agent.y - agent.y) * (other_agent.y - agent.y) < radius_sq:
                     nearby_count += 1
                     
-            if nearby_count > ENV_OVERPOPULATION_THRESHOLD:
-                self.environmental_health = clamp(self.environmental_health - ENV_OVERPOPULATION_DECAY, 0, ENV_HEALTH_MAX)
+            if nearby_count > config.ENV_OVERPOPULATION_THRESHOLD:
+                self.environmental_health = clamp(self.environmental_health - config.ENV_OVERPOPULATION_DECAY, 0, config.ENV_HEALTH_MAX)
                 break 
 
+    def expire_agent_timers(self):
+        """Fires the expiry side effects of agent timers that run out this turn."""
+        for agent_id, name in self.agent_timers.pop_due(self.turn):
+            agent = self.agents.get(agent_id)
+            if agent is None:
+                continue
+            timer = getattr(Agent, name)
+            # Skip timers that were reset or restarted since this entry was scheduled
+            if getattr(agent, timer.attr) == self.turn:
+                getattr(agent, timer.on_expire)()
+
+    # The phases of one World.update(), in order (also TickProfiler's phase names)
+    UPDATE_PHASES = ('begin_turn', 'update_agents', 'spawn_resources', 'update_world_objects',
+                     'update_environment_feedback', 'calculate_stats')
+
     def update(self):
-        """Main update loop for the world."""
+        """Main update loop for the world; an attached profiler times every phase."""
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start_tick()
+        for phase in self.UPDATE_PHASES:
+            getattr(self, phase)()
+            if profiler is not None:
+                profiler.lap(phase)
+        if profiler is not None:
+            profiler.end_tick()
+
+    def begin_turn(self):
+        """Advances the turn counter and fires the agent timers due this turn."""
         self.turn += 1
         
-        if self.turn % MAX_AGE == 0:
+        if self.turn % self.config.MAX_AGE == 0:
             self.generation_count += 1
-        
-        for agent in self.agents[:]:
+
+        self.expire_agent_timers()
+
+    def update_agents(self):
+        """
+        Runs every living agent's needs, decision and action for this turn
+        (the steps of Agent.update(), with the needs of everyone done at once
+        when the vectorized needs pass is on). With a
+        profiler attached, the time spent in each of the three is summed over
+        the turn and recorded; otherwise the clock is no_clock().
+        """
+        profiler = self.profiler
+        clock = time.perf_counter_ns if profiler is not None else no_clock
+        store = self.population_store
+        needs = decide = act = 0
+        if store is not None:
+            t0 = clock()
+            agents = store.update_needs()
+            needs = clock() - t0
+        else:
+            agents = list(self.agents)
+
+        for agent in agents:
             if agent in self.agents:
-                agent.update()
-            
-        self.spawn_resources()
-        
-        self.update_world_objects()
-        
-        self.update_environment_feedback() 
-        
-        self.calculate_stats()
+                t0 = clock()
+                if store is None and not agent.update_needs():
+                    needs += clock() - t0
+                    continue
+                t1 = clock()
+                agent.decide_state()
+                t2 = clock()
+                agent.execute_action()
+                needs += t1 - t0
+                decide += t2 - t1
+                act += clock() - t2
+
+        if profiler is not None:
+            profiler.record('update_needs', needs)
+            profiler.record('decide_state', decide)
+            profiler.record('execute_action', act)
         
     def calculate_stats(self):
-        """Calculates and updates the stats dictionary."""
-        adult_agents = [agent for agent in self.agents if agent.age >= ADULT_AGE]
-        
-        if not adult_agents:
-            agents_for_stats = self.agents
-        else:
-            agents_for_stats = adult_agents
-            
-        if not agents_for_stats:
+        """Updates the stats dictionary from the running population sums (see PopulationStats)."""
+        recount_every = self.config.STATS_RECOUNT_EVERY
+        if recount_every and self.turn % recount_every == 0:
+            self.population_stats.recount(self.agents)
+        num_agents, gene_sums, skill_sums = self.population_stats.cohort()
+
+        if not num_agents:
             for k in self.stats: self.stats[k] = 0
-            self.stats['avg_mating_drive'] = 0 
-            self.stats['population'] = 0
-            self.stats['homes_built'] = 0
-            self.stats['active_campfires'] = 0
-            
-            total_deaths = 0
-            for reason, count in self.death_causes.items():
-                if reason != 'TOTAL_DEATHS':
-                    total_deaths += count
-            self.death_causes['TOTAL_DEATHS'] = total_deaths
-            
-            if 'UNKNOWN' in self.death_causes:
-                del self.death_causes['UNKNOWN']
-            return
-            
-        num_agents = len(agents_for_stats)
-            
-        self.stats['population'] = len(self.agents) 
-        self.stats['homes_built'] = len(self.homes) 
-        self.stats['active_campfires'] = len(self.campfires)
-        
-        for gene in GENE_RANGES:
-            avg_key = 'avg_{}'.format(gene) 
-            total = sum(agent.genes[gene] for agent in agents_for_stats)
-            self.stats[avg_key] = total / num_agents
-            
-        skill_list = ['foraging', 'social', 'building', 'navigation', 'combat', 'farming']
-        for skill in skill_list:
-            avg_key = 'avg_{}_skill'.format(skill)
-            total = sum(agent.skills[skill] for agent in agents_for_stats)
-            self.stats[avg_key] = total / num_agents
-            
-        total_deaths = 0
-        for reason, count in self.death_causes.items():
-            if reason != 'TOTAL_DEATHS':
-                total_deaths += count
-        self.death_causes['TOTAL_DEATHS'] = total_deaths
-        
+        else:
+            self.stats['population'] = len(self.agents) 
+            self.stats['homes_built'] = len(self.homes) 
+            self.stats['active_campfires'] = len(self.campfires)
+            for avg_key, total in zip(PopulationStats.GENE_KEYS, gene_sums):
+                self.stats[avg_key] = total / num_agents
+            for avg_key, total in zip(PopulationStats.SKILL_KEYS, skill_sums):
+                self.stats[avg_key] = total / num_agents
+
         if 'UNKNOWN' in self.death_causes:
             del self.death_causes['UNKNOWN']
 
+    # --- CHECKPOINT STATE ---
+
+    # Agent slots saved one column each (memory, genes, skills and the random stream are packed separately)
+    CHECKPOINT_AGENT_FIELDS = tuple(
+        name for name in Agent.__slots__ if name not in ('world', 'rng', 'memory', 'genes', 'skills', 'vision_radius')
+    )
+    WORLD_STREAMS = ('placement_rng', 'spawn_rng', 'environment_rng')
+
+    def snapshot(self):
+        """
+        Returns the complete world state as plain data (no object references):
+        agents, resources, timers, counters, the config, the seed and every random stream.
+        Spatial indexes and tile occupancy are derived data and not included.
+        """
+        # Agents are stored column by column (see pack_checkpoint_column), in id order
+        agents = list(self.agents)
+        memories = [agent.memory for agent in agents]
+        genes, skills = array('d'), array('d')
+        for agent in agents:
+            genes.extend(agent.genes.vector)
+            skills.extend(agent.skills.vector)
+        agent_data = {
+            'count': len(agents),
+            'fields': tuple(pack_checkpoint_column([getattr(agent, name) for agent in agents])
+                            for name in self.CHECKPOINT_AGENT_FIELDS),
+            'memory': tuple(pack_checkpoint_column([getattr(memory, key) for memory in memories])
+                            for key in AgentMemory.__slots__),
+            'genes': genes.tobytes(),
+            'skills': skills.tobytes(),
+            'rng': array('Q', [agent.rng.state for agent in agents]).tobytes(),
+        }
+
+        return {
+            'width': self.width,
+            'height': self.height,
+            'seed': self.seed,
+            'config': self.config.as_dict(),
+            'turn': self.turn,
+            'next_agent_id': self.next_agent_id,
+            'generation_count': self.generation_count,
+            'environmental_health': self.environmental_health,
+            'death_causes': dict(self.death_causes),
+            'global_skill_knowledge': dict(self.global_skill_knowledge),
+            'library_location': self.library_location,
+            'stats': dict(self.stats),
+            'population_stats': self.population_stats.state(),
+            'food': set(self.food),
+            'wood': set(self.wood),
+            'fruits': set(self.fruits),
+            'fruit_types': dict(self.fruit_types),
+            'homes': {pos: dict(data) for pos, data in self.homes.items()},
+            'timed_objects': {kind: dict(timers) for kind, timers in self.timed_objects.items()},
+            'objects_turn': self.objects_turn,
+            'free_tiles': self.free_tiles.state(), # Its order decides which tile a draw picks
+            'obstacle_version': self.obstacle_version,
+            'obstacle_changes': dict(self.obstacle_changes),
+            'flow_field_goals': list(self.flow_fields), # The fields themselves are rebuilt on use
+            'flow_users': {goal: set(users) for goal, users in self.flow_users.items()},
+            'object_timers': {turn: list(keys) for turn, keys in self.object_timers.buckets.items()},
+            'agent_timers': {turn: list(keys) for turn, keys in self.agent_timers.buckets.items()},
+            'gene_names': GENE_NAMES,
+            'skill_names': SKILL_NAMES,
+            'agent_fields': self.CHECKPOINT_AGENT_FIELDS,
+            'agents': agent_data,
+            'rng_states': {name: getattr(self, name).state for name in self.WORLD_STREAMS},
+        }
+
+    @classmethod
+    def from_snapshot(cls, data):
+        """Rebuilds a World (including its spatial indexes) from snapshot() data."""
+        if data['gene_names'] != GENE_NAMES or data['skill_names'] != SKILL_NAMES:
+            raise ValueError("Checkpoint was saved with a different set of genes or skills.")
+
+        world = cls(data['width'], data['height'], data['seed'], SimConfig(**data['config']))
+        for name, state in data['rng_states'].items():
+            getattr(world, name).state = state
+        world.turn = data['turn']
+        world.next_agent_id = data['next_agent_id']
+        world.generation_count = data['generation_count']
+        world.environmental_health = data['environmental_health']
+        world.death_causes = dict(data['death_causes'])
+        world.global_skill_knowledge = dict(data['global_skill_knowledge'])
+        world.library_location = tuple(data['library_location'])
+        world.stats.update(data['stats'])
+
+        for pos in data['food']:
+            world.food.add(pos)
+            world.resource_grids['food'].insert(pos, pos[0], pos[1])
+        for pos in data['wood']:
+            world.add_wood(pos)
+        for pos in data['fruits']:
+            world.fruits.add(pos)
+            world.resource_grids['fruits'].insert(pos, pos[0], pos[1])
+        world.fruit_types.update(data['fruit_types'])
+        for pos, home_data in data['homes'].items():
+            world.homes[pos] = dict(home_data)
+            world.resource_grids['homes'].insert(pos, pos[0], pos[1])
+
+        # Timer dicts are shared with timed_objects, so fill them in place
+        for kind, timers in data['timed_objects'].items():
+            world.timed_objects[kind].update(timers)
+        for pos in world.campfires:
+            world.resource_grids['campfires'].insert(pos, pos[0], pos[1])
+        world.objects_turn = data['objects_turn']
+        world.obstacle_version = data['obstacle_version']
+        world.obstacle_changes = dict(data['obstacle_changes'])
+        world.flow_fields = dict.fromkeys(data['flow_field_goals'])
+        world.flow_users = {goal: set(users) for goal, users in data['flow_users'].items()}
+        world.object_timers.buckets = {turn: list(keys) for turn, keys in data['object_timers'].items()}
+        world.agent_timers.buckets = {turn: list(keys) for turn, keys in data['agent_timers'].items()}
+
+        agent_data = data['agents']
+        count = agent_data['count']
+        agents = [Agent.__new__(Agent) for _ in range(count)]
+        memories = [AgentMemory.__new__(AgentMemory) for _ in range(count)]
+        for name, column in zip(data['agent_fields'], agent_data['fields']):
+            for agent, value in zip(agents, unpack_checkpoint_column(column, count)):
+                setattr(agent, name, value)
+        for key, column in zip(AgentMemory.__slots__, agent_data['memory']):
+            for memory, value in zip(memories, unpack_checkpoint_column(column, count)):
+                setattr(memory, key, value)
+        genes = array('d', agent_data['genes'])
+        skills = array('d', agent_data['skills'])
+        rng_states = unpack_checkpoint_column(('Q', agent_data['rng']), count)
+        gene_count, skill_count = len(GENE_NAMES), len(SKILL_NAMES)
+        if len(genes) != count * gene_count or len(skills) != count * skill_count:
+            raise ValueError("Checkpoint gene or skill data doesn't match its {} agents.".format(count))
+
+        for i, agent in enumerate(agents):
+            agent.world = world
+            agent.rng = RandomStream(rng_states[i])
+            if not agent.parent_ids:
+                agent.parent_ids = NO_IDS
+            agent.memory = memories[i]
+            agent.genes = GeneView(genes[i * gene_count:(i + 1) * gene_count])
+            agent.vision_radius = int(agent.genes['vision'])
+            agent.skills = SkillView(skills[i * skill_count:(i + 1) * skill_count])
+
+            world.agents.add(agent)
+            world.population_stats.attach(agent) # The sums themselves are restored below
+            world.agent_grid.insert(agent, agent.x, agent.y)
+            world.occupy_tile(agent)
+        world.population_stats.set_state(data['population_stats'])
+        world.rebuild_tile_kinds()
+        world.free_tiles.set_state(data['free_tiles'])
+
+        return world
+
     def render(self):
-        """Renders the current state of the world to the console."""
+        """Renders the current state of the world to the console (full redraw)."""
+        print(join_frame(*self.build_frame()))
+
+    def build_frame(self):
+        """
+        Builds the current frame as (header line, grid of per-cell strings,
+        list of legend/stats lines). Used by render() and DiffRenderer.
+        """
         
-        grid = [[(Style.DIM + Fore.WHITE + '.') for _ in range(self.width)] for _ in range(self.height)]
+        grid = [[TILE_GLYPHS['empty']] * self.width for _ in range(self.height)]
         
-        # 1. Draw AGENTS first
+        # 1. Draw AGENTS first (timer expiry turns are compared directly, see TurnTimer)
+        turn = self.turn
+        agent_glyphs = AGENT_GLYPHS
         for agent in self.agents:
-            is_at_home = agent.home_location is not None and (agent.x, agent.y) == agent.home_location
-            if is_at_home:
+            if agent.home_location is not None and (agent.x, agent.y) == agent.home_location:
                 continue 
-                
-            color = Style.NORMAL + Fore.CYAN 
-            char = '?' 
-
-            if agent.sickness_timer > 0:
-                color = Style.NORMAL + Fore.GREEN
-
-            if agent.apathy_timer > 0:
-                color = Style.DIM + Fore.WHITE
-                char = 's' 
-
-            if agent.speed_buff_timer > 0:
-                color = Style.BRIGHT + Fore.BLUE
-
-            if agent.state == "WANDERING":
-                char = 'A'
-                if agent.social_buff_timer == 0: 
-                    color = Style.BRIGHT + Fore.CYAN
-            elif agent.state == "FORAGING" or agent.state == "FORAGING_FRUIT": 
-                char = 'f'
-                if agent.social_buff_timer == 0:
-                    color = Style.NORMAL + Fore.CYAN
-            elif agent.state == "BUILDING":
-                char = 'b'
-                color = Style.BRIGHT + Fore.YELLOW
-            
-            elif agent.state == "WANDERING_TO_BUILD":
-                char = 'B'
-                color = Style.NORMAL + Fore.BLUE
-            elif agent.state == "SEEKING_COMMUNITY":
-                char = 'C'
-                color = Style.BRIGHT + Fore.BLUE
-            elif agent.state == "SEEKING_REMOTE_SPOT":
-                char = 'S'
-                color = Style.DIM + Fore.BLUE
-                
-            elif agent.state == "GETTING_WOOD":
-                char = 'w' 
-                color = Style.NORMAL + Fore.YELLOW
-            
-            elif agent.state == "PLANTING" or agent.state == "PLANTING_WOOD":
-                char = 'p'
-                if agent.social_buff_timer == 0:
-                    color = Style.NORMAL + Fore.GREEN
-            elif agent.state == "GOING_HOME_TO_FARM" or agent.state == "GOING_HOME_TO_PLANT_WOOD":
-                char = 'G'
-                color = Style.BRIGHT + Fore.GREEN
-            elif agent.state == "SHARING":
-                char = 'g'
-                color = Style.BRIGHT + Fore.WHITE
-                    
-            elif agent.state == "BUILDING_CAMPFIRE":
-                char = 'c'
-                color = Style.NORMAL + Fore.RED
-            
-            elif agent.state == "REPAIRING_HOME":
-                char = 'E' 
-                color = Style.BRIGHT + Fore.YELLOW
-            elif agent.state == "CLAIMING_HOME":
-                char = 'k' 
-                color = Style.BRIGHT + Fore.BLUE
-            
-            elif agent.state == "REFUELING_CAMPFIRE":
-                char = 'R' 
-                color = Style.BRIGHT + Fore.RED
-            
-            elif agent.state == "MATING":
-                char = 'm'
-                color = Style.BRIGHT + Fore.MAGENTA 
-            elif agent.state == "SEEKING_MATE":
-                char = 'M'
-                color = Style.BRIGHT + Fore.MAGENTA
-            elif agent.state == "ATTACKING":
-                char = 'X'
-                color = Style.BRIGHT + Fore.RED 
-            
-            elif agent.state == "RETALIATING":
-                char = 'r'
-                color = Style.BRIGHT + Fore.RED
-            
-            elif agent.state == "AVENGING":
-                char = 'V'
-                color = Style.BRIGHT + Fore.RED
-            
-            elif agent.state == "SEEKING_SOCIAL":
-                char = 't'
-                if agent.social_buff_timer == 0:
-                    color = Style.NORMAL + Fore.WHITE
-            elif agent.state == "COMMUNICATING":
-                char = 'T'
-                color = Style.BRIGHT + Fore.WHITE 
-            
-            elif agent.state == "SEEKING_LIBRARY": 
-                char = 'L' 
-                color = Style.BRIGHT + Fore.MAGENTA 
-            
-            elif agent.state == "SOCIAL_HAPPY": 
-                char = 'o' 
-                color = Style.BRIGHT + Fore.MAGENTA
-            
-            elif agent.state == "SOCIAL_SAD":
-                char = 's'
-                color = Style.DIM + Fore.MAGENTA 
-                
-            if agent.apathy_timer > 0 and char != 's':
-                 color = Style.DIM + Fore.WHITE 
-                 
-            if agent.speed_buff_timer > 0 and char not in ['X', 'r', 'V', 'm', 'M', 's', 'T']:
-                 color = Style.BRIGHT + Fore.BLUE
-            
-            if agent.sickness_timer > 0 and char not in ['s', 'X', 'r', 'V', 'm', 'M']:
-                color = Style.NORMAL + Fore.GREEN
-                 
-            grid[agent.y][agent.x] = color + char + Style.RESET_ALL
+            key = (agent.state, agent._sickness_timer_until > turn, agent._apathy_timer_until > turn,
+                   agent._speed_buff_timer_until > turn, agent._social_buff_timer_until > turn)
+            glyph = agent_glyphs.get(key)
+            if glyph is None:
+                glyph = agent_glyphs[key] = style_agent_glyph(*key)
+            grid[agent.y][agent.x] = glyph
 
         # 2. Draw Resources
+        glyph = TILE_GLYPHS['food']
         for (x, y) in self.food:
-            grid[y][x] = Style.BRIGHT + Fore.GREEN + 'F'
+            grid[y][x] = glyph
+        glyph = TILE_GLYPHS['wood']
         for (x, y) in self.wood:
-            grid[y][x] = Style.BRIGHT + Fore.YELLOW + 'W'
+            grid[y][x] = glyph
+        fruit_types = self.fruit_types
         for (x, y) in self.fruits:
-            fruit_type = self.fruit_types.get((x,y))
-            if fruit_type == 'energy':
-                grid[y][x] = Style.BRIGHT + Fore.RED + 'R'
-            elif fruit_type == 'social':
-                grid[y][x] = Style.BRIGHT + Fore.MAGENTA + 'P'
-            elif fruit_type == 'speed':
-                grid[y][x] = Style.BRIGHT + Fore.BLUE + 'B'
-            else:
-                grid[y][x] = Style.BRIGHT + Fore.WHITE + '?' 
+            grid[y][x] = FRUIT_GLYPHS.get(fruit_types.get((x, y)), UNKNOWN_FRUIT_GLYPH)
+        glyph = TILE_GLYPHS['plant']
         for (x, y) in self.growing_plants:
-            grid[y][x] = Style.NORMAL + Fore.GREEN + 'P'
+            grid[y][x] = glyph
+        glyph = TILE_GLYPHS['tree']
         for (x, y) in self.growing_trees:
-            grid[y][x] = Style.DIM + Fore.YELLOW + 'T'
+            grid[y][x] = glyph
+        glyph = TILE_GLYPHS['bush']
         for (x, y) in self.growing_fruit_bushes:
-            grid[y][x] = Style.DIM + Fore.MAGENTA + 'b'
+            grid[y][x] = glyph
+        glyph = TILE_GLYPHS['campfire']
         for (x, y) in self.campfires:
-            grid[y][x] = Style.BRIGHT + Fore.RED + 'C'
+            grid[y][x] = glyph
 
         # 3. Draw HOMES last
         for (x, y), data in self.homes.items():
-            if data['durability'] < 2:
-                grid[y][x] = Style.NORMAL + Fore.BLUE + 'h' 
-            else:
-                grid[y][x] = Style.BRIGHT + Fore.BLUE + 'H' 
+            grid[y][x] = TILE_GLYPHS['damaged_home'] if data['durability'] < 2 else TILE_GLYPHS['home']
             
         # 4. Draw the LIBRARY 
         lx, ly = self.library_location
-        grid[ly][lx] = Style.BRIGHT + Fore.MAGENTA + 'L'
+        grid[ly][lx] = TILE_GLYPHS['library']
         
-        output_buffer = []
+        header = "--- A-Life Simulation --- Turn: {} --- Generation: {} ---".format(self.turn, self.generation_count)
         
-        output_buffer.append("\033[H") 
-        
-        output_buffer.append("--- A-Life Simulation --- Turn: {} --- Generation: {} ---".format(self.turn, self.generation_count))
-        for row in grid:
-            output_buffer.append(" ".join(row)) 
-            
-        output_buffer.append(Style.BRIGHT + "--- LEGEND ---" + Style.RESET_ALL)
-        output_buffer.append(
-            (Style.BRIGHT + Fore.WHITE + " Any" + Style.RESET_ALL + ": 'Wellbeing' Buff") + " | " + 
-            (Style.BRIGHT + Fore.BLUE + "Any" + Style.RESET_ALL + ": 'Speed' Buff") + " | " +
-            (Style.NORMAL + Fore.GREEN + "Any" + Style.RESET_ALL + ": 'Sick' Debuff")
-        )
-        
-        output_buffer.append(
-            (Style.BRIGHT + Fore.CYAN + " A" + Style.RESET_ALL + ": Wander") + " | " +
-            (Style.NORMAL + Fore.CYAN + " f" + Style.RESET_ALL + ": Forage (Food/Fruit)") + " | " + 
-            (Style.BRIGHT + Fore.MAGENTA + " L" + Style.RESET_ALL + ": Seek Library") + " | " +
-            (Style.BRIGHT + Fore.MAGENTA + " o" + Style.RESET_ALL + ": Happy/Linger") 
-        )
-        output_buffer.append(
-            (Style.DIM + Fore.MAGENTA + " s" + Style.RESET_ALL + ": Sad/Crisis/Apathy") + " | " +
-            (Style.NORMAL + Fore.WHITE + " t" + Style.RESET_ALL + ": Seek Social") + " | " +
-            (Style.BRIGHT + Fore.WHITE + " T" + Style.RESET_ALL + ": Communicate")
-        )
-        output_buffer.append(
-            (Style.BRIGHT + Fore.WHITE + " g" + Style.RESET_ALL + ": Share") + " | " + 
-            (Style.BRIGHT + Fore.RED + " X" + Style.RESET_ALL + ": Attack") + " | " +
-            (Style.BRIGHT + Fore.RED + " r" + Style.RESET_ALL + ": Retaliate") + " | " + 
-            (Style.BRIGHT + Fore.RED + " V" + Style.RESET_ALL + ": Avenge") + " | " + 
-            (Style.BRIGHT + Fore.MAGENTA + " m" + Style.RESET_ALL + ": Mate") + " | " + 
-            (Style.BRIGHT + Fore.MAGENTA + " M" + Style.RESET_ALL + ": Seek Mate")
-        )
-        output_buffer.append(
-            (Style.NORMAL + Fore.YELLOW + " w" + Style.RESET_ALL + ": Get Wood") + " | " +
-            (Style.BRIGHT + Fore.YELLOW + " b" + Style.RESET_ALL + ": Build Home") + " | " +
-            (Style.BRIGHT + Fore.YELLOW + " E" + Style.RESET_ALL + ": Repair Home")
-        )
-        output_buffer.append(
-            (Style.NORMAL + Fore.BLUE + " B" + Style.RESET_ALL + ": Seek Spot") + " | " +
-            (Style.BRIGHT + Fore.BLUE + " C" + Style.RESET_ALL + ": Seek Comm.") + " | " +
-            (Style.BRIGHT + Fore.BLUE + " k" + Style.RESET_ALL + ": Claim Home")
-        )
-        output_buffer.append(
-            (Style.NORMAL + Fore.RED + " c" + Style.RESET_ALL + ": Build Fire") + " | " +
-            (Style.BRIGHT + Fore.RED + " R" + Style.RESET_ALL + ": Refuel Fire") 
-        )
-
-        output_buffer.append(
-            (Style.NORMAL + Fore.GREEN + " p" + Style.RESET_ALL + ": Plant (Food/Tree/Fruit)") + " | " + 
-            (Style.BRIGHT + Fore.GREEN + " G" + Style.RESET_ALL + ": Go Home to Plant")
-        )
-        
-        output_buffer.append(
-            (Style.BRIGHT + Fore.GREEN + " F" + Style.RESET_ALL + ": Food") + " | " +
-            (Style.NORMAL + Fore.GREEN + " P" + Style.RESET_ALL + ": Plant") + " | " +
-            (Style.DIM + Fore.YELLOW + " T" + Style.RESET_ALL + ": Tree") + " | " +
-            (Style.BRIGHT + Fore.YELLOW + " W" + Style.RESET_ALL + ": Wood")
-        )
-        output_buffer.append(
-            (Style.BRIGHT + Fore.RED + " R" + Style.RESET_ALL + ": Energy Fruit") + " | " +
-            (Style.BRIGHT + Fore.MAGENTA + " P" + Style.RESET_ALL + ": Social Fruit") + " | " +
-            (Style.BRIGHT + Fore.BLUE + " B" + Style.RESET_ALL + ": Speed Fruit") + " | " +
-            (Style.DIM + Fore.MAGENTA + " b" + Style.RESET_ALL + ": Growing Bush")
-        )
-        output_buffer.append(
-            (Style.BRIGHT + Fore.BLUE + " H" + Style.RESET_ALL + ": Home") + " | " +
-            (Style.NORMAL + Fore.BLUE + " h" + Style.RESET_ALL + ": Damaged Home") + " | " +
-            (Style.BRIGHT + Fore.RED + " C" + Style.RESET_ALL + ": Campfire") + " | " +
-            (Style.BRIGHT + Fore.MAGENTA + " L" + Style.RESET_ALL + ": Library Location")
-        )
+        output_buffer = list(LEGEND_LINES)
         
         output_buffer.append(Style.BRIGHT + "--- SIMULATION STATS ---" + Style.RESET_ALL)
 
@@ -2722,75 +4587,335 @@ class World:
         else:
             output_buffer.append("  No deaths recorded yet.")
 
-        print("\n".join(output_buffer) + Style.RESET_ALL)
+        if self.profiler is not None:
+            profile_lines = format_profile(self.profiler.report())
+            output_buffer.append(Style.BRIGHT + profile_lines[0] + Style.RESET_ALL)
+            output_buffer.extend(profile_lines[1:])
+
+        return header, grid, output_buffer
 
 
     def get_nearest(self, x, y, radius, item_set):
-        """Finds the nearest item in a set within a radius."""
+        """
+        Finds the nearest item within a radius. `item_set` is either the name of
+        an indexed resource ('food', 'wood', 'fruits', 'campfires', 'homes'),
+        which only searches nearby cells, or any iterable/dict of positions.
+        """
+        if isinstance(item_set, str):
+            if radius <= self.config.DISK_SCAN_MAX_RADIUS:
+                return self.scan_disk(x, y, radius, RESOURCE_TILE_KINDS[item_set])
+            return self.resource_grids[item_set].nearest_point(x, y, radius)
+
         nearest_item = None
-        min_dist = float('inf')
+        min_dist_sq = radius * radius + 1
         
         items = item_set
         if isinstance(item_set, dict):
             items = item_set.keys()
             
         for (ix, iy) in items:
-            dist = get_distance(x, y, ix, iy)
-            if dist <= radius and dist < min_dist:
-                min_dist = dist
+            dist_sq = (ix - x) * (ix - x) + (iy - y) * (iy - y)
+            if dist_sq <= radius * radius and dist_sq < min_dist_sq:
+                min_dist_sq = dist_sq
                 nearest_item = (ix, iy)
         return nearest_item
 
+    def scan_disk(self, x, y, radius, kinds):
+        """
+        The nearest tile within `radius` holding any of the `kinds` bits (ties
+        go to the smaller position), walking disk_offsets() outwards and
+        stopping at the first hit. Cheaper than the spatial hash for small radii.
+        """
+        tile_kinds, width, height = self.tile_kinds, self.width, self.height
+        for dx, dy in disk_offsets(radius):
+            tx = x + dx
+            ty = y + dy
+            if 0 <= tx < width and 0 <= ty < height and tile_kinds[ty * width + tx] & kinds:
+                return (tx, ty)
+        return None
+
     def get_nearest_in_set(self, x, y, radius, item_set):
-        """Finds all items in a set within a radius and returns a list of coordinates."""
+        """
+        Finds all items within a radius and returns a list of coordinates.
+        `item_set` is an indexed resource name or any iterable/dict of positions.
+        """
+        if isinstance(item_set, str):
+            radius_sq = radius * radius
+            return [
+                (ix, iy) for (ix, iy) in self.resource_grids[item_set].query(x, y, radius)
+                if (ix - x) * (ix - x) + (iy - y) * (iy - y) <= radius_sq
+            ]
+
         found_items = []
+        radius_sq = radius * radius
         items = item_set
         if isinstance(item_set, dict):
             items = item_set.keys()
             
         for (ix, iy) in items:
-            dist = get_distance(x, y, ix, iy)
-            if dist <= radius:
+            if (ix - x) * (ix - x) + (iy - y) * (iy - y) <= radius_sq:
                 found_items.append((ix, iy))
         return found_items
 
     def get_nearest_agents(self, x, y, radius, exclude_self=None):
-        """Finds nearest agents within a radius."""
+        """
+        Finds agents within a radius, using the spatial hash so only the cells
+        overlapping the radius are scanned (or, for small radii, the tiles of
+        disk_offsets()). Results keep the world's agent order.
+        """
         nearby_agents = []
-        for agent in self.agents:
-            if agent == exclude_self:
-                continue
-            dist = get_distance(x, y, agent.x, agent.y)
-            if dist <= radius:
-                nearby_agents.append(agent)
+        if radius <= self.config.DISK_SCAN_MAX_RADIUS:
+            tile_agents, agents = self.tile_agents, self.agents
+            for dx, dy in disk_offsets(radius):
+                occupants = tile_agents.get((x + dx, y + dy))
+                if occupants:
+                    for agent_id in occupants:
+                        agent = agents.get(agent_id)
+                        if agent is not exclude_self:
+                            nearby_agents.append(agent)
+        else:
+            radius_sq = radius * radius
+            for agent in self.agent_grid.query(x, y, radius):
+                if agent is exclude_self:
+                    continue
+                if (agent.x - x) * (agent.x - x) + (agent.y - y) * (agent.y - y) <= radius_sq:
+                    nearby_agents.append(agent)
+        # self.agents iterates by ascending id, so sorting by id matches a full scan
+        nearby_agents.sort(key=lambda a: a.id)
         return nearby_agents
 
-# --- MAIN EXECUTION ---
+# --- DIFF RENDERER ---
 
-if __name__ == "__main__":
-    
-    # 1. Initialize the World
-    world = World(WORLD_WIDTH, WORLD_HEIGHT)
-    
-    # 2. Add starting agents and resources
-    for _ in range(STARTING_AGENTS):
+class DiffRenderer:
+    """
+    Console renderer that keeps the previous frame and only rewrites the grid
+    cells and legend/stats lines that changed, using cursor-addressed ANSI
+    codes. The first frame, a change of grid size, and `full_redraw=True`
+    all fall back to World.render()'s full redraw.
+    """
+    # Screen rows (1-based): the full redraw starts with a blank line, then the header
+    HEADER_ROW = 2
+    GRID_ROW = 3
+
+    def __init__(self, world, full_redraw=False, out=None):
+        self.world = world
+        self.full_redraw = full_redraw
+        self.out = out if out is not None else sys.stdout
+        self.previous = None
+
+    def render(self):
+        """Draws the world's current frame, writing only what changed since the last one."""
+        profiler = self.world.profiler
+        if profiler is not None:
+            start = time.perf_counter_ns()
+        frame = self.world.build_frame()
+        previous, self.previous = self.previous, frame
+        if self.full_redraw or previous is None or not self.same_shape(frame[1], previous[1]):
+            self.out.write(join_frame(*frame) + "\n")
+        else:
+            self.out.write(self.diff(previous, frame))
+        self.out.flush()
+        if profiler is not None:
+            profiler.record('render', time.perf_counter_ns() - start)
+
+    def same_shape(self, grid, old_grid):
+        return len(grid) == len(old_grid) and (not grid or len(grid[0]) == len(old_grid[0]))
+
+    def diff(self, previous, frame):
+        """Returns the ANSI updates that turn `previous` into `frame` on screen."""
+        old_header, old_grid, old_lines = previous
+        header, grid, lines = frame
+        updates = []
+
+        if header != old_header:
+            updates.append(self.line_update(self.HEADER_ROW, header))
+
+        for y, row in enumerate(grid):
+            old_row = old_grid[y]
+            if row == old_row:
+                continue
+            for x, cell in enumerate(row):
+                if cell != old_row[x]:
+                    # Reset first so a cell never inherits the style of whatever was drawn before it
+                    updates.append("\033[{};{}H{}{}".format(self.GRID_ROW + y, 1 + 2 * x, Style.RESET_ALL, cell))
+
+        first_line_row = self.GRID_ROW + len(grid)
+        for i in range(max(len(lines), len(old_lines))):
+            line = lines[i] if i < len(lines) else ''
+            old_line = old_lines[i] if i < len(old_lines) else ''
+            if line != old_line:
+                updates.append(self.line_update(first_line_row + i, line))
+
+        # Park the cursor below the frame, where a full redraw would leave it
+        updates.append("\033[{};1H".format(first_line_row + len(lines)) + Style.RESET_ALL)
+        return "".join(updates)
+
+    def line_update(self, screen_row, line):
+        """Rewrites one whole text line and clears whatever was left after it."""
+        return "\033[{};1H{}{}{}\033[K".format(screen_row, Style.RESET_ALL, line, Style.RESET_ALL)
+
+# --- CHECKPOINTS ---
+
+CHECKPOINT_MAGIC = b'ALIFESIM'
+CHECKPOINT_VERSION = 7
+CHECKPOINT_HEADER = struct.Struct('>8sH') # magic, format version
+CONSTANT_COLUMN_TYPES = {type(None), str, bool, int, float} # Immutable, so one value can be shared
+INT_COLUMN_TYPECODES = (('b', 1 << 7), ('h', 1 << 15), ('i', 1 << 31), ('q', 1 << 63)) # (typecode, 2 ** (bits - 1))
+
+def encode_checkpoint_value(value):
+    """
+    Turns snapshot() data into JSON data. Tuples become arrays; lists, sets,
+    frozensets, dicts (as [key, value] pairs, so keys can be tiles) and bytes
+    (base64) become one-letter tagged objects. Anything else is refused, so a
+    checkpoint only ever holds plain data.
+    """
+    kind = type(value)
+    if value is None or kind is int or kind is str or kind is bool:
+        return value
+    if isinstance(value, float):
+        return float(value)
+    if kind is tuple:
+        return [encode_checkpoint_value(item) for item in value]
+    if kind is list:
+        return {'l': [encode_checkpoint_value(item) for item in value]}
+    if kind is set:
+        return {'s': [encode_checkpoint_value(item) for item in value]}
+    if kind is frozenset:
+        return {'f': [encode_checkpoint_value(item) for item in value]}
+    if kind is dict:
+        return {'d': [[encode_checkpoint_value(key), encode_checkpoint_value(item)] for key, item in value.items()]}
+    if kind is bytes:
+        return {'b': base64.b64encode(value).decode('ascii')}
+    raise TypeError("Can't save a {} in a checkpoint.".format(kind.__name__))
+
+def pack_checkpoint_column(values):
+    """
+    Packs one field of every agent for a checkpoint. A column of plain ints
+    becomes (typecode, bytes) of the narrowest integer array that holds it,
+    a column of floats the same for an array('d'), a column repeating one None, string or number becomes ('=', value), and
+    any other column, e.g. one holding tiles or sets, stays a list.
+    """
+    kinds = set(map(type, values))
+    if len(kinds) == 1 and kinds <= CONSTANT_COLUMN_TYPES and len(set(values)) == 1:
+        return ('=', values[0])
+    if kinds == {float}:
+        return ('d', array('d', values).tobytes())
+    if kinds == {int}:
+        low, high = min(values), max(values)
+        for typecode, limit in INT_COLUMN_TYPECODES:
+            if -limit <= low and high < limit:
+                return (typecode, array(typecode, values).tobytes())
+    return list(values)
+
+def unpack_checkpoint_column(column, count):
+    """The inverse of pack_checkpoint_column(): a list of `count` values."""
+    if isinstance(column, list):
+        values = column
+    elif column[0] == '=':
+        values = [column[1]] * count
+    else:
+        typecode, packed = column
+        values = array(typecode, packed).tolist()
+    if len(values) != count:
+        raise ValueError("Checkpoint column holds {} values, expected {}.".format(len(values), count))
+    return values
+
+def decode_checkpoint_value(value):
+    """The inverse of encode_checkpoint_value()."""
+    if isinstance(value, list):
+        return tuple(decode_checkpoint_value(item) for item in value)
+    if not isinstance(value, dict):
+        return value
+    if len(value) != 1:
+        raise ValueError("Malformed checkpoint data.")
+    (tag, items), = value.items()
+    if tag == 'l':
+        return [decode_checkpoint_value(item) for item in items]
+    if tag == 's':
+        return {decode_checkpoint_value(item) for item in items}
+    if tag == 'f':
+        return frozenset(decode_checkpoint_value(item) for item in items)
+    if tag == 'd':
+        return {decode_checkpoint_value(key): decode_checkpoint_value(item) for key, item in items}
+    if tag == 'b':
+        return base64.b64decode(items)
+    raise ValueError("Malformed checkpoint data.")
+
+def save_checkpoint(world, path):
+    """
+    Writes world.snapshot() to `path`: an 8-byte magic and a format version,
+    followed by the snapshot as zlib-compressed JSON (see
+    encode_checkpoint_value), with agents packed into typed columns. The file is written next to `path` first and
+    then swapped in, so a crash never leaves a half-written checkpoint behind.
+    """
+    data = json.dumps(encode_checkpoint_value(world.snapshot()), separators=(',', ':'))
+    payload = zlib.compress(data.encode('utf-8'), 6)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION))
+        f.write(payload)
+    os.replace(temp_path, path)
+
+def load_checkpoint(path):
+    """
+    Reads a checkpoint written by save_checkpoint() and returns the restored
+    World. Checkpoints are plain data, so loading one never runs code from it.
+    Anything that isn't a valid checkpoint raises a ValueError naming `path`.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(CHECKPOINT_HEADER.size)
+        payload = f.read()
+    if len(header) < CHECKPOINT_HEADER.size:
+        raise ValueError("{} is not a simulation checkpoint.".format(path))
+    magic, version = CHECKPOINT_HEADER.unpack(header)
+    if magic != CHECKPOINT_MAGIC:
+        raise ValueError("{} is not a simulation checkpoint.".format(path))
+    if version != CHECKPOINT_VERSION:
+        raise ValueError("Unsupported checkpoint version {} in {} (expected {}).".format(version, path, CHECKPOINT_VERSION))
+    try:
+        data = decode_checkpoint_value(json.loads(zlib.decompress(payload).decode('utf-8')))
+    except (zlib.error, ValueError) as e:
+        raise ValueError("{} is not a valid checkpoint ({}).".format(path, e))
+    try:
+        return World.from_snapshot(data)
+    except (KeyError, TypeError, ValueError, IndexError, OverflowError) as e:
+        raise ValueError("{} is not a valid checkpoint ({}: {}).".format(path, type(e).__name__, e))
+
+def autosave(world, autosave_path, autosave_every=AUTOSAVE_EVERY):
+    """Saves a checkpoint to `autosave_path` every `autosave_every` turns (no-op without a path)."""
+    if autosave_path and autosave_every and world.turn % autosave_every == 0:
+        save_checkpoint(world, autosave_path)
+
+# --- RUNNERS (interactive and headless) ---
+
+def populate_world(world):
+    """Adds the starting agents, food, wood and fruit bushes to a new world."""
+    config = world.config
+    for _ in range(config.STARTING_AGENTS):
         world.add_agent() 
-    for _ in range(STARTING_FOOD):
-        tile = world.get_random_empty_tile()
-        if tile:
-            world.food.add(tile)
-            world.food_freshness[tile] = FOOD_FRESHNESS
-    for _ in range(STARTING_WOOD):
+    for tile in world.get_random_empty_tiles(config.STARTING_FOOD):
+        world.add_food(tile)
+    for tile in world.get_random_empty_tiles(config.STARTING_WOOD):
+        world.add_wood(tile)
+    for _ in range(config.STARTING_FRUIT_BUSHES if config.FRUITS_ENABLED else 0):
         tile = world.get_random_empty_tile()
         if tile:
-            world.wood.add(tile)
-    for _ in range(STARTING_FRUIT_BUSHES):
-        tile = world.get_random_empty_tile()
-        if tile:
-            world.add_fruit(tile, random.choice(['energy', 'social', 'speed']))
-        
-    # 3. Run the simulation loop
-    
+            world.add_fruit(tile, world.placement_rng.choice(['energy', 'social', 'speed']))
+
+def check_end_condition(world):
+    """Returns why the simulation should end (extinction/overpopulation), or None."""
+    if world.stats['population'] == 0 and world.turn > 100:
+        return "All agents have died."
+    if world.stats['population'] > (world.width * world.height * 0.5):
+        return "Overpopulation!"
+    return None
+
+def run_interactive(world, full_redraw=False, autosave_path=None, autosave_every=AUTOSAVE_EVERY):
+    """
+    The console loop: update, render and sleep SIM_SPEED every turn, saving a
+    checkpoint every `autosave_every` turns and on Ctrl+C if `autosave_path` is set.
+    """
+    renderer = DiffRenderer(world, full_redraw)
     if os.name == 'nt':
         os.system('cls')
     else:
@@ -2799,17 +4924,151 @@ if __name__ == "__main__":
     try:
         while True:
             world.update()
-            world.render()
+            autosave(world, autosave_path, autosave_every)
+            renderer.render()
             time.sleep(SIM_SPEED)
             
-            if world.stats['population'] == 0 and world.turn > 100:
-                print("\n--- SIMULATION END: All agents have died. ---\n")
-                break
-            if world.stats['population'] > (WORLD_WIDTH * WORLD_HEIGHT * 0.5):
-                print("\n--- SIMULATION END: Overpopulation! ---\n")
+            end_reason = check_end_condition(world)
+            if end_reason:
+                print("\n--- SIMULATION END: {} ---\n".format(end_reason))
                 break
                 
     except KeyboardInterrupt:
+        if autosave_path:
+            save_checkpoint(world, autosave_path)
         print("\n--- Simulation stopped by user. ---\n")
     finally:
-        print(Style.RESET_ALL)
\ No newline at end of file
+        print(Style.RESET_ALL)
+
+def run_headless(world=None, turns=None, render_every=0, sample_every=0, summary_path=None, verbose=True,
+                 full_redraw=False, autosave_path=None, autosave_every=AUTOSAVE_EVERY):
+    """
+    Advances the world as fast as possible (no rendering, no SIM_SPEED sleep)
+    for `turns` turns, or until an end condition if `turns` is None.
+    Renders / records a copy of world.stats every `render_every` / `sample_every`
+    turns when those are set, and checkpoints like run_interactive() when
+    `autosave_path` is set. Returns a summary dict, optionally written to
+    `summary_path` as JSON.
+    """
+    if world is None:
+        world = World(WORLD_WIDTH, WORLD_HEIGHT)
+        populate_world(world)
+
+    renderer = DiffRenderer(world, full_redraw)
+    samples = []
+    end_reason = None
+    start_turn = world.turn
+    start_time = time.perf_counter()
+    try:
+        while turns is None or world.turn - start_turn < turns:
+            world.update()
+            autosave(world, autosave_path, autosave_every)
+            if render_every and world.turn % render_every == 0:
+                renderer.render()
+            if sample_every and world.turn % sample_every == 0:
+                sample = dict(world.stats)
+                sample['turn'] = world.turn
+                samples.append(sample)
+            end_reason = check_end_condition(world)
+            if end_reason:
+                break
+        else:
+            end_reason = "Turn limit reached."
+    except KeyboardInterrupt:
+        if autosave_path:
+            save_checkpoint(world, autosave_path)
+        end_reason = "Stopped by user."
+    elapsed = time.perf_counter() - start_time
+
+    summary = {
+        'end_reason': end_reason,
+        'seed': world.seed,
+        'turns_run': world.turn - start_turn,
+        'final_turn': world.turn,
+        'generation': world.generation_count,
+        'seconds': elapsed,
+        'stats': dict(world.stats),
+        'death_causes': dict(world.death_causes),
+        'samples': samples,
+    }
+    if world.profiler is not None:
+        summary['profile'] = world.profiler.report()
+    if summary_path:
+        with open(summary_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+    if verbose:
+        print(format_summary(summary))
+    return summary
+
+def format_summary(summary):
+    """Formats a run_headless() summary as plain text."""
+    turns_per_second = summary['turns_run'] / summary['seconds'] if summary['seconds'] > 0 else 0.0
+    lines = [
+        "--- SIMULATION SUMMARY: {} ---".format(summary['end_reason']),
+        "Seed: {}".format(summary['seed']),
+        "Turns run: {} (final turn {}, generation {}) in {:.1f}s ({:.1f} turns/s)".format(
+            summary['turns_run'], summary['final_turn'], summary['generation'], summary['seconds'], turns_per_second),
+        "Stats:",
+    ]
+    for key, value in summary['stats'].items():
+        value = "{:.3f}".format(value) if isinstance(value, float) else value
+        lines.append("  {}: {}".format(key, value))
+    lines.append("Death causes:")
+    for reason, count in summary['death_causes'].items():
+        lines.append("  {}: {}".format(reason, count))
+    if 'profile' in summary:
+        lines.extend(format_profile(summary['profile']))
+    return "\n".join(lines)
+
+# --- MAIN EXECUTION ---
+
+if __name__ == "__main__":
+    
+    parser = argparse.ArgumentParser(description="Console artificial life simulation.")
+    parser.add_argument('--headless', action='store_true',
+                        help="fast-forward without rendering or sleeping between turns")
+    parser.add_argument('--turns', type=int, default=None,
+                        help="headless: stop after this many turns (default: run until an end condition)")
+    parser.add_argument('--render-every', type=int, default=0, metavar='K',
+                        help="headless: render the world every K turns")
+    parser.add_argument('--sample-every', type=int, default=0, metavar='K',
+                        help="headless: record world.stats every K turns into the summary")
+    parser.add_argument('--summary', metavar='PATH',
+                        help="headless: also write the final summary to PATH as JSON")
+    parser.add_argument('--full-redraw', action='store_true',
+                        help="redraw the whole screen every frame instead of only the changed cells")
+    parser.add_argument('--autosave', metavar='PATH',
+                        help="save a checkpoint to PATH periodically and when stopped with Ctrl+C")
+    parser.add_argument('--autosave-every', type=int, default=AUTOSAVE_EVERY, metavar='K',
+                        help="turns between autosaves (default: {})".format(AUTOSAVE_EVERY))
+    parser.add_argument('--seed', type=int, default=None,
+                        help="seed for a reproducible run (a new world only, --resume keeps the saved seed)")
+    parser.add_argument('--resume', metavar='PATH',
+                        help="continue from a checkpoint instead of starting a new world")
+    parser.add_argument('--profile', action='store_true',
+                        help="time every phase of the tick and show a rolling profile under the stats")
+    parser.add_argument('--profile-json', metavar='PATH',
+                        help="write the final tick profile to PATH as JSON (implies --profile)")
+    args = parser.parse_args()
+
+    if args.resume:
+        world = load_checkpoint(args.resume)
+    else:
+        # 1. Initialize the World
+        world = World(WORLD_WIDTH, WORLD_HEIGHT, seed=args.seed)
+        
+        # 2. Add starting agents and resources
+        populate_world(world)
+
+    if args.profile or args.profile_json:
+        world.profiler = TickProfiler()
+
+    if args.headless:
+        run_headless(world, args.turns, args.render_every, args.sample_every, args.summary,
+                     full_redraw=args.full_redraw, autosave_path=args.autosave, autosave_every=args.autosave_every)
+        print(Style.RESET_ALL)
+    else:
+        run_interactive(world, args.full_redraw, args.autosave, args.autosave_every)
+
+    if args.profile_json:
+        world.profiler.save(args.profile_json)
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Parameter sweep runner for life_simulation.py.
+
+Runs headless worlds for every combination (or a random sample) of constant
+overrides and seeds across a process pool, and streams one summary row per
+run into a CSV results table. Rows are appended as runs finish, so an
+interrupted sweep can be resumed by running the same command again.
+
+Example:
+    python sweep.py --set "FOOD_SPAWN_RATE=[5, 10, 20]" \\
+                    --set "GENE_RANGES.vision=[(3, 10, 0.1), (3, 14, 0.1)]" \\
+                    --seeds 1-5 --turns 5000 --out sweep_results.csv
+"""
+import os
+import ast
+import csv
+import dataclasses
+import sys
+import json
+import hashlib
+import random
+import argparse
+import itertools
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import life_simulation as sim
+
+BASE_COLUMNS = ['run_id', 'seed', 'status', 'end_reason', 'turns_survived', 'final_population', 'seconds']
+CONFIG_NAMES = [field.name for field in dataclasses.fields(sim.SimConfig)]
+GENE_COLUMNS = ['avg_{}'.format(gene) for gene in sim.GENE_NAMES]
+DEATH_COLUMNS = [
+    'deaths_{}'.format(reason)
+    for reason in sim.World(1, 1, seed=0).death_causes
+    if reason != 'UNKNOWN' # calculate_stats() drops it
+]
+
+# --- OVERRIDES ---
+
+WORLD_SIZE_NAMES = ('WORLD_WIDTH', 'WORLD_HEIGHT')
+
+def make_config(overrides):
+    """
+    Builds the SimConfig for one combination of overrides: SimConfig fields
+    (NAME) and single gene ranges (GENE_RANGES.gene). WORLD_WIDTH and
+    WORLD_HEIGHT are world arguments, not config fields, and are skipped.
+    """
+    changes = {}
+    gene_ranges = None
+    for name, value in overrides.items():
+        if name.startswith('GENE_RANGES.'):
+            if gene_ranges is None:
+                gene_ranges = dict(sim.SimConfig().GENE_RANGES)
+            gene_ranges[name.split('.', 1)[1]] = tuple(value)
+        elif name not in WORLD_SIZE_NAMES:
+            changes[name] = value
+    if gene_ranges is not None:
+        changes['GENE_RANGES'] = gene_ranges
+    return sim.SimConfig(**changes)
+
+def check_override_name(name):
+    """Raises ValueError unless `name` is a SimConfig field, a gene range or a world size."""
+    if name.startswith('GENE_RANGES.'):
+        if name.split('.', 1)[1] not in sim.GENE_NAMES:
+            raise ValueError("Unknown gene in {}".format(name))
+    elif name not in CONFIG_NAMES and name not in WORLD_SIZE_NAMES:
+        raise ValueError("Unknown simulation constant {}".format(name))
+
+# --- RUNS ---
+
+started_runs = None # Worker side: queue of run ids, put when a run starts (see init_worker)
+
+def init_worker(queue):
+    global started_runs
+    started_runs = queue
+
+def make_run_id(overrides, seed):
+    """Stable id for one (overrides, seed) combination, used to resume sweeps."""
+    key = json.dumps([sorted(overrides.items()), seed])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+def run_one(job):
+    """Runs one headless world in a worker process and returns its results row."""
+    if started_runs is not None:
+        started_runs.put(job['run_id'])
+    overrides = job['overrides']
+    row = {'run_id': job['run_id'], 'seed': job['seed']}
+    for name, value in overrides.items():
+        row[name] = json.dumps(value)
+
+    try:
+        world = sim.World(overrides.get('WORLD_WIDTH', sim.WORLD_WIDTH), overrides.get('WORLD_HEIGHT', sim.WORLD_HEIGHT),
+                          seed=job['seed'], config=make_config(overrides))
+        sim.populate_world(world)
+        summary = sim.run_headless(world, job['turns'], verbose=False)
+    except Exception:
+        row['status'] = 'error'
+        row['end_reason'] = traceback.format_exc(limit=3).strip().splitlines()[-1]
+        return row
+
+    # Ctrl+C reaches the workers too; run_headless() then returns early
+    row['status'] = 'interrupted' if summary['end_reason'] == "Stopped by user." else 'ok'
+    row['end_reason'] = summary['end_reason']
+    row['turns_survived'] = summary['turns_run']
+    row['final_population'] = summary['stats']['population']
+    row['seconds'] = round(summary['seconds'], 2)
+    for column in GENE_COLUMNS:
+        row[column] = round(summary['stats'].get(column, 0.0), 4)
+    for reason, count in summary['death_causes'].items():
+        row['deaths_{}'.format(reason)] = count
+    return row
+
+def build_jobs(grid, seeds, turns, sample=None, sample_seed=0):
+    """
+    Expands a {name: [values]} grid and a list of seeds into jobs. With
+    `sample`, only that many override combinations are drawn at random.
+    """
+    names = sorted(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    if sample is not None and sample < len(combos):
+        combos = random.Random(sample_seed).sample(combos, sample)
+    jobs = []
+    for overrides in combos:
+        for seed in seeds:
+            jobs.append({'run_id': make_run_id(overrides, seed), 'overrides': overrides, 'seed': seed, 'turns': turns})
+    return jobs
+
+# --- RESULTS TABLE ---
+
+def read_finished_runs(path):
+    """Returns (header, run ids) already recorded in a results table, or (None, set())."""
+    if not os.path.exists(path):
+        return None, set()
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, {row['run_id'] for row in reader}
+
+def run_pool(jobs, workers, record, started):
+    """
+    Runs `jobs` in one process pool, recording each row as it finishes.
+    If a worker process dies, returns (runs that had started, runs that had
+    not) among the unfinished ones; otherwise returns None.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(started,)) as pool:
+        futures = {pool.submit(run_one, job): job for job in jobs}
+        try:
+            for future in as_completed(futures):
+                record(future.result())
+                del futures[future]
+        except BrokenProcessPool:
+            started_ids = set()
+            while not started.empty():
+                started_ids.add(started.get())
+            unfinished = list(futures.values())
+            if not started_ids & {job['run_id'] for job in unfinished}:
+                return unfinished, [] # Cannot tell which run died, so suspect them all
+            return ([job for job in unfinished if job['run_id'] in started_ids],
+                    [job for job in unfinished if job['run_id'] not in started_ids])
+    return None
+
+def run_sweep(jobs, out_path, workers=None, log=print):
+    """
+    Runs `jobs` across a process pool, appending each results row to the CSV
+    at `out_path` as soon as it finishes. Runs already in the file are skipped.
+    If a worker process dies, the runs that were in flight are retried one at
+    a time in their own pool: a run that kills its worker again is recorded as
+    crashed, and the rest of the sweep carries on.
+    """
+    columns = BASE_COLUMNS + sorted({name for job in jobs for name in job['overrides']}) + GENE_COLUMNS + DEATH_COLUMNS
+    header, finished = read_finished_runs(out_path)
+    if header is not None and header != columns:
+        raise ValueError("{} was written by a different sweep (columns differ).".format(out_path))
+
+    pending = [job for job in jobs if job['run_id'] not in finished]
+    log("{} runs, {} already done, {} to run.".format(len(jobs), len(jobs) - len(pending), len(pending)))
+
+    with open(out_path, 'a', newline='') as f:
+        writer = csv.DictWriter(f, columns, restval='', extrasaction='ignore')
+        if header is None:
+            writer.writeheader()
+            f.flush()
+
+        def record(row):
+            if row['status'] == 'interrupted':
+                return # Not finished, so a resumed sweep runs it again
+            writer.writerow(row)
+            f.flush()
+            log("[{}] seed {} {}: {} after {} turns, population {}".format(
+                row['run_id'], row['seed'], row['status'], row.get('end_reason'),
+                row.get('turns_survived', '-'), row.get('final_population', '-')))
+
+        started = multiprocessing.SimpleQueue() # put() writes straight to the pipe, so a dying worker's id is not lost
+        suspects = []
+        while pending or suspects:
+            if suspects:
+                job = suspects.pop(0)
+                if run_pool([job], 1, record, started) is not None:
+                    record({'run_id': job['run_id'], 'seed': job['seed'], 'status': 'crashed',
+                            'end_reason': 'Worker process died.'})
+                continue
+            broken = run_pool(pending, workers, record, started)
+            pending = []
+            if broken is not None:
+                suspects, pending = broken
+                log("A worker process died; retrying {} in-flight runs one at a time.".format(len(suspects)))
+
+# --- COMMAND LINE ---
+
+def parse_override(text):
+    """Parses NAME=[v1, v2, ...] (a Python literal list) into (name, values)."""
+    name, _, values = text.partition('=')
+    name = name.strip()
+    check_override_name(name)
+    values = ast.literal_eval(values.strip())
+    if not isinstance(values, list):
+        values = [values]
+    return name, values
+
+def parse_seeds(text):
+    """Parses '1-5' or '1,2,7' into a list of ints."""
+    seeds = []
+    for part in text.split(','):
+        first, _, last = part.partition('-')
+        seeds.extend(range(int(first), int(last or first) + 1))
+    return seeds
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run headless simulations over a grid of constant overrides and seeds.")
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=[VALUES]',
+                        help="constant to sweep, e.g. \"FOOD_SPAWN_RATE=[5, 10]\" or \"GENE_RANGES.vision=[(3, 10, 0.1)]\"")
+    parser.add_argument('--seeds', default='1', help="seeds to run each combination with, e.g. 1-10 or 1,4,9")
+    parser.add_argument('--turns', type=int, default=5000, help="turn limit per run (runs also end on extinction/overpopulation)")
+    parser.add_argument('--sample', type=int, default=None, metavar='N',
+                        help="run a random sample of N combinations instead of the full grid")
+    parser.add_argument('--sample-seed', type=int, default=0, help="seed for --sample")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes (default: one per core)")
+    parser.add_argument('--out', default='sweep_results.csv', help="results table (CSV); rerun to resume")
+    args = parser.parse_args()
+
+    try:
+        grid = dict(parse_override(text) for text in args.set)
+    except (ValueError, SyntaxError) as e:
+        parser.error(str(e))
+
+    jobs = build_jobs(grid, parse_seeds(args.seeds), args.turns, args.sample, args.sample_seed)
+    try:
+        run_sweep(jobs, args.out, args.workers)
+    except KeyboardInterrupt:
+        print("\nSweep stopped. Rerun the same command to resume.")
+        sys.exit(1)
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Golden-trajectory equivalence checker for life_simulation.py.
+
+Runs a seeded world for N turns and hashes its state after every turn:
+agent positions, states and energy, the food/wood/fruit/home/campfire
+tiles and the environmental health. Two engines (files, commits, or the
+per-agent vs vectorized needs pass) are then compared turn by turn, and the
+first divergence is reported with the agents and resources involved.
+
+Engines:
+    current            life_simulation.py next to this script
+    PATH               any copy of the module, e.g. life_simulation_fast.py
+    git:REV            life_simulation.py as of a commit (via `git show`)
+    ...+vectorized     the same engine with VECTORIZED_NEEDS on
+
+Examples:
+    python trajectory.py compare git:HEAD current --turns 2000
+    python trajectory.py compare current current+vectorized --seed 7
+    python trajectory.py record current --out golden.json
+    python trajectory.py check golden.json current
+"""
+import os
+import sys
+import json
+import random
+import hashlib
+import argparse
+import subprocess
+import tempfile
+import importlib.util
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODULE_PATH = 'PythonLifeSimulation/life_simulation.py' # For git:REV, relative to the repository root
+MAX_LISTED = 10 # Agents/tiles listed per kind in a divergence report
+
+# --- ENGINES ---
+
+loaded_engines = {} # (source, vectorized) -> module; old engines keep VECTORIZED_NEEDS on the module
+
+def load_engine(spec):
+    """Returns (module, vectorized) for an engine spec (see the module docstring)."""
+    vectorized = spec.endswith('+vectorized')
+    source = spec[:-len('+vectorized')] if vectorized else spec
+    key = (source, vectorized)
+    if key not in loaded_engines:
+        if source == 'current':
+            path = os.path.join(HERE, 'life_simulation.py')
+        elif source.startswith('git:'):
+            code = subprocess.check_output(['git', 'show', '{}:{}'.format(source[4:], MODULE_PATH)], cwd=HERE)
+            handle, path = tempfile.mkstemp(suffix='.py', prefix='life_simulation_')
+            with os.fdopen(handle, 'wb') as f:
+                f.write(code)
+        else:
+            path = source
+        name = 'engine_{}'.format(len(loaded_engines))
+        module_spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(module_spec)
+        try:
+            module_spec.loader.exec_module(module)
+        finally:
+            if source.startswith('git:'):
+                os.remove(path)
+        loaded_engines[key] = module
+    return loaded_engines[key], vectorized
+
+def build_world(engine, vectorized, seed, size=None):
+    """
+    A populated world for `engine`. Engines without World(seed=...) draw from
+    the global `random`, which is seeded here instead (same seed, same run).
+    """
+    width, height = size or (engine.WORLD_WIDTH, engine.WORLD_HEIGHT)
+    random.seed(seed)
+    kwargs = {}
+    if hasattr(engine, 'SimConfig'):
+        if vectorized:
+            kwargs['config'] = engine.SimConfig(VECTORIZED_NEEDS=True)
+    elif hasattr(engine, 'VECTORIZED_NEEDS'):
+        engine.VECTORIZED_NEEDS = vectorized # A module-wide switch before SimConfig
+    elif vectorized:
+        raise ValueError("This engine has no vectorized needs pass.")
+    try:
+        world = engine.World(width, height, seed=seed, **kwargs)
+    except TypeError:
+        world = engine.World(width, height)
+    if not hasattr(engine, 'populate_world'):
+        raise ValueError("This engine has no populate_world(); it predates the headless runner.")
+    engine.populate_world(world)
+    return world
+
+# --- STATE HASHING ---
+
+def canonical_state(world):
+    """
+    The compared part of a world as plain sorted data. Only what every engine
+    version stores the same way is included (campfires by position, not by
+    their timers).
+    """
+    agents = {}
+    for agent in world.agents:
+        agents[agent.id] = (agent.x, agent.y, agent.state, repr(float(agent.energy)))
+    return {
+        'agents': agents,
+        'food': sorted(world.food),
+        'wood': sorted(world.wood),
+        'fruits': sorted((pos, world.fruit_types.get(pos)) for pos in world.fruits),
+        'homes': sorted((pos, data.get('owner_id'), data.get('durability')) for pos, data in world.homes.items()),
+        'campfires': sorted(world.campfires),
+        'environmental_health': repr(float(world.environmental_health)),
+    }
+
+def digest(value):
+    return hashlib.sha1(repr(value).encode('utf-8')).hexdigest()[:16]
+
+def fingerprint(world):
+    """(turn hash, part hashes): a hash of every part, and per-agent hashes."""
+    state = canonical_state(world)
+    parts = {kind: digest(value) for kind, value in state.items() if kind != 'agents'}
+    parts['agents'] = {str(agent_id): digest(data)[:8] for agent_id, data in sorted(state['agents'].items())}
+    return digest(sorted((kind, value if kind != 'agents' else sorted(value.items())) for kind, value in parts.items())), parts
+
+def record(spec, seed, turns, size=None, log=print):
+    """Runs an engine and returns its trajectory: one (hash, parts) per turn, turn 0 first."""
+    engine, vectorized = load_engine(spec)
+    world = build_world(engine, vectorized, seed, size)
+    trajectory = [fingerprint(world)]
+    for turn in range(1, turns + 1):
+        world.update()
+        trajectory.append(fingerprint(world))
+        if not world.agents:
+            log("{}: no agents left after turn {}.".format(spec, turn))
+            break
+    return trajectory
+
+def run_to(spec, seed, turn, size=None):
+    """A fresh world of `spec` advanced to `turn`."""
+    engine, vectorized = load_engine(spec)
+    world = build_world(engine, vectorized, seed, size)
+    for _ in range(turn):
+        world.update()
+    return world
+
+# --- COMPARING ---
+
+def first_divergence(expected, spec, seed, size=None):
+    """
+    Steps `spec` against a recorded trajectory. Returns None if every turn
+    matches, else (turn, expected parts, the diverged world).
+    """
+    engine, vectorized = load_engine(spec)
+    world = build_world(engine, vectorized, seed, size)
+    for turn, (turn_hash, parts) in enumerate(expected):
+        if turn > 0:
+            world.update()
+        actual_hash, actual_parts = fingerprint(world)
+        if actual_hash != turn_hash:
+            return turn, parts, world
+    return None
+
+def describe_parts(expected_parts, actual_parts):
+    """Divergence report from part hashes only (when the other world isn't available)."""
+    lines = []
+    expected_agents, actual_agents = expected_parts['agents'], actual_parts['agents']
+    only_expected = sorted(set(expected_agents) - set(actual_agents), key=int)
+    only_actual = sorted(set(actual_agents) - set(expected_agents), key=int)
+    changed = sorted((a for a in expected_agents if a in actual_agents and expected_agents[a] != actual_agents[a]), key=int)
+    if only_expected:
+        lines.append("  agents only in the golden run: {}".format(', '.join(only_expected[:MAX_LISTED])))
+    if only_actual:
+        lines.append("  agents only in this run: {}".format(', '.join(only_actual[:MAX_LISTED])))
+    if changed:
+        lines.append("  agents that differ: {}".format(', '.join(changed[:MAX_LISTED])))
+    for kind in expected_parts:
+        if kind != 'agents' and expected_parts[kind] != actual_parts[kind]:
+            lines.append("  {} differs".format(kind))
+    return lines
+
+def describe_worlds(world_a, world_b, name_a='A', name_b='B'):
+    """Divergence report listing the agents and tiles that differ between two worlds."""
+    a, b = canonical_state(world_a), canonical_state(world_b)
+    lines = []
+    only_a = sorted(set(a['agents']) - set(b['agents']))
+    only_b = sorted(set(b['agents']) - set(a['agents']))
+    if only_a:
+        lines.append("  agents only in {}: {}".format(name_a, only_a[:MAX_LISTED]))
+    if only_b:
+        lines.append("  agents only in {}: {}".format(name_b, only_b[:MAX_LISTED]))
+    changed = [agent_id for agent_id in sorted(a['agents']) if agent_id in b['agents'] and a['agents'][agent_id] != b['agents'][agent_id]]
+    for agent_id in changed[:MAX_LISTED]:
+        lines.append("  agent {}: {} (x, y, state, energy) = {} | {} = {}".format(
+            agent_id, name_a, a['agents'][agent_id], name_b, b['agents'][agent_id]))
+    if len(changed) > MAX_LISTED:
+        lines.append("  ... and {} more agents".format(len(changed) - MAX_LISTED))
+    for kind in ('food', 'wood', 'fruits', 'homes', 'campfires'):
+        if a[kind] != b[kind]:
+            in_a = [item for item in a[kind] if item not in b[kind]]
+            in_b = [item for item in b[kind] if item not in a[kind]]
+            lines.append("  {}: only in {} {} | only in {} {}".format(
+                kind, name_a, in_a[:MAX_LISTED], name_b, in_b[:MAX_LISTED]))
+    if a['environmental_health'] != b['environmental_health']:
+        lines.append("  environmental_health: {} {} | {} {}".format(
+            name_a, a['environmental_health'], name_b, b['environmental_health']))
+    return lines
+
+def compare(spec_a, spec_b, seed, turns, size=None, log=print):
+    """Compares two engines turn by turn. Returns the first diverging turn, or None."""
+    expected = record(spec_a, seed, turns, size, log)
+    result = first_divergence(expected, spec_b, seed, size)
+    if result is None:
+        log("{} and {} match for all {} turns (seed {}).".format(spec_a, spec_b, len(expected) - 1, seed))
+        return None
+    turn, _, world_b = result
+    world_a = run_to(spec_a, seed, turn, size) # Replayed, so engines sharing the global random stay in sync
+    log("First divergence at turn {} (seed {}):".format(turn, seed))
+    for line in describe_worlds(world_a, world_b, spec_a, spec_b):
+        log(line)
+    return turn
+
+# --- COMMAND LINE ---
+
+def parse_size(text):
+    width, _, height = text.lower().partition('x')
+    return int(width), int(height)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that two simulation engines produce the same trajectory.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    compare_parser = commands.add_parser('compare', help="run two engines and report their first divergence")
+    compare_parser.add_argument('engine_a')
+    compare_parser.add_argument('engine_b')
+
+    record_parser = commands.add_parser('record', help="save an engine's per-turn hashes as a golden file")
+    record_parser.add_argument('engine')
+    record_parser.add_argument('--out', required=True, metavar='PATH')
+
+    check_parser = commands.add_parser('check', help="compare an engine against a golden file")
+    check_parser.add_argument('golden', metavar='PATH')
+    check_parser.add_argument('engine')
+
+    for sub in (compare_parser, record_parser):
+        sub.add_argument('--seed', type=int, default=1)
+        sub.add_argument('--turns', type=int, default=1000)
+        sub.add_argument('--size', type=parse_size, default=None, metavar='WxH',
+                         help="world size (default: the engine's WORLD_WIDTH x WORLD_HEIGHT)")
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        sys.exit(1 if compare(args.engine_a, args.engine_b, args.seed, args.turns, args.size) is not None else 0)
+
+    elif args.command == 'record':
+        trajectory = record(args.engine, args.seed, args.turns, args.size)
+        with open(args.out, 'w') as f:
+            json.dump({'engine': args.engine, 'seed': args.seed, 'size': args.size,
+                       'trajectory': trajectory}, f)
+        print("Recorded {} turns of {} (seed {}), final hash {}.".format(
+            len(trajectory) - 1, args.engine, args.seed, trajectory[-1][0]))
+
+    elif args.command == 'check':
+        with open(args.golden) as f:
+            golden = json.load(f)
+        size = tuple(golden['size']) if golden['size'] else None
+        result = first_divergence(golden['trajectory'], args.engine, golden['seed'], size)
+        if result is None:
+            print("{} matches {} for all {} turns.".format(args.engine, args.golden, len(golden['trajectory']) - 1))
+            sys.exit(0)
+        turn, expected_parts, world = result
+        print("First divergence from {} at turn {} (seed {}):".format(args.golden, turn, golden['seed']))
+        for line in describe_parts(expected_parts, fingerprint(world)[1]):
+            print(line)
+        sys.exit(1)